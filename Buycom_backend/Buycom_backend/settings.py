@@ -33,6 +33,7 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_HEADERS = [
     'content-type',
     'authorization',
+    'x-db-primary-until',  # api.db_router.PIN_HEADER, echoed by the frontend
 
 ]
 
@@ -46,6 +47,8 @@ CORS_ALLOW_METHODS = [
 
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
+# Lets the frontend read the replica pin it has to echo back
+CORS_EXPOSE_HEADERS = ['X-DB-Primary-Until']
 REST_FRAMEWORK = {
     # 'DEFAULT_AUTHENTICATION_CLASSES': [
     #     'rest_framework.authentication.BasicAuthentication',  # Use Basic Authentication
@@ -54,9 +57,18 @@ REST_FRAMEWORK = {
     # 'DEFAULT_PERMISSION_CLASSES': [
     #     'rest_framework.permissions.IsAuthenticated',  # Ensure user is authenticated
     # ],
+    # JSON through orjson when it is installed, the stock encoder otherwise
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',  # Response format in JSON
+        'api.renderers.FastJSONRenderer',  # Response format in JSON
     ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Dates are stored as DateFields but keep the DD-MM-YYYY format the frontend expects
+    'DATE_FORMAT': '%d-%m-%Y',
+    'DATE_INPUT_FORMATS': ['%d-%m-%Y', 'iso-8601'],
 }
 # Application definition
 
@@ -71,9 +83,12 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',  # First, so it times the whole stack
+    'api.db_router.ReplicaMiddleware',  # Before anything that reads the database
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -116,9 +131,105 @@ DATABASES = {
         'PASSWORD': 'root',  
         'HOST': 'localhost',        
         'PORT': '5432',            
-    }
+        # Keep connections open between requests, checked before reuse
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # Streaming replicas of default, e.g.:
+    # 'replica1': {
+    #     'ENGINE': 'django.db.backends.postgresql',
+    #     'NAME': 'Buycom', 'USER': 'postgres', 'PASSWORD': 'root',
+    #     'HOST': 'replica1.internal', 'PORT': '5432',
+    #     'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True,
+    #     'TEST': {'MIRROR': 'default'},
+    # },
 }
 
+# Reads of GET/HEAD requests go to these DATABASES aliases; writes, and
+# reads by a client for REPLICA_STICKY_SECONDS after it wrote, go to default.
+# That pin is a cookie and an X-DB-Primary-Until header the client echoes
+DATABASE_ROUTERS = ['api.db_router.ReplicaRouter']
+DATABASE_REPLICAS = []
+REPLICA_STICKY_SECONDS = 5
+
+
+# GST API (gstapi.charteredinfo.com)
+# TP search and RETTRACK endpoints; point both at run_gst_simulator for load tests
+GST_API_SEARCH_URL = "https://gstapi.charteredinfo.com/commonapi/v1.1/search"
+GST_API_RETURNS_URL = "https://gstapi.charteredinfo.com/commonapi/v1.0/returns"
+# (connect, read) timeout in seconds and keep-alive pool size for upstream calls
+
+GST_API_TIMEOUT = (5, 30)
+GST_API_POOL_SIZE = 20
+# Connection limit of the async client used by the ASGI ingest view
+GST_API_ASYNC_MAX_CONNECTIONS = 200
+
+# Upstream quota shared by every process (requests per second, None to disable),
+# bucket size for bursts and the longest a caller waits for a token
+GST_API_RATE_LIMIT = 10
+GST_API_RATE_BURST = 20
+GST_API_RATE_MAX_WAIT = 30
+
+# Retries of 429 / 5xx responses with jittered exponential backoff (seconds)
+GST_API_MAX_RETRIES = 3
+GST_API_BACKOFF_BASE = 0.5
+GST_API_BACKOFF_MAX = 10
+
+# Circuit breaker: open after this many consecutive failures, retry after RESET seconds
+GST_API_BREAKER_THRESHOLD = 5
+GST_API_BREAKER_RESET = 30
+
+# Database-backed cache of TP / RETTRACK responses: TTL in seconds per action
+# and the maximum number of cached responses kept (least recently used go first)
+GST_CACHE_ENABLED = True
+GST_CACHE_TTL = {'TP': 24 * 60 * 60, 'RETTRACK': 6 * 60 * 60}
+GST_CACHE_MAX_ENTRIES = 100_000
+
+# Month a filing's due day falls in: 'filing_month' (the long-standing rule)
+# or 'return_period' (the month after the return period, the statutory
+# deadline). Changing it changes Delay_days and can flip Pass/Fail; run
+# `manage.py rescore` after switching.
+GST_DUE_DATE_BASIS = 'filing_month'
+
+# Batch ingestion jobs: upper bound on per-job worker threads and job size
+GST_INGEST_MAX_CONCURRENCY = 16
+GST_INGEST_MAX_ITEMS = 50_000
+# A GSTIN still running this many seconds after it was claimed is assumed
+# orphaned by a dead runner and retried on resume; keep it well above the
+# worst case fetch (timeouts x retries + rate limit wait)
+GST_INGEST_STALE_SECONDS = 900
+
+# Most (gstin, status) pairs accepted by one update_status_bulk request
+STATUS_UPDATE_MAX_ITEMS = 10_000
+
+# Rendered compliance reports: cache alias and lifetime (entries are keyed by
+# a hash of the company's records, so stale output is never served), threads
+# rendering cache misses, and the most GSTINs per bulk zip.
+# The cache lives in the database, so every gunicorn worker shares it and
+# it survives restarts; create its table with `manage.py createcachetable`
+# on deploy. Past MAX_ENTRIES a third of the entries is culled.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'api_report_cache',
+        'OPTIONS': {'MAX_ENTRIES': 50_000},
+    },
+}
+REPORT_CACHE = 'reports'
+REPORT_CACHE_TIMEOUT = 7 * 24 * 60 * 60
+REPORT_RENDER_WORKERS = 4
+REPORT_BULK_MAX_ITEMS = 500
+
+# Most matches /api/companies/search/ returns for one query
+SEARCH_MAX_RESULTS = 50
+
+# Per-request latency, query count and upstream call metrics, served at
+# /api/metrics/ for Prometheus
+METRICS_ENABLED = True
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
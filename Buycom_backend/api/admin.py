@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Login, CompanyDetails, Return, Score, CompanyGSTRecord
+from .models import Login, CompanyDetails, Return, Score, CompanyProfile, CompanyGSTRecord, IngestJob
 
 @admin.register(Login)
 class LoginAdmin(admin.ModelAdmin):
@@ -19,10 +19,23 @@ class ReturnAdmin(admin.ModelAdmin):
 
 @admin.register(Score)
 class ScoreAdmin(admin.ModelAdmin):
-    list_display = ('company', 'delayed_filing', 'average_delay_days')
+    list_display = ('company', 'result', 'average_delay_days', 'long_delay_count', 'filed_last_month', 'computed_on')
+    list_filter = ('result',)
 
-@admin.register(CompanyGSTRecord)
-class CompanyGSTRecordAdmin(admin.ModelAdmin):
+@admin.register(CompanyProfile)
+class CompanyProfileAdmin(admin.ModelAdmin):
     list_display = ('gstin', 'legal_name', 'city', 'state')
     search_fields = ('gstin', 'legal_name')
     list_filter = ('state',)
+
+@admin.register(CompanyGSTRecord)
+class CompanyGSTRecordAdmin(admin.ModelAdmin):
+    list_display = ('company', 'return_type', 'return_period', 'date_of_filing', 'result')
+    search_fields = ('company__gstin', 'company__legal_name')
+    list_filter = ('return_type', 'result')
+    list_select_related = ('company',)
+
+@admin.register(IngestJob)
+class IngestJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'status', 'total', 'concurrency', 'created_at', 'finished_at')
+    list_filter = ('status',)
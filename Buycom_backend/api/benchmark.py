@@ -0,0 +1,187 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+
+from django.test import Client
+
+from .metrics import count_queries
+from .models import CompanyProfile
+from .seed import SEED_MARKER, STATES
+from .serializers import CompanyGSTRecordSerializer
+
+# name -> (description, function(context) returning a request spec
+# ``(method, path, body, headers)``). Only the request itself is timed.
+SCENARIOS = {}
+
+
+def scenario(name, description):
+    def register(build):
+        SCENARIOS[name] = (description, build)
+        return build
+    return register
+
+
+class BenchmarkContext:
+    """What scenarios draw on: a client, seeded GSTINs and a random generator."""
+
+    def __init__(self, gstins, seed=0):
+        self.client = Client()
+        self.gstins = gstins
+        self.rng = random.Random(seed)
+
+    def gstin(self):
+        return self.rng.choice(self.gstins)
+
+
+@scenario('company_list_page', "First page of the company list, 50 rows.")
+def _company_list_page(context):
+    return 'GET', '/api/companies/?page_size=50', None, {}
+
+
+@scenario('company_list_summary', "First page of the company list in the checker columns (?view=summary).")
+def _company_list_summary(context):
+    return 'GET', '/api/companies/?page_size=50&view=summary', None, {}
+
+
+@scenario('company_list_filtered', "Company list filtered by state, sorted by delay.")
+def _company_list_filtered(context):
+    state = context.rng.choice(STATES)[1]
+    return 'GET', f'/api/companies/?page_size=50&state={state}&ordering=-Delay_days', None, {}
+
+
+@scenario('company_list_all_fields', "500 rows with every column, including the JSON payloads.")
+def _company_list_all_fields(context):
+    return 'GET', f"/api/companies/?page_size=500&fields={','.join(CompanyGSTRecordSerializer.Meta.fields)}", None, {}
+
+
+@scenario('company_detail', "Every filing of one company.")
+def _company_detail(context):
+    return 'GET', f'/api/companies/{context.gstin()}/', None, {}
+
+
+@scenario('company_detail_not_modified', "Conditional GET of a company that has not changed.")
+def _company_detail_not_modified(context):
+    path = f'/api/companies/{context.gstin()}/'
+    etag = context.client.get(path)['ETag']
+    return 'GET', path, None, {'HTTP_IF_NONE_MATCH': etag}
+
+
+@scenario('company_report', "Compliance report of one company as JSON.")
+def _company_report(context):
+    return 'GET', f'/api/companies/{context.gstin()}/report/?format=json', None, {}
+
+
+@scenario('score_detail', "Scorecard of one company.")
+def _score_detail(context):
+    return 'GET', f'/api/scores/{context.gstin()}/', None, {}
+
+
+@scenario('update_gst_record', "Turnover change on update_gst_record, which rescores the company.")
+def _update_gst_record(context):
+    body = {'gstin': context.gstin(), 'annual_turnover': context.rng.randint(2_000_000, 2_000_000_000), 'status': 'Pass'}
+    return 'PUT', '/api/update_gst_record/', body, {}
+
+
+@scenario('update_annual_turnover', "Turnover change on update_annual_turnover.")
+def _update_annual_turnover(context):
+    body = {'gstin': context.gstin(), 'annual_turnover': context.rng.randint(2_000_000, 2_000_000_000)}
+    return 'PUT', '/api/update_annual_turnover/', body, {}
+
+
+@scenario('update_status', "Status of every filing of one company.")
+def _update_status(context):
+    body = {'gstin': context.gstin(), 'status': context.rng.choice(['Pass', 'Fail'])}
+    return 'PUT', '/api/update_status_for_gstin/', body, {}
+
+
+@scenario('update_status_bulk', "Statuses of 500 companies in one request.")
+def _update_status_bulk(context):
+    gstins = context.rng.sample(context.gstins, min(500, len(context.gstins)))
+    body = {'updates': [{'gstin': gstin, 'status': context.rng.choice(['Pass', 'Fail'])} for gstin in gstins]}
+    return 'PUT', '/api/update_status_bulk/', body, {}
+
+
+def seeded_gstins():
+    return list(CompanyProfile.objects.filter(gstin__contains=SEED_MARKER).values_list('gstin', flat=True))
+
+
+def _send(context, spec):
+    method, path, body, headers = spec
+    data = json.dumps(body) if body is not None else ''
+    return context.client.generic(method, path, data, content_type='application/json', **headers)
+
+
+def _percentile(sorted_values, pct):
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+def run_scenario(name, context, iterations=50, warmup=3):
+    """
+    Run scenario ``name`` and summarise it: latency percentiles (ms), queries
+    and database time per request, and the peak memory allocated by one
+    request (measured on an extra run, as tracing slows every allocation).
+    """
+    _, build = SCENARIOS[name]
+    for _ in range(warmup):
+        _send(context, build(context))
+
+    latencies, queries, db_times, statuses = [], [], [], {}
+    for _ in range(iterations):
+        spec = build(context)
+        with count_queries() as timer:
+            started = time.perf_counter()
+            response = _send(context, spec)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(timer.queries)
+        db_times.append(timer.seconds * 1000)
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    spec = build(context)
+    tracemalloc.start()
+    try:
+        _send(context, spec)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "iterations": iterations,
+        "statuses": statuses,
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 2),
+            "p95": round(_percentile(latencies, 95), 2),
+            "p99": round(_percentile(latencies, 99), 2),
+            "mean": round(statistics.mean(latencies), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "queries": {"median": statistics.median(queries), "max": max(queries)},
+        "db_ms": {"median": round(statistics.median(db_times), 2)},
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(baseline, results, threshold=0.2):
+    """
+    ``[(scenario, metric, old, new, change)]`` for every p50/p95 latency, query
+    count and peak memory that grew by more than ``threshold`` (a fraction)
+    over ``baseline``.
+    """
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        pairs = [
+            ('latency p50 ms', old['latency_ms']['p50'], result['latency_ms']['p50']),
+            ('latency p95 ms', old['latency_ms']['p95'], result['latency_ms']['p95']),
+            ('queries max', old['queries']['max'], result['queries']['max']),
+            ('peak memory kb', old['peak_memory_kb'], result['peak_memory_kb']),
+        ]
+        for metric, before, after in pairs:
+            if before and (after - before) / before > threshold:
+                regressions.append((name, metric, before, after, (after - before) / before))
+    return regressions
@@ -0,0 +1,128 @@
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Cookie marking a client that wrote recently and must read from the primary
+PIN_COOKIE = 'db_primary'
+
+# The same pin for clients that send no cookies, such as the cross-origin
+# frontend: a response header holding the Unix time the pin expires, which
+# the client echoes back on its requests until then
+PIN_HEADER = 'X-DB-Primary-Until'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Routing state of the current request; None outside requests (commands,
+# ingest workers, thread pools), where every query goes to default
+_request = ContextVar('db_routing', default=None)
+
+
+class _Routing:
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+def replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class ReplicaRouter:
+    """
+    Sends reads of read-only requests to a random DATABASE_REPLICAS alias
+    and everything else to default.
+
+    Reads go to default when no replica is configured, outside a request,
+    for unsafe methods, after the request wrote anything, inside a
+    transaction on default, and for a client pinned by ReplicaMiddleware
+    after a recent write. So a client always reads its own writes, even
+    though replicas lag.
+    """
+
+    def db_for_read(self, model, **hints):
+        routing = _request.get()
+        if routing is None or routing.pinned or routing.wrote or not replicas():
+            return DEFAULT_DB_ALIAS
+        # A transaction on default must see its own uncommitted rows
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas())
+
+    def db_for_write(self, model, **hints):
+        routing = _request.get()
+        if routing is not None:
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema through replication
+        return db not in replicas()
+
+
+class ReplicaMiddleware:
+    """
+    Lets ReplicaRouter send the reads of safe requests to replicas, and pins
+    a client to the primary for REPLICA_STICKY_SECONDS after a request of
+    theirs wrote, to cover replication lag. The pin is sent both as a
+    short-lived cookie and as a PIN_HEADER response header; a request
+    carrying either one, unexpired, reads from the primary.
+
+    Async under ASGI: sync_to_async runs the sync views in a copy of this
+    context, which shares the same _Routing object, so a write made there
+    still pins the rest of the request.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 5)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        routing, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(routing, response)
+
+    async def __acall__(self, request):
+        routing, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        return self.finish(routing, response)
+
+    @staticmethod
+    def start(request):
+        pinned = request.method not in SAFE_METHODS or PIN_COOKIE in request.COOKIES or _pinned_until(request) > time.time()
+        routing = _Routing(pinned=pinned)
+        return routing, _request.set(routing)
+
+    def finish(self, routing, response):
+        if routing.wrote and replicas():
+            response.set_cookie(PIN_COOKIE, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+            response[PIN_HEADER] = str(int(time.time()) + self.sticky_seconds)
+        return response
+
+
+def _pinned_until(request):
+    # Expiry from the echoed PIN_HEADER; 0 when absent or malformed
+    try:
+        return int(request.headers.get(PIN_HEADER, 0))
+    except ValueError:
+        return 0
@@ -0,0 +1,184 @@
+from bisect import bisect_right
+from datetime import date, timedelta
+from itertools import product
+
+from django.conf import settings
+
+ANY = '*'
+
+# What a due day is a day of. FILING_MONTH, the rule scoring has always
+# used, takes the month the return was filed in, so a return filed a month
+# or more late only shows its delay past that month's due day.
+# RETURN_PERIOD takes the month after the return period, which is the
+# statutory deadline. Switching GST_DUE_DATE_BASIS changes Delay_days and
+# can flip Pass/Fail; run ``manage.py rescore`` afterwards so stored
+# filings and scores are recomputed under the new rule.
+FILING_MONTH = 'filing_month'
+RETURN_PERIOD = 'return_period'
+DUE_DATE_BASES = (FILING_MONTH, RETURN_PERIOD)
+
+# Turnover bands, in rupees
+UPTO_5CR = 'upto_5cr'
+ABOVE_5CR = 'above_5cr'
+FIVE_CRORE = 5_00_00_000
+
+# States whose GSTR3B falls due on the 22nd for turnover up to 5 crore
+GSTR3B_DAY_22_STATES = frozenset([
+    "Chhattisgarh", "Madhya Pradesh", "Gujarat", "Daman and Diu",
+    "Dadra and Nagar Haveli", "Maharashtra", "Karnataka", "Goa",
+    "Lakshadweep", "Kerala", "Tamil Nadu", "Puducherry",
+    "Andaman and Nicobar Islands", "Telangana", "Andhra Pradesh"
+])
+
+# Due-date rule versions. A version applies to return periods from its
+# effective_from month until the next version starts. Each rule gives the
+# day of the month on which the return falls due (see FILING_MONTH and
+# RETURN_PERIOD), for (return_type, state group, turnover band); ANY matches everything and
+# the most specific rule wins. When CBIC moves a deadline, append a version
+# rather than editing one, so older periods keep being judged by the dates
+# that applied to them.
+DUE_DATE_RULES = [
+    {
+        'effective_from': date(2017, 7, 1),
+        'state_groups': {'gstr3b_day_22': GSTR3B_DAY_22_STATES},
+        'rules': [
+            ('GSTR3B', ANY, ABOVE_5CR, 20),
+            ('GSTR3B', 'gstr3b_day_22', UPTO_5CR, 22),
+            ('GSTR3B', ANY, UPTO_5CR, 24),
+            ('GSTR1', ANY, ANY, 11),
+            (ANY, ANY, ANY, 13),
+        ],
+    },
+]
+
+
+def turnover_band(annual_turnover):
+    # An unknown turnover is held to the earliest deadline
+    if annual_turnover is None or annual_turnover > FIVE_CRORE:
+        return ABOVE_5CR
+    return UPTO_5CR
+
+
+def _specificity(rule):
+    return sum(part != ANY for part in rule[:3])
+
+
+class DueDateRules:
+    """
+    Due dates of GST returns, compiled once from a list of rule versions.
+
+    Every (version, return type, state group, turnover band) is resolved to a
+    due day up front, so a lookup is a few dict hits. The due date is that
+    day of the filing month or of the month after the return period,
+    depending on ``basis``; filings without a period are judged against
+    their filing month either way.
+    """
+
+    def __init__(self, versions, basis=FILING_MONTH):
+        versions = sorted(versions, key=lambda version: version['effective_from'])
+        if not versions:
+            raise ValueError("At least one due-date rule version is required.")
+        if basis not in DUE_DATE_BASES:
+            raise ValueError(f"Unknown due-date basis '{basis}'; use one of {', '.join(DUE_DATE_BASES)}.")
+        self.basis = basis
+        self._starts = [self._period_key(version['effective_from']) for version in versions]
+        self._state_groups = []
+        self._return_types = []
+        self._days = []
+        for version in versions:
+            state_groups = {
+                state: group for group, states in version['state_groups'].items() for state in states
+            }
+            rules = sorted(version['rules'], key=_specificity, reverse=True)
+            return_types = {rule[0] for rule in rules} | {ANY}
+            groups = set(version['state_groups']) | {ANY}
+            days = {}
+            for return_type, group, band in product(return_types, groups, (UPTO_5CR, ABOVE_5CR)):
+                for rule_type, rule_group, rule_band, day in rules:
+                    if rule_type in (return_type, ANY) and rule_group in (group, ANY) and rule_band in (band, ANY):
+                        days[(return_type, group, band)] = day
+                        break
+                else:
+                    raise ValueError(f"No due-date rule for {return_type}/{group}/{band} from {version['effective_from']}.")
+            self._state_groups.append(state_groups)
+            self._return_types.append(return_types)
+            self._days.append(days)
+        self._due_dates = {}
+
+    @staticmethod
+    def _period_key(value):
+        return value.year * 100 + value.month
+
+    @classmethod
+    def _previous_period(cls, date_of_filing):
+        # The period a return without one is taken to cover
+        return cls._period_key(date_of_filing.replace(day=1) - timedelta(days=1))
+
+    def due_day(self, return_type, state, annual_turnover, period_key):
+        """Day of the month after ``period_key`` (YYYYMM) on which the return is due."""
+        index = max(0, bisect_right(self._starts, period_key) - 1)
+        if return_type not in self._return_types[index]:
+            return_type = ANY
+        group = self._state_groups[index].get(state, ANY)
+        return self._days[index][(return_type, group, turnover_band(annual_turnover))]
+
+    def due_date(self, return_type, state, annual_turnover, period_key=None, date_of_filing=None):
+        """
+        Due date of a return for ``period_key`` (YYYYMM) filed on
+        ``date_of_filing``. Without a period, the month before
+        ``date_of_filing`` is taken as the period. The filing date is
+        required under the FILING_MONTH basis.
+        """
+        if period_key is None:
+            period_key = self._previous_period(date_of_filing)
+        return self._due(period_key, self.due_day(return_type, state, annual_turnover, period_key), date_of_filing)
+
+    def period_due_date(self, return_type, state, annual_turnover, period_key):
+        """Statutory due date of the return for ``period_key``, in the month after it, whatever the basis."""
+        return self._period_due(period_key, self.due_day(return_type, state, annual_turnover, period_key))
+
+    def _due(self, period_key, day, date_of_filing):
+        if self.basis == FILING_MONTH:
+            return date_of_filing.replace(day=day)
+        return self._period_due(period_key, day)
+
+    def _period_due(self, period_key, day):
+        due = self._due_dates.get((period_key, day))
+        if due is None:
+            year, month = divmod(period_key, 100)
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            due = self._due_dates[(period_key, day)] = date(year, month, day)
+        return due
+
+    def delay(self, return_type, state, annual_turnover, date_of_filing, period_key=None):
+        """Days ``date_of_filing`` is past the due date, 0 if on time."""
+        due = self.due_date(return_type, state, annual_turnover, period_key, date_of_filing)
+        return max(0, (date_of_filing - due).days)
+
+    def delays(self, return_types, states, annual_turnovers, dates_of_filing, period_keys):
+        """
+        Column-wise ``delay`` for many filings in one call: each argument is a
+        sequence with one entry per filing. Returns the list of delays, None
+        where a filing has no date. Rule resolution and due dates are
+        memoised, so the cost per filing is a few dict hits.
+        """
+        resolved = {}
+        delays = []
+        for return_type, state, turnover, filed, period_key in zip(
+            return_types, states, annual_turnovers, dates_of_filing, period_keys,
+        ):
+            if filed is None:
+                delays.append(None)
+                continue
+            if period_key is None:
+                period_key = self._previous_period(filed)
+            key = (return_type, state, turnover, period_key)
+            day = resolved.get(key)
+            if day is None:
+                day = resolved[key] = self.due_day(return_type, state, turnover, period_key)
+            delays.append(max(0, (filed - self._due(period_key, day, filed)).days))
+        return delays
+
+
+# Compiled once per process
+due_date_rules = DueDateRules(DUE_DATE_RULES, basis=getattr(settings, 'GST_DUE_DATE_BASIS', FILING_MONTH))
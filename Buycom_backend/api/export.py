@@ -0,0 +1,197 @@
+import csv
+import io
+import json
+import zlib
+from datetime import date
+
+from django.db import router
+
+from .filters import filter_filings, get_filing_ordering
+from .models import CompanyGSTRecord
+from .pagination import KeysetPagination
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # In requirements.txt; without it only parquet is refused
+    pa = pq = None
+
+# Exported column -> ORM path. The raw TP payload (additional_data) and the
+# address JSON are left out to keep extracts flat.
+EXPORT_COLUMNS = {
+    'id': 'id',
+    'gstin': 'company_id',
+    'legal_name': 'company__legal_name',
+    'trade_name': 'company__trade_name',
+    'company_type': 'company__company_type',
+    'state': 'company__state',
+    'city': 'company__city',
+    'registration_date': 'company__registration_date',
+    'last_update': 'company__last_update',
+    'fetch_date': 'company__fetch_date',
+    'annual_turnover': 'company__annual_turnover',
+    'return_type': 'return_type',
+    'return_period': 'return_period',
+    'return_status': 'return_status',
+    'year': 'year',
+    'month': 'month',
+    'date_of_filing': 'date_of_filing',
+    'delayed_filling': 'delayed_filling',
+    'Delay_days': 'Delay_days',
+    'result': 'result',
+}
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet'),
+}
+
+# Rows per server-side cursor fetch, and per Parquet row group
+CHUNK_SIZE = 5000
+
+
+class ExportError(ValueError):
+    """Raised for an export that cannot be produced (bad format, missing pyarrow)."""
+
+
+def export_rows(params):
+    """
+    Filtered and ordered filing rows as tuples in EXPORT_COLUMNS order.
+
+    Accepts the same filters and ?ordering= as the company list. Rows are
+    read through a server-side cursor, CHUNK_SIZE at a time.
+    """
+    path, descending = get_filing_ordering(params)
+    queryset = filter_filings(CompanyGSTRecord.objects.all(), params)
+    queryset = queryset.order_by(*KeysetPagination.order_by(path, descending))
+    # Choose the database now: a streamed response reads its rows after the
+    # request, where the router would send them to default
+    queryset = queryset.using(router.db_for_read(CompanyGSTRecord))
+    return queryset.values_list(*EXPORT_COLUMNS.values()).iterator(chunk_size=CHUNK_SIZE)
+
+
+def _csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for count, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if count % 1000 == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def _ndjson_chunks(rows):
+    columns = list(EXPORT_COLUMNS)
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, row)), default=str))
+        if len(lines) == 1000:
+            yield ('\n'.join(lines) + '\n').encode()
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode()
+
+
+class _Sink(io.RawIOBase):
+    """Write-only file that hands what Parquet writes back to the generator."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ('id', pa.int64()),
+        ('gstin', pa.string()),
+        ('legal_name', pa.string()),
+        ('trade_name', pa.string()),
+        ('company_type', pa.string()),
+        ('state', pa.string()),
+        ('city', pa.string()),
+        ('registration_date', pa.date32()),
+        ('last_update', pa.date32()),
+        ('fetch_date', pa.date32()),
+        ('annual_turnover', pa.int64()),
+        ('return_type', pa.string()),
+        ('return_period', pa.string()),
+        ('return_status', pa.string()),
+        ('year', pa.int16()),
+        ('month', pa.int16()),
+        ('date_of_filing', pa.date32()),
+        ('delayed_filling', pa.string()),
+        ('Delay_days', pa.int32()),
+        ('result', pa.string()),
+    ])
+
+
+def _parquet_chunks(rows):
+    schema = _parquet_schema()
+    sink = _Sink()
+    writer = pq.ParquetWriter(sink, schema, compression='snappy')
+
+    def row_group(batch):
+        columns = list(zip(*batch))
+        writer.write_table(pa.Table.from_arrays(
+            [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema,
+        ))
+        return sink.drain()
+
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == CHUNK_SIZE:
+            yield row_group(batch)
+            batch = []
+    if batch:
+        yield row_group(batch)
+    writer.close()
+    yield sink.drain()
+
+
+def _gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def check_format(export_format):
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unknown format '{export_format}'. Choose from: {', '.join(EXPORT_FORMATS)}.")
+    if export_format == 'parquet' and pa is None:
+        raise ExportError("Parquet export needs pyarrow, which is not installed.")
+
+
+def export_chunks(rows, export_format='csv', compress=False):
+    """Encode ``rows`` from export_rows as ``export_format``, yielding bytes as they are ready."""
+    check_format(export_format)
+    chunks = {'csv': _csv_chunks, 'ndjson': _ndjson_chunks, 'parquet': _parquet_chunks}[export_format](rows)
+    return _gzip(chunks) if compress else chunks
+
+
+def export_filename(export_format, compress=False, today=None):
+    name = f"filings-{(today or date.today()):%Y%m%d}.{EXPORT_FORMATS[export_format][1]}"
+    return name + '.gz' if compress else name
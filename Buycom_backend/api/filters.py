@@ -0,0 +1,73 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+# Query parameter -> ORM lookup, mirroring the filters on the checker page
+FILING_FILTERS = {
+    'legal_name': 'company__legal_name__icontains',
+    'gstin': 'company__gstin__icontains',
+    'state': 'company__state__icontains',
+    'result': 'result',
+    'return_type': 'return_type',
+}
+
+# Sort key accepted in ?ordering= -> ORM path
+FILING_ORDERING = {
+    'id': 'id',
+    'gstin': 'company_id',
+    'legal_name': 'company__legal_name',
+    'state': 'company__state',
+    'fetch_date': 'company__fetch_date',
+    'date_of_filing': 'date_of_filing',
+    'return_period': 'period_key',
+    'delayed_filling': 'delayed_filling',
+    'Delay_days': 'Delay_days',
+    'result': 'result',
+}
+
+
+def filter_filings(queryset, params):
+    """Apply the filing filters present in ``params`` (a QueryDict) to ``queryset``."""
+    lookups = {
+        lookup: params[name]
+        for name, lookup in FILING_FILTERS.items()
+        if params.get(name)
+    }
+    return queryset.filter(**lookups)
+
+
+def get_filing_ordering(params):
+    """
+    Return ``(path, descending)`` for the ``ordering`` query parameter, e.g.
+    ``?ordering=-legal_name``. Defaults to ascending id.
+    """
+    ordering = params.get('ordering') or 'id'
+    descending = ordering.startswith('-')
+    key = ordering.lstrip('-')
+    if key not in FILING_ORDERING:
+        raise ValidationError({"ordering": f"Unknown sort key '{key}'. Choose from: {', '.join(FILING_ORDERING)}."})
+    return FILING_ORDERING[key], descending
+
+
+def get_sparse_fields(params, available):
+    """
+    Return ``(fields, exclude)`` from the ``fields`` and ``exclude`` query
+    parameters, comma separated lists checked against ``available``.
+    ``fields`` is None when not given.
+    """
+    selected = {}
+    for name in ('fields', 'exclude'):
+        value = params.get(name)
+        if value is None:
+            selected[name] = None
+            continue
+        names = [part.strip() for part in value.split(',') if part.strip()]
+        unknown = [part for part in names if part not in available]
+        if unknown:
+            raise ValidationError({name: f"Unknown field(s) {', '.join(unknown)}. Choose from: {', '.join(available)}."})
+        selected[name] = names
+    return selected['fields'], selected['exclude']
+
+
+class FilingFilter(BaseFilterBackend):
+    def filter_queryset(self, request, queryset, view):
+        return filter_filings(queryset, request.query_params)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+import weakref
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .gst_client import ASP_ID, PASSWORD, GSTAPIError, gst_client
+from .metrics import observe_upstream
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+
+class AsyncGSTClient:
+    """
+    asyncio counterpart of GSTClient for views served by the ASGI app.
+
+    Calls go through an httpx.AsyncClient, so a process can keep hundreds of
+    upstream fetches in flight without a thread each. The rate limiter,
+    circuit breaker, retry policy and response cache are those of ``client``,
+    so sync and async callers share one quota and one view of upstream health.
+    Their database queries run on the request's thread-sensitive sync thread,
+    whose connection Django recycles at the end of the request like a view's.
+    """
+
+    def __init__(self, client, max_connections=None):
+        self.client = client
+        self.max_connections = max_connections or getattr(settings, 'GST_API_ASYNC_MAX_CONNECTIONS', 200)
+        # httpx clients are bound to the event loop they were first used on
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def _session(self):
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.is_closed:
+            connect, read = self.client.timeout
+            session = httpx.AsyncClient(
+                timeout=httpx.Timeout(read, connect=connect),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+            )
+            self._sessions[loop] = session
+        return session
+
+    async def _send(self, url, query, label):
+        client = self.client
+        client._check_circuit(label)
+        if client.limiter and not await client.limiter.aacquire():
+            raise client._rate_limited(label)
+
+        started = time.perf_counter()
+        try:
+            response = await self._session().get(url, params=query)
+        except httpx.HTTPError as e:
+            logger.error("Request to %s failed: %s", label, e)
+            response = None
+        observe_upstream(query.get("Action"), response, time.perf_counter() - started)
+        client._record(response)
+        return response
+
+    async def _get(self, url, params, label):
+        query = {"aspid": ASP_ID, "password": PASSWORD, **params}
+        for attempt in range(self.client.max_retries + 1):
+            response = await self._send(url, query, label)
+            delay = self.client._retry_delay(response, attempt, label)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        return self.client._parse(response, label)
+
+    async def _fetch(self, url, params, label, check):
+        return check(await self._get(url, params, label), label)
+
+    async def fetch_gstin(self, gstin, today=None, use_cache=True):
+        """Async ``GSTClient.fetch_gstin``: same calls, cache and result."""
+        cache = self.client.cache
+        calls = self.client._fetch_plan(gstin, today)
+        cached = {}
+        if cache and use_cache:
+            cached = await sync_to_async(cache.get_many)([call[0] for call in calls])
+
+        tasks = {
+            key: asyncio.ensure_future(self._fetch(*args))
+            for key, *args in calls if key not in cached
+        }
+        try:
+            # Surface errors in the same order the sequential calls did
+            results = [cached[key] if key in cached else await tasks[key] for key, *_ in calls]
+        except GSTAPIError:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        if cache and tasks:
+            await sync_to_async(cache.set_many)(
+                {call[0]: payload for call, payload in zip(calls, results) if call[0] in tasks}
+            )
+        return self.client._combine(results)
+
+
+# Shared async client, backed by the shared sync client's limiter, breaker and cache
+async_gst_client = AsyncGSTClient(gst_client)
@@ -0,0 +1,125 @@
+import logging
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.db.models import F, Q, Sum
+from django.utils import timezone
+
+from .models import UpstreamCacheEntry
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTLS = {'TP': 24 * 60 * 60, 'RETTRACK': 6 * 60 * 60}
+
+
+class UpstreamCache:
+    """
+    Database-backed TTL cache for GST API responses.
+
+    Entries are keyed by ``(action, gstin, fy)`` and expire after the TTL of
+    their action (``GST_CACHE_TTL``). The table is bounded by
+    ``GST_CACHE_MAX_ENTRIES``: expired rows go first, then the least recently
+    used ones. Being in the database, entries are shared by every worker
+    process and survive restarts. Cache failures are logged and treated as
+    misses, so they never fail a fetch.
+    """
+
+    # Cull the table once every this many writes
+    cull_every = 100
+
+    def __init__(self, ttls=None, max_entries=None):
+        self.ttls = ttls or getattr(settings, 'GST_CACHE_TTL', DEFAULT_TTLS)
+        self.max_entries = max_entries or getattr(settings, 'GST_CACHE_MAX_ENTRIES', 100_000)
+        self._lock = threading.Lock()
+        self._counters = Counter()
+        self._writes = 0
+
+    def _count(self, outcome, action, n=1):
+        with self._lock:
+            self._counters[(outcome, action)] += n
+
+    def get_many(self, keys):
+        """Return ``{key: payload}`` for the keys with a live entry, in one query."""
+        keys = list(keys)
+        if not keys:
+            return {}
+        now = timezone.now()
+        match = Q()
+        for action, gstin, fy in keys:
+            match |= Q(action=action, gstin=gstin, fy=fy)
+
+        try:
+            entries = list(UpstreamCacheEntry.objects.filter(match, expires_at__gt=now).values('id', 'action', 'gstin', 'fy', 'payload'))
+            if entries:
+                UpstreamCacheEntry.objects.filter(id__in=[entry['id'] for entry in entries]).update(
+                    last_accessed=now, hit_count=F('hit_count') + 1,
+                )
+        except DatabaseError as e:
+            logger.warning("GST cache read failed: %s", e)
+            connection.close_if_unusable_or_obsolete()
+            entries = []
+
+        found = {(entry['action'], entry['gstin'], entry['fy']): entry['payload'] for entry in entries}
+        for key in keys:
+            self._count('hit' if key in found else 'miss', key[0])
+        return found
+
+    def set_many(self, payloads):
+        """Store ``{(action, gstin, fy): payload}`` in one upsert."""
+        if not payloads:
+            return
+        now = timezone.now()
+        entries = [
+            UpstreamCacheEntry(
+                action=action, gstin=gstin, fy=fy, payload=payload, fetched_at=now,
+                expires_at=now + timedelta(seconds=self.ttls.get(action, 0)), last_accessed=now,
+            )
+            for (action, gstin, fy), payload in payloads.items()
+        ]
+        try:
+            UpstreamCacheEntry.objects.bulk_create(
+                entries,
+                update_conflicts=True,
+                unique_fields=['action', 'gstin', 'fy'],
+                update_fields=['payload', 'fetched_at', 'expires_at', 'last_accessed'],
+            )
+            with self._lock:
+                self._writes += 1
+                cull = self._writes % self.cull_every == 0
+            if cull:
+                self.cull()
+        except DatabaseError as e:
+            logger.warning("GST cache write failed: %s", e)
+            connection.close_if_unusable_or_obsolete()
+
+    def cull(self):
+        """Drop expired entries, then the least recently used beyond the size bound."""
+        UpstreamCacheEntry.objects.filter(expires_at__lte=timezone.now()).delete()
+        excess = UpstreamCacheEntry.objects.count() - self.max_entries
+        if excess > 0:
+            oldest = UpstreamCacheEntry.objects.order_by('last_accessed').values_list('id', flat=True)[:excess]
+            UpstreamCacheEntry.objects.filter(id__in=list(oldest)).delete()
+
+    def clear(self):
+        UpstreamCacheEntry.objects.all().delete()
+
+    def stats(self):
+        """Hit/miss counters of this process, and the state of the shared table."""
+        with self._lock:
+            counters = dict(self._counters)
+        actions = sorted({action for _, action in counters})
+        table = UpstreamCacheEntry.objects.aggregate(total_hits=Sum('hit_count'))
+        return {
+            "process": {
+                action: {"hits": counters.get(('hit', action), 0), "misses": counters.get(('miss', action), 0)}
+                for action in actions
+            },
+            "entries": UpstreamCacheEntry.objects.count(),
+            "expired": UpstreamCacheEntry.objects.filter(expires_at__lte=timezone.now()).count(),
+            "max_entries": self.max_entries,
+            "total_hits": table["total_hits"] or 0,
+        }
@@ -0,0 +1,243 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+from django.conf import settings
+from django.db import connection
+from requests.adapters import HTTPAdapter
+
+from .gst_cache import UpstreamCache
+from .metrics import observe_upstream
+from .gst_throttle import RETRYABLE_STATUSES, CircuitBreaker, TokenBucket, backoff_delay, parse_retry_after
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+# API credentials
+ASP_ID = "1755060724"
+PASSWORD = "Cash@2020"
+BASE_URL = "https://gstapi.charteredinfo.com/commonapi/v1.1/search"
+RETURNS_URL = "https://gstapi.charteredinfo.com/commonapi/v1.0/returns"
+
+
+class GSTAPIError(Exception):
+    """Raised when the GST API call fails or returns an unusable payload."""
+
+
+class GSTAPIUnavailable(GSTAPIError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+    def __init__(self, message, retry_after=0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def financial_years(today=None):
+    """Return the two financial years (fy, fy3) fetched through RETTRACK."""
+    current_date = today or datetime.today()
+    current_year = current_date.year + 1
+    start_year = current_year - 1
+
+    # Financial year covering the last 12 months, and the one before it
+    fy = f"{start_year}-{str(current_year)[2:]}"
+    fy3 = f"{start_year - 1}-{str(start_year)[2:]}"
+    return fy, fy3
+
+
+class GSTClient:
+    """
+    Keep-alive client for gstapi.charteredinfo.com.
+
+    One requests.Session is shared by every caller so connections are pooled
+    and reused, every call carries a (connect, read) timeout, and the calls
+    for a single GSTIN are fanned out on a shared thread pool. Valid
+    responses are kept in an UpstreamCache, so a GSTIN fetched again within
+    the TTL costs no upstream calls.
+
+    Every upstream call takes a token from a bucket shared by all processes
+    (``GST_API_RATE_LIMIT`` requests per second), 429 and 5xx responses are
+    retried with jittered exponential backoff honouring Retry-After, and a
+    circuit breaker refuses calls while the provider keeps failing.
+    """
+
+    def __init__(self, timeout=None, pool_size=None, cache=None):
+        self.search_url = getattr(settings, 'GST_API_SEARCH_URL', BASE_URL)
+        self.returns_url = getattr(settings, 'GST_API_RETURNS_URL', RETURNS_URL)
+        self.timeout = timeout or getattr(settings, 'GST_API_TIMEOUT', (5, 30))
+        pool_size = pool_size or getattr(settings, 'GST_API_POOL_SIZE', 20)
+        if cache is None and getattr(settings, 'GST_CACHE_ENABLED', True):
+            cache = UpstreamCache()
+        self.cache = cache
+
+        rate = getattr(settings, 'GST_API_RATE_LIMIT', 10)
+        self.limiter = TokenBucket(
+            "gst_api", rate,
+            capacity=getattr(settings, 'GST_API_RATE_BURST', None),
+            max_wait=getattr(settings, 'GST_API_RATE_MAX_WAIT', 30),
+        ) if rate else None
+        self.max_retries = getattr(settings, 'GST_API_MAX_RETRIES', 3)
+        self.backoff_base = getattr(settings, 'GST_API_BACKOFF_BASE', 0.5)
+        self.backoff_max = getattr(settings, 'GST_API_BACKOFF_MAX', 10)
+        self.breaker = CircuitBreaker(
+            threshold=getattr(settings, 'GST_API_BREAKER_THRESHOLD', 5),
+            reset_timeout=getattr(settings, 'GST_API_BREAKER_RESET', 30),
+        )
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="gst-api")
+
+    def _check_circuit(self, label):
+        if not self.breaker.allow():
+            logger.error("Circuit open, not calling %s.", label)
+            raise GSTAPIUnavailable(f"GST API is unavailable; not calling {label}.", self.breaker.retry_after())
+
+    def _rate_limited(self, label):
+        # The breaker let us through but no request is made
+        self.breaker.release()
+        logger.error("Rate limit wait too long for %s.", label)
+        return GSTAPIError(f"GST API rate limit reached; could not call {label}.")
+
+    def _record(self, response):
+        # 429 and 4xx mean the provider is up; only server errors trip the breaker
+        if response is None or response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+    def _retry_delay(self, response, attempt, label):
+        """Seconds to wait before retrying ``response`` (None: request failed), or None to stop."""
+        if response is not None and response.status_code not in RETRYABLE_STATUSES:
+            return None
+        if attempt == self.max_retries:
+            return None
+
+        delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+        retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+        if retry_after is not None:
+            if retry_after > self.backoff_max:
+                return None
+            delay = retry_after
+        logger.warning("Retrying %s in %.1fs (attempt %s of %s)", label, delay, attempt + 2, self.max_retries + 1)
+        return delay
+
+    def _parse(self, response, label):
+        if response is None:
+            raise GSTAPIError(f"Failed to fetch data from {label}.")
+
+        logger.info("Response from %s (status code: %s)", label, response.status_code)
+        if response.status_code != 200:
+            logger.error("Failed to fetch data from %s.", label)
+            raise GSTAPIError(f"Failed to fetch data from {label}.")
+
+        try:
+            return response.json()
+        except ValueError as e:
+            logger.error("Invalid JSON in %s response.", label)
+            raise GSTAPIError(f"Invalid response structure from {label}.") from e
+
+    def _send(self, url, query, label):
+        """One rate-limited call through the breaker. None if the request itself failed."""
+        self._check_circuit(label)
+        if self.limiter and not self.limiter.acquire():
+            raise self._rate_limited(label)
+
+        started = time.perf_counter()
+        try:
+            response = self.session.get(url, params=query, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.error("Request to %s failed: %s", label, e)
+            response = None
+        observe_upstream(query.get("Action"), response, time.perf_counter() - started)
+        self._record(response)
+        return response
+
+    def _get(self, url, params, label):
+        query = {"aspid": ASP_ID, "password": PASSWORD, **params}
+        for attempt in range(self.max_retries + 1):
+            response = self._send(url, query, label)
+            delay = self._retry_delay(response, attempt, label)
+            if delay is None:
+                break
+            time.sleep(delay)
+        return self._parse(response, label)
+
+    @staticmethod
+    def _check_taxpayer(gst_data, label):
+        if not gst_data:
+            logger.error("No data found in %s response.", label)
+            raise GSTAPIError(f"No data found in {label} response.")
+        return gst_data
+
+    @staticmethod
+    def _check_returns(data, label):
+        if "EFiledlist" not in data:
+            logger.error("No 'EFiledlist' field in %s response.", label)
+            raise GSTAPIError(f"Invalid response structure from {label}.")
+        return data
+
+    def _fetch_plan(self, gstin, today=None):
+        """``(cache key, url, params, label, check)`` of each call ``fetch_gstin`` makes."""
+        fy, fy3 = financial_years(today)
+        return [
+            (("TP", gstin, ""), self.search_url, {"Action": "TP", "Gstin": gstin}, "first API", self._check_taxpayer),
+            (("RETTRACK", gstin, fy), self.returns_url, {"Action": "RETTRACK", "Gstin": gstin, "fy": fy}, "second API", self._check_returns),
+            (("RETTRACK", gstin, fy3), self.returns_url, {"Action": "RETTRACK", "Gstin": gstin, "fy": fy3}, "third API", self._check_returns),
+        ]
+
+    @staticmethod
+    def _combine(results):
+        gst_data, data2, data3 = results
+        return gst_data, data2.get("EFiledlist", []) + data3.get("EFiledlist", [])
+
+    def search_taxpayer(self, gstin, label="first API"):
+        return self._check_taxpayer(self._get(self.search_url, {"Action": "TP", "Gstin": gstin}, label), label)
+
+    def track_returns(self, gstin, fy, label="second API"):
+        return self._check_returns(self._get(self.returns_url, {"Action": "RETTRACK", "Gstin": gstin, "fy": fy}, label), label)
+
+    def _fetch(self, url, params, label, check):
+        return check(self._get(url, params, label), label)
+
+    def _fetch_in_worker(self, *args):
+        # The rate limiter queries the database from this pool thread, which
+        # outlives any request; close its connection so idle workers don't
+        # each hold one open
+        try:
+            return self._fetch(*args)
+        finally:
+            connection.close()
+
+    def fetch_gstin(self, gstin, today=None, use_cache=True):
+        """
+        Fetch the TP search and both RETTRACK years for ``gstin`` concurrently.
+
+        Cached responses are used when ``use_cache`` is set; only the misses
+        go upstream. Returns ``(gst_data, return_data)`` where ``return_data``
+        is the combined EFiledlist of both financial years.
+        """
+        calls = self._fetch_plan(gstin, today)
+        cached = self.cache.get_many(call[0] for call in calls) if self.cache and use_cache else {}
+        futures = {
+            key: self.executor.submit(self._fetch_in_worker, *args)
+            for key, *args in calls if key not in cached
+        }
+        try:
+            # Surface errors in the same order the sequential calls did
+            results = [cached[key] if key in cached else futures[key].result() for key, *_ in calls]
+        except GSTAPIError:
+            for future in futures.values():
+                future.cancel()
+            raise
+
+        if self.cache and futures:
+            self.cache.set_many({call[0]: payload for call, payload in zip(calls, results) if call[0] in futures})
+        return self._combine(results)
+
+
+# Shared client, reused across requests so connections stay warm
+gst_client = GSTClient()
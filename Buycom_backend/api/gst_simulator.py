@@ -0,0 +1,169 @@
+import json
+import logging
+import math
+import random
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .seed import STATES, company_rng, synthetic_returns, synthetic_taxpayer, synthetic_turnover
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+SEARCH_PATH = '/commonapi/v1.1/search'
+RETURNS_PATH = '/commonapi/v1.0/returns'
+
+# Months of filings generated per GSTIN, enough to cover both RETTRACK years
+SIMULATED_MONTHS = 36
+
+_STATE_NAMES = {code: state for code, state, _ in STATES}
+
+
+def _state_of(gstin):
+    # Unknown state codes fall back to the most common state
+    return _STATE_NAMES.get(int(gstin[:2]) if gstin[:2].isdigit() else 0, "Maharashtra")
+
+
+def _valid_gstin(gstin):
+    return len(gstin) == 15 and gstin.isalnum() and gstin[:2].isdigit()
+
+
+def _fy_months(fy):
+    """``(first, last)`` period keys (YYYYMM) of a RETTRACK ``fy`` such as 2024-25, or None."""
+    start, sep, _ = fy.partition('-')
+    if not sep or not start.isdigit():
+        return None
+    start = int(start)
+    return start * 100 + 4, (start + 1) * 100 + 3
+
+
+class GSTSimulator:
+    """
+    Stand-in for the GST API answering TP search and RETTRACK with payloads
+    generated from each GSTIN, the same for a given ``seed`` and day.
+
+    Latency is drawn from a lognormal distribution around ``latency_ms``
+    (``latency_sigma`` 0 makes it constant), ``error_rate`` of the requests
+    get a 500, and every ``burst_every`` seconds the server answers 429 with
+    Retry-After for ``burst_length`` seconds, as the provider does when a
+    quota runs out.
+    """
+
+    def __init__(self, seed=0, latency_ms=150, latency_sigma=0.5, max_latency_ms=5000,
+                 error_rate=0.0, burst_every=0, burst_length=0, retry_after=1, today=None):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.max_latency_ms = max_latency_ms
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.retry_after = retry_after
+        self.today = today
+        self.started = time.monotonic()
+        self.rng = random.Random(seed)
+        self.statuses = {}
+        self._lock = threading.Lock()
+
+    def latency(self):
+        """Seconds to wait before answering one request."""
+        if self.latency_ms <= 0:
+            return 0
+        if self.latency_sigma <= 0:
+            return self.latency_ms / 1000
+        sample = self.rng.lognormvariate(math.log(self.latency_ms), self.latency_sigma)
+        return min(sample, self.max_latency_ms) / 1000
+
+    def in_burst(self, now=None):
+        if not self.burst_every or not self.burst_length:
+            return False
+        elapsed = (now if now is not None else time.monotonic()) - self.started
+        return elapsed % self.burst_every < self.burst_length
+
+    def _company(self, gstin):
+        # Drawn in the same order as seed.synthetic_company, so a seeded
+        # GSTIN comes back with the profile and filings it was seeded with
+        state = _state_of(gstin)
+        rng = company_rng(gstin, self.seed)
+        turnover = synthetic_turnover(rng)
+        return state, turnover, synthetic_taxpayer(gstin, state, rng), rng
+
+    def taxpayer(self, gstin):
+        return self._company(gstin)[2]
+
+    def returns(self, gstin, fy):
+        """``EFiledlist`` entries of ``gstin`` whose return period falls in ``fy``, or None for a bad fy."""
+        months = _fy_months(fy)
+        if months is None:
+            return None
+        state, turnover, _, rng = self._company(gstin)
+        entries = synthetic_returns(gstin, state, turnover, rng, self.today or date.today(), SIMULATED_MONTHS)
+        first, last = months
+        return [
+            entry for entry in entries
+            if first <= int(entry["ret_prd"][2:]) * 100 + int(entry["ret_prd"][:2]) <= last
+        ]
+
+    def respond(self, path, query):
+        """``(status, headers, payload)`` for one request, before the simulated latency."""
+        if self.in_burst():
+            return 429, {"Retry-After": str(self.retry_after)}, {"error": "Too many requests"}
+        if self.error_rate and self.rng.random() < self.error_rate:
+            return 500, {}, {"error": "Internal server error"}
+
+        action = query.get("Action")
+        gstin = query.get("Gstin", "").upper()
+        if not query.get("aspid") or not query.get("password"):
+            return 401, {}, {"error": "Missing aspid or password"}
+        if not _valid_gstin(gstin):
+            return 400, {}, {"error": f"Invalid GSTIN '{gstin}'"}
+        if path == SEARCH_PATH and action == "TP":
+            return 200, {}, self.taxpayer(gstin)
+        if path == RETURNS_PATH and action == "RETTRACK":
+            filings = self.returns(gstin, query.get("fy", ""))
+            if filings is None:
+                return 400, {}, {"error": f"Invalid fy '{query.get('fy')}'"}
+            return 200, {}, {"EFiledlist": filings}
+        return 404, {}, {"error": "Unknown action"}
+
+    def record(self, status):
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def make_server(self, host='127.0.0.1', port=9000):
+        handler = type('SimulatorHandler', (_Handler,), {'simulator': self})
+        return _Server((host, port), handler)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, as the client pools its connections
+    protocol_version = 'HTTP/1.1'
+    simulator = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        status, headers, payload = self.simulator.respond(url.path, query)
+        time.sleep(self.simulator.latency())
+
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.simulator.record(status)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Load runs open hundreds of connections at once
+    request_queue_size = 1024
@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from email.utils import parsedate_to_datetime
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from .models import UpstreamRateLimit
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying: quota exhausted or a transient server error
+RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class TokenBucket:
+    """
+    Token bucket stored in the database, so the quota is shared by every
+    thread and every worker process.
+
+    The bucket holds up to ``capacity`` tokens and refills at ``rate`` tokens
+    per second. ``acquire`` reserves a token under a row lock and sleeps
+    outside the transaction until it is due, so callers are served in the
+    order they reserved. A database error is logged and lets the call
+    through rather than blocking upstream traffic.
+    """
+
+    def __init__(self, name, rate, capacity=None, max_wait=30):
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.max_wait = max_wait
+
+    def _reserve(self):
+        with transaction.atomic():
+            bucket, _ = UpstreamRateLimit.objects.select_for_update().get_or_create(
+                name=self.name, defaults={'tokens': self.capacity, 'updated_at': timezone.now()},
+            )
+            now = timezone.now()
+            elapsed = max(0.0, (now - bucket.updated_at).total_seconds())
+            tokens = min(self.capacity, bucket.tokens + elapsed * self.rate) - 1
+            wait = max(0.0, -tokens / self.rate)
+            if wait > self.max_wait:
+                return None
+            UpstreamRateLimit.objects.filter(pk=bucket.pk).update(tokens=tokens, updated_at=now)
+        return wait
+
+    def _try_reserve(self):
+        # A database error lets the call through at once. The connection is
+        # dropped if it is broken, here in the thread that owns it, so later
+        # calls do not reuse it
+        try:
+            return self._reserve()
+        except DatabaseError as e:
+            logger.warning("Rate limiter %s unavailable: %s", self.name, e)
+            connection.close_if_unusable_or_obsolete()
+            return 0.0
+
+    def acquire(self):
+        """Take one token, sleeping until it is due. False if the wait would exceed ``max_wait``."""
+        wait = self._try_reserve()
+        if wait is None:
+            return False
+        if wait:
+            time.sleep(wait)
+        return True
+
+    async def aacquire(self):
+        """Async ``acquire``: waits on the event loop instead of blocking a thread."""
+        wait = await sync_to_async(self._try_reserve)()
+        if wait is None:
+            return False
+        if wait:
+            await asyncio.sleep(wait)
+        return True
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the upstream is down.
+
+    After ``threshold`` consecutive failures the breaker opens and every call
+    is refused for ``reset_timeout`` seconds. Then a single trial call is let
+    through (half-open): success closes the breaker, failure opens it again.
+    State is kept per process.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, threshold=5, reset_timeout=30):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                logger.info("Circuit half-open, sending a trial request.")
+                self.state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the trial request still in flight
+            return False
+
+    def release(self):
+        """Give back a trial slot that was not used for a request."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuit closed.")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                if self.state != self.OPEN:
+                    logger.warning("Circuit opened after %s consecutive failures.", self.failures)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def retry_after(self):
+        """Seconds until the breaker lets a trial request through."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0
+            return max(0, round(self.reset_timeout - (time.monotonic() - self.opened_at)))
+
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with full jitter for retry number ``attempt`` (from 0)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=dt_timezone.utc)
+    return max(0.0, (retry_at - datetime.now(dt_timezone.utc)).total_seconds())
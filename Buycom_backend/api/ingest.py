@@ -0,0 +1,128 @@
+import logging
+from datetime import datetime
+
+from django.db import transaction
+
+from .models import CompanyProfile, CompanyGSTRecord
+from .scoring import refresh_delays, refresh_scorecard
+from .versions import touch
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+# Upstream-derived columns refreshed when a GSTIN is fetched again. Maker and
+# checker owned columns (delays, result) are left untouched, and so is
+# annual_turnover unless the caller supplies one; delays are recomputed only
+# for filings whose date changed, as the old ones no longer match it.
+PROFILE_UPDATE_FIELDS = [
+    'legal_name', 'trade_name', 'company_type', 'principal_address',
+    'registration_date', 'last_update', 'state', 'city', 'additional_data',
+    'fetch_date',
+]
+FILING_UPDATE_FIELDS = ['date_of_filing', 'return_status', 'year', 'month', 'period_key']
+
+
+def _parse_date(value, input_format):
+    return datetime.strptime(value, input_format).date() if value else None
+
+
+def parse_return_period(period):
+    """Split an MMYYYY ret_prd into ``(year, month, period_key)``, Nones if malformed."""
+    if not period or len(period) != 6 or not period.isdigit():
+        return None, None, None
+    month, year = int(period[:2]), int(period[2:])
+    return year, month, year * 100 + month
+
+
+def upsert_filings(gstin, gst_data, return_data, annual_turnover=None, delayed_filling='',
+                   Delay_days=None, result='N/A', return_status='Active', refresh_score=True):
+    """
+    Upsert the company profile for ``gstin``, then write every filing in
+    ``return_data`` in one statement.
+
+    Filings are keyed by (gstin, return_type, return_period): new periods are
+    inserted and existing ones refreshed in place. ``annual_turnover``, when
+    given, is stored on the profile whether it is new or not; otherwise a
+    new profile gets 0 and an existing one keeps its turnover. Existing
+    filings whose date changed get their delays recomputed. Raises
+    ValueError on a malformed date before anything is written. Unless ``refresh_score`` is
+    off, the company's Score row is refreshed afterwards. Returns the number
+    of rows.
+    """
+    fetch_date = datetime.today().date()
+
+    # Company level values are the same for every filing, parse them once
+    registration_date = _parse_date(gst_data.get("rgdt"), '%d/%m/%Y')
+    last_update = _parse_date(gst_data.get("lstupdt"), '%d/%m/%Y')
+    principal_address = gst_data.get("pradr", {})
+    address = principal_address.get("addr", {})
+    state = address.get("loc", "N/A")
+    city = address.get("city", "N/A")
+
+    profile = CompanyProfile(
+        gstin=gstin,
+        legal_name=gst_data.get("lgnm"),
+        trade_name=gst_data.get("tradeNam"),
+        company_type=gst_data.get("ctb"),
+        principal_address=principal_address,
+        registration_date=registration_date,
+        last_update=last_update,
+        state=state,
+        city=city,
+        additional_data=gst_data,
+        fetch_date=fetch_date,
+        annual_turnover=0 if annual_turnover is None else annual_turnover,
+    )
+    profile_fields = PROFILE_UPDATE_FIELDS if annual_turnover is None else [*PROFILE_UPDATE_FIELDS, 'annual_turnover']
+
+    # Last occurrence wins if upstream repeats a period; a single upsert
+    # statement cannot touch the same row twice
+    filings = {}
+    for record in return_data:
+        return_type = record.get("rtntype")
+        period = record.get("ret_prd", "")
+        year, month, period_key = parse_return_period(period)
+        filings[(return_type, period)] = CompanyGSTRecord(
+            company_id=gstin,
+            date_of_filing=_parse_date(record.get("dof"), '%d-%m-%Y'),
+            return_type=return_type,
+            return_period=period,
+            return_status=return_status,
+            year=year,
+            month=month,
+            period_key=period_key,
+            delayed_filling=delayed_filling,
+            Delay_days=Delay_days,
+            result=result,
+        )
+
+    with transaction.atomic():
+        CompanyProfile.objects.bulk_create(
+            [profile],
+            update_conflicts=True,
+            unique_fields=['gstin'],
+            update_fields=profile_fields,
+        )
+        previous = {
+            (return_type, period): date_of_filing
+            for return_type, period, date_of_filing in CompanyGSTRecord.objects.filter(company_id=gstin)
+            .values_list('return_type', 'return_period', 'date_of_filing')
+        }
+        CompanyGSTRecord.objects.bulk_create(
+            filings.values(),
+            update_conflicts=True,
+            unique_fields=['company', 'return_type', 'return_period'],
+            update_fields=FILING_UPDATE_FIELDS,
+        )
+        redated = [filing for key, filing in filings.items() if key in previous and previous[key] != filing.date_of_filing]
+        if redated or refresh_score:
+            company = CompanyProfile.objects.only('gstin', 'state', 'annual_turnover').get(gstin=gstin)
+        if redated:
+            refresh_delays(company, redated)
+        # Reports show the Score row, so it changes under the same version
+        if refresh_score:
+            refresh_scorecard(company)
+        touch([gstin])
+
+    logger.info("Upserted %s filings for GSTIN %s", len(filings), gstin)
+    return len(filings)
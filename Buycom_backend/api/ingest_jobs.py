@@ -0,0 +1,235 @@
+import csv
+import io
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .gst_client import gst_client, GSTAPIError
+from .ingest import upsert_filings
+from .models import CompanyProfile, IngestJob, IngestJobItem
+from .scoring import score_company
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+GSTIN_PATTERN = re.compile(r'^[0-9]{2}[A-Z]{5}[0-9]{4}[A-Z][A-Z0-9]Z[A-Z0-9]$')
+
+
+class IngestJobError(ValueError):
+    """Raised when a batch of GSTINs cannot be turned into a job."""
+
+
+def max_concurrency():
+    return getattr(settings, 'GST_INGEST_MAX_CONCURRENCY', 16)
+
+
+def stale_seconds():
+    return getattr(settings, 'GST_INGEST_STALE_SECONDS', 900)
+
+
+def parse_gstin_rows(rows):
+    """
+    Normalise ``rows`` into ``[(gstin, annual_turnover)]``.
+
+    Each row is a GSTIN string, a ``{"gstin": ..., "annual_turnover": ...}``
+    dict or a ``[gstin, annual_turnover]`` sequence. Duplicates keep their
+    first occurrence. Raises IngestJobError listing every invalid row.
+    """
+    parsed, seen, errors = [], set(), []
+    for line, row in enumerate(rows, start=1):
+        if isinstance(row, str):
+            gstin, turnover = row, None
+        elif isinstance(row, dict):
+            gstin, turnover = row.get('gstin'), row.get('annual_turnover')
+        else:
+            row = list(row) + [None]
+            gstin, turnover = row[0], row[1]
+
+        gstin = (gstin or '').strip().upper()
+        if not GSTIN_PATTERN.match(gstin):
+            errors.append(f"Row {line}: invalid GSTIN '{gstin}'.")
+            continue
+        if turnover in ('', None):
+            turnover = None
+        else:
+            try:
+                turnover = int(turnover)
+            except (TypeError, ValueError):
+                errors.append(f"Row {line}: invalid annual_turnover '{turnover}'.")
+                continue
+
+        if gstin not in seen:
+            seen.add(gstin)
+            parsed.append((gstin, turnover))
+
+    if errors:
+        raise IngestJobError(errors)
+    if not parsed:
+        raise IngestJobError(["No GSTINs provided."])
+    return parsed
+
+
+def read_gstin_csv(text):
+    """Rows of a ``gstin[,annual_turnover]`` CSV, with or without a header."""
+    rows = [row for row in csv.reader(io.StringIO(text)) if row and any(cell.strip() for cell in row)]
+    if rows and rows[0][0].strip().lower() == 'gstin':
+        rows = rows[1:]
+    return rows
+
+
+def create_job(rows, concurrency=None):
+    """Create an IngestJob with one pending item per GSTIN in ``rows``."""
+    items = parse_gstin_rows(rows)
+    max_items = getattr(settings, 'GST_INGEST_MAX_ITEMS', 50_000)
+    if len(items) > max_items:
+        raise IngestJobError([f"At most {max_items} GSTINs per job."])
+
+    concurrency = max(1, min(int(concurrency or 4), max_concurrency()))
+    job = IngestJob.objects.create(concurrency=concurrency, total=len(items))
+    IngestJobItem.objects.bulk_create(
+        (IngestJobItem(job=job, gstin=gstin, annual_turnover=turnover) for gstin, turnover in items),
+        batch_size=1000,
+    )
+    return job
+
+
+def ingest_gstin(gstin, annual_turnover=None):
+    """Fetch and upsert one GSTIN, and score it when a turnover is given."""
+    gst_data, return_data = gst_client.fetch_gstin(gstin)
+    # With a turnover the company is rescored below, which also saves its Score
+    upsert_filings(gstin, gst_data, return_data, annual_turnover=annual_turnover,
+                   refresh_score=annual_turnover is None)
+
+    if annual_turnover is not None:
+        score_company(CompanyProfile.objects.only('gstin', 'state', 'annual_turnover').get(gstin=gstin))
+
+
+def _process_item(item_id):
+    # Claim the item; another worker resuming the same job may have it already
+    claimed = IngestJobItem.objects.filter(pk=item_id, status=IngestJobItem.PENDING).update(
+        status=IngestJobItem.RUNNING, started_at=timezone.now(),
+    )
+    if not claimed:
+        return
+
+    item = IngestJobItem.objects.get(pk=item_id)
+    status, error = IngestJobItem.DONE, ''
+    try:
+        ingest_gstin(item.gstin, item.annual_turnover)
+    except (GSTAPIError, ValueError) as e:
+        status, error = IngestJobItem.FAILED, str(e)
+    except Exception as e:
+        logger.exception("Ingest of GSTIN %s failed", item.gstin)
+        status, error = IngestJobItem.FAILED, repr(e)
+
+    IngestJobItem.objects.filter(pk=item_id).update(
+        status=status, error=error[:255], attempts=item.attempts + 1, finished_at=timezone.now(),
+    )
+
+
+def _worker(item_id):
+    try:
+        _process_item(item_id)
+    finally:
+        # Pool threads outlive the request; don't leave their connections open
+        connection.close()
+
+
+def requeue_stale_items(job):
+    """
+    Put back to pending the items of ``job`` claimed more than
+    GST_INGEST_STALE_SECONDS ago and still running: their runner died.
+    Items a live runner is working on are left to it. Returns the count.
+    """
+    cutoff = timezone.now() - timedelta(seconds=stale_seconds())
+    return job.items.filter(
+        Q(started_at__lt=cutoff) | Q(started_at=None), status=IngestJobItem.RUNNING,
+    ).update(status=IngestJobItem.PENDING, started_at=None)
+
+
+def run_job(job_id):
+    """
+    Process every pending item of a job on a pool of ``job.concurrency``
+    threads. Items already done or failed are skipped, so calling this again
+    after a restart resumes the job where it stopped.
+
+    The job is marked completed once no item is pending or running. Items
+    still running under another runner are not taken over, so resuming a
+    job that is live elsewhere fetches nothing twice.
+    """
+    job = IngestJob.objects.get(pk=job_id)
+    if job.status == IngestJob.COMPLETED:
+        return job
+
+    requeued = requeue_stale_items(job)
+    if requeued:
+        logger.info("Ingest job %s: retrying %s GSTINs left running by a dead runner", job.pk, requeued)
+    IngestJob.objects.filter(pk=job.pk).update(
+        status=IngestJob.RUNNING, started_at=job.started_at or timezone.now(),
+    )
+
+    item_ids = list(job.items.filter(status=IngestJobItem.PENDING).values_list('id', flat=True))
+    logger.info("Ingest job %s: %s pending GSTINs, concurrency %s", job.pk, len(item_ids), job.concurrency)
+    with ThreadPoolExecutor(max_workers=job.concurrency, thread_name_prefix=f"ingest-{job.pk}") as pool:
+        list(pool.map(_worker, item_ids))
+
+    unfinished = job.items.filter(status__in=[IngestJobItem.PENDING, IngestJobItem.RUNNING]).exists()
+    if not unfinished:
+        IngestJob.objects.filter(pk=job.pk).update(status=IngestJob.COMPLETED, finished_at=timezone.now())
+    job.refresh_from_db()
+    return job
+
+
+def start_job(job):
+    """
+    Run ``job`` on a background thread so the request can return at once.
+
+    The thread is a daemon of the web worker process: it dies with it on a
+    restart, deploy or worker recycle (gunicorn max_requests), and nothing
+    restarts it. Run ``manage.py resume_ingest_jobs`` after a restart to
+    finish such jobs; items that were in flight are retried once they are
+    older than GST_INGEST_STALE_SECONDS.
+    """
+    def target():
+        try:
+            run_job(job.pk)
+        except Exception:
+            logger.exception("Ingest job %s crashed", job.pk)
+        finally:
+            connection.close()
+
+    threading.Thread(target=target, name=f"ingest-job-{job.pk}", daemon=True).start()
+
+
+def job_progress(job):
+    """Counts per item status, and an ETA from the rate achieved so far."""
+    counts = dict.fromkeys([IngestJobItem.PENDING, IngestJobItem.RUNNING, IngestJobItem.DONE, IngestJobItem.FAILED], 0)
+    counts.update(job.items.values_list('status').annotate(n=Count('id')).order_by())
+
+    finished = counts[IngestJobItem.DONE] + counts[IngestJobItem.FAILED]
+    remaining = job.total - finished
+    eta_seconds = None
+    if job.status == IngestJob.COMPLETED:
+        eta_seconds = 0
+    elif job.started_at and finished:
+        elapsed = (timezone.now() - job.started_at).total_seconds()
+        eta_seconds = round(elapsed / finished * remaining, 1)
+
+    return {
+        "id": job.pk,
+        "status": job.status,
+        "concurrency": job.concurrency,
+        "total": job.total,
+        "counts": counts,
+        "eta_seconds": eta_seconds,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
@@ -0,0 +1,88 @@
+import json
+import platform
+import subprocess
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.benchmark import SCENARIOS, BenchmarkContext, compare, run_scenario, seeded_gstins
+from api.models import CompanyGSTRecord, CompanyProfile
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Run timed API scenarios in process against the seeded portfolio "
+        "(see seed_portfolio) and record latency percentiles, queries per "
+        "request and peak memory as a JSON baseline. With --compare, report "
+        "what regressed against an earlier baseline. Update scenarios write "
+        "to the seeded companies; run this on a benchmark database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', help=f"Comma separated scenarios (default: all). Available: {', '.join(SCENARIOS)}.")
+        parser.add_argument('--iterations', type=int, default=50, help="Timed requests per scenario (default 50).")
+        parser.add_argument('--warmup', type=int, default=3, help="Untimed requests first (default 3).")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed for picking companies (default 0).")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--compare', help="Baseline JSON file to compare against.")
+        parser.add_argument('--threshold', type=float, default=0.2, help="Growth reported as a regression (default 0.2 = 20%%).")
+        parser.add_argument('--fail-on-regression', action='store_true', help="Exit with an error if anything regressed.")
+
+    def handle(self, *args, **options):
+        names = options['scenarios'].split(',') if options['scenarios'] else list(SCENARIOS)
+        unknown = [name for name in names if name not in SCENARIOS]
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(unknown)}.")
+        gstins = seeded_gstins()
+        if not gstins:
+            raise CommandError("No seeded companies; run seed_portfolio first.")
+        if settings.DEBUG:
+            self.stdout.write(self.style.WARNING("DEBUG is on: every query is also logged, which inflates timings."))
+
+        meta = {
+            "timestamp": datetime.now().isoformat(timespec='seconds'),
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+            "companies": CompanyProfile.objects.count(),
+            "filings": CompanyGSTRecord.objects.count(),
+            "iterations": options['iterations'],
+        }
+        self.stdout.write(f"{meta['companies']} companies, {meta['filings']} filings on {meta['database']}.")
+
+        context = BenchmarkContext(gstins, seed=options['seed'])
+        results = {}
+        for name in names:
+            result = results[name] = run_scenario(name, context, options['iterations'], options['warmup'])
+            latency = result['latency_ms']
+            self.stdout.write(
+                f"  {name:<28} p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  "
+                f"p99 {latency['p99']:>8.2f} ms  queries {result['queries']['median']:>4}  "
+                f"peak {result['peak_memory_kb']:>9,.0f} KB  {result['statuses']}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({"meta": meta, "scenarios": results}, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = compare(baseline['scenarios'], results, options['threshold'])
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f"No regressions against {options['compare']}."))
+            for name, metric, before, after, change in regressions:
+                self.stdout.write(self.style.ERROR(f"  {name}: {metric} {before} -> {after} (+{change:.0%})"))
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}.")
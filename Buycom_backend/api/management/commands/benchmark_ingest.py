@@ -0,0 +1,128 @@
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from django.core.management.base import BaseCommand, CommandError
+
+
+def synthetic_gstins(count):
+    """Distinct, well-formed GSTINs for load runs."""
+    return [f"27AAAAA{i % 10000:04d}{chr(65 + i // 10000 % 26)}1Z5" for i in range(count)]
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, round(pct / 100 * (len(sorted_values) - 1)))
+    return sorted_values[index]
+
+
+async def drive(url, gstins, concurrency, refresh, timeout):
+    """POST one fetch per GSTIN to ``url`` with ``concurrency`` requests in flight."""
+    queue = asyncio.Queue()
+    for gstin in gstins:
+        queue.put_nowait(gstin)
+    latencies, statuses = [], {}
+
+    async def worker(client):
+        while True:
+            try:
+                gstin = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json={"gstin": gstin, "refresh": refresh})
+                outcome = str(response.status_code)
+            except httpx.HTTPError as e:
+                outcome = type(e).__name__
+            latencies.append(time.perf_counter() - started)
+            statuses[outcome] = statuses.get(outcome, 0) + 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=timeout, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    ingested = sum(count for outcome, count in statuses.items() if outcome.startswith('2'))
+    return {
+        "url": url,
+        "requests": len(gstins),
+        "concurrency": concurrency,
+        "statuses": statuses,
+        "elapsed_seconds": round(elapsed, 3),
+        "requests_per_second": round(len(gstins) / elapsed, 1) if elapsed else None,
+        "gstins_per_second": round(ingested / elapsed, 1) if elapsed else None,
+        "latency_ms": {
+            "mean": round(statistics.mean(latencies) * 1000, 1) if latencies else None,
+            "p50": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+            "p95": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+            "p99": round(percentile(latencies, 99) * 1000, 1) if latencies else None,
+        },
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive concurrent fetch-and-save requests against running servers and "
+        "compare them side by side, e.g. the WSGI app under gunicorn and the "
+        "ASGI app under uvicorn:\n"
+        "  gunicorn Buycom_backend.wsgi -w 4 --threads 8 -b :8000\n"
+        "  uvicorn Buycom_backend.asgi:application --workers 4 --port 8001\n"
+        "  manage.py benchmark_ingest "
+        "wsgi=http://localhost:8000/api/fetch_and_save_gst_record/ "
+        "asgi=http://localhost:8001/api/async/fetch_and_save_gst_record/\n"
+        "Point the servers at a stub upstream rather than the live GST API "
+        "(run_gst_simulator, via GST_API_SEARCH_URL and GST_API_RETURNS_URL), "
+        "and keep the rate limit above the offered load, so the numbers "
+        "measure the servers. Give several --concurrency values to ramp the "
+        "load and see where GSTINs per second stop growing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('targets', nargs='+', help="name=url of each endpoint to benchmark.")
+        parser.add_argument('--requests', type=int, default=500, help="Requests per target (default 500).")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[100],
+                            help="Requests in flight; several values are run in turn (default 100).")
+        parser.add_argument('--gstin-file', help="File with one GSTIN per line (default: synthetic GSTINs).")
+        parser.add_argument('--use-cache', action='store_true', help="Let the servers answer from the upstream cache.")
+        parser.add_argument('--timeout', type=float, default=120, help="Per-request timeout in seconds.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['targets']:
+            name, sep, url = target.partition('=')
+            if not sep or not url:
+                raise CommandError(f"Expected name=url, got '{target}'.")
+            targets.append((name, url))
+
+        if options['gstin_file']:
+            with open(options['gstin_file']) as f:
+                gstins = [line.strip() for line in f if line.strip()][:options['requests']]
+        else:
+            gstins = synthetic_gstins(options['requests'])
+
+        results = {}
+        for name, url in targets:
+            results[name] = []
+            for concurrency in options['concurrency']:
+                self.stdout.write(f"{name}: {len(gstins)} requests, {concurrency} in flight...")
+                result = asyncio.run(drive(url, gstins, concurrency, not options['use_cache'], options['timeout']))
+                results[name].append(result)
+                latency = result['latency_ms']
+                self.stdout.write(
+                    f"  {result['gstins_per_second']} GSTINs/s ({result['requests_per_second']} req/s) "
+                    f"in {result['elapsed_seconds']}s, "
+                    f"p50 {latency['p50']} ms, p95 {latency['p95']} ms, p99 {latency['p99']} ms, "
+                    f"statuses {result['statuses']}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
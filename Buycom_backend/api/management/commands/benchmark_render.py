@@ -0,0 +1,118 @@
+import json
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.models import CompanyGSTRecord, CompanyProfile
+from api.renderers import FastJSONRenderer, orjson
+from api.serializers import CompanyGSTRecordSerializer, CompanyGSTRecordSummarySerializer
+
+
+def synthetic_filings(count):
+    """Unsaved filings with their profiles, 20 per company, shaped like ingested rows."""
+    filings = []
+    for i in range(count):
+        if i % 20 == 0:
+            gstin = f"27AAAAA{i // 20 % 10000:04d}{chr(65 + i // 200000 % 26)}1Z5"
+            address = {"addr": {"bno": str(i), "st": "MG Road", "loc": "Andheri", "dst": "Mumbai", "stcd": "Maharashtra", "pncd": "400053"}}
+            company = CompanyProfile(
+                gstin=gstin, legal_name=f"Company {i // 20} Private Limited", trade_name=f"Company {i // 20}",
+                company_type="Private Limited Company", principal_address=address,
+                registration_date=date(2018, 7, 1), last_update=date(2024, 3, 1), state="Maharashtra",
+                city="Mumbai", additional_data={"gstin": gstin, "lgnm": f"Company {i // 20}", "pradr": address, "nba": ["Supplier of Services", "Retail Business"]},
+                fetch_date=date(2024, 10, 1), annual_turnover=40_000_000,
+            )
+        month = i % 12 + 1
+        filings.append(CompanyGSTRecord(
+            id=i + 1, company=company, date_of_filing=date(2024, month, 1) + timedelta(days=19 + i % 9),
+            return_type="GSTR3B" if i % 2 else "GSTR1", return_period=f"{month:02d}2024", return_status="Active",
+            year=2024, month=month, period_key=202400 + month, delayed_filling="Yes" if i % 9 > 4 else "No",
+            Delay_days=max(0, i % 9 - 4), result="Pass",
+        ))
+    return filings
+
+
+def values_rows(filings, columns):
+    # What QuerySet.values() would return for these rows
+    rows = []
+    for filing in filings:
+        row = {}
+        for path in columns:
+            value = filing
+            for part in path.split('__'):
+                value = getattr(value, part)
+            row[path] = value
+        rows.append(row)
+    return rows
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+class Command(BaseCommand):
+    help = (
+        "Time rendering of the company list with the stock JSONRenderer, the "
+        "orjson-backed FastJSONRenderer, and the .values() fast path with "
+        "FastJSONRenderer. Rows are synthetic and built in memory, so the "
+        "numbers cover serialization and rendering only, not the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000], help="Row counts to time (default 10000 100000).")
+        parser.add_argument('--full', action='store_true', help="Render every column, as the default list does (default: the ?view=summary columns).")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement; the best is reported (default 3).")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING("orjson is not installed: FastJSONRenderer falls back to the stock renderer."))
+        serializer_class = CompanyGSTRecordSerializer if options['full'] else CompanyGSTRecordSummarySerializer
+        stock, fast = JSONRenderer(), FastJSONRenderer()
+        repeat = max(1, options['repeat'])
+
+        results = {}
+        for count in options['rows']:
+            filings = synthetic_filings(count)
+            serializer = serializer_class(filings, many=True)
+            columns = serializer.child.get_values_columns()
+            rows = values_rows(filings, columns.values())
+
+            serialize_time, data = best_of(repeat, lambda: serializer_class(filings, many=True).data)
+            stock_time, stock_body = best_of(repeat, lambda: stock.render(data))
+            fast_time, fast_body = best_of(repeat, lambda: fast.render(data))
+            values_time, values_body = best_of(repeat, lambda: fast.render(serializer.child.from_values(rows)))
+
+            result = {
+                "rows": count,
+                "bytes": len(stock_body),
+                "identical_output": stock_body == fast_body == values_body,
+                "seconds": {
+                    "serializer+stock": round(serialize_time + stock_time, 3),
+                    "serializer+orjson": round(serialize_time + fast_time, 3),
+                    "values+orjson": round(values_time, 3),
+                },
+                "render_only_seconds": {"stock": round(stock_time, 3), "orjson": round(fast_time, 3)},
+            }
+            results[str(count)] = result
+            seconds = result['seconds']
+            self.stdout.write(f"{count} rows, {len(stock_body) / 1e6:.1f} MB, identical output: {result['identical_output']}")
+            for name, value in seconds.items():
+                speedup = seconds['serializer+stock'] / value if value else 0
+                self.stdout.write(f"  {name:<18} {value:>8.3f}s  ({speedup:.1f}x)")
+            self.stdout.write(
+                f"  {'render only':<18} stock {stock_time:.3f}s, orjson {fast_time:.3f}s "
+                f"({stock_time / fast_time if fast_time else 0:.1f}x)"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
@@ -0,0 +1,78 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.models import CompanyGSTRecord
+from api.query_plans import HOT_QUERIES, LARGE_TABLES, check_plans, table_rows
+
+
+def _describe(plan, depth=0):
+    # One line per plan node, indented like EXPLAIN's text format
+    relation = f" on {plan['Relation Name']}" if 'Relation Name' in plan else ''
+    index = f" using {plan['Index Name']}" if 'Index Name' in plan else ''
+    lines = [f"{'  ' * depth}-> {plan['Node Type']}{relation}{index} (cost {plan['Total Cost']}, rows {plan['Plan Rows']})"]
+    for child in plan.get('Plans', []):
+        lines.extend(_describe(child, depth + 1))
+    return lines
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot queries (company detail, scoring, reports, list "
+        "pages, admin filters) and fail if any reads the filings or company "
+        "table with a sequential scan. Run it against a large seeded "
+        "database (seed_portfolio 1m), as on small tables a scan is often "
+        "the planner's right call. PostgreSQL only."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--queries', help=f"Comma separated queries (default: all). Available: {', '.join(HOT_QUERIES)}.")
+        parser.add_argument('--min-rows', type=int, default=10000,
+                            help="Tables smaller than this may be scanned (default 10000).")
+        parser.add_argument('--analyze', action='store_true', help="ANALYZE the tables first so estimates are current.")
+        parser.add_argument('--show-plans', action='store_true', help="Print every plan, not only failing ones.")
+        parser.add_argument('--output', help="Write the plans as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Query plans are checked on PostgreSQL only.")
+        names = options['queries'].split(',') if options['queries'] else list(HOT_QUERIES)
+        unknown = [name for name in names if name not in HOT_QUERIES]
+        if unknown:
+            raise CommandError(f"Unknown query(s): {', '.join(unknown)}.")
+
+        if options['analyze']:
+            with connection.cursor() as cursor:
+                for table in LARGE_TABLES:
+                    cursor.execute(f"ANALYZE {connection.ops.quote_name(table)}")
+        rows = table_rows()
+        filings_table = CompanyGSTRecord._meta.db_table
+        if rows.get(filings_table, 0) < options['min_rows']:
+            raise CommandError(
+                f"{filings_table} has about {rows.get(filings_table, 0)} rows, fewer than --min-rows; "
+                f"seed a large dataset first (seed_portfolio 1m) or run with --analyze."
+            )
+        self.stdout.write(', '.join(f"{table}: ~{count:,} rows" for table, count in sorted(rows.items())))
+
+        results = check_plans(names, options['min_rows'])
+        failures = []
+        for name, result in results.items():
+            if result['sequential_scans']:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(
+                    f"  {name:<26} SEQ SCAN on {', '.join(result['sequential_scans'])} (cost {result['cost']})"
+                ))
+            else:
+                skipped = f"  (small: {', '.join(result['skipped_tables'])} scanned)" if result['skipped_tables'] else ''
+                self.stdout.write(f"  {name:<26} ok (cost {result['cost']}){skipped}")
+            if result['sequential_scans'] or options['show_plans']:
+                self.stdout.write('\n'.join(f"      {line}" for line in _describe(result['plan'])))
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Plans written to {options['output']}"))
+        if failures:
+            raise CommandError(f"{len(failures)} query(s) scan a large table sequentially: {', '.join(failures)}.")
+        self.stdout.write(self.style.SUCCESS(f"All {len(results)} queries use an index."))
@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from api.export import EXPORT_FORMATS, ExportError, check_format, export_chunks, export_rows
+from api.filters import FILING_FILTERS
+
+
+class Command(BaseCommand):
+    help = (
+        "Write filing rows to a file (or stdout) as CSV, NDJSON or Parquet, "
+        "optionally gzipped. Takes the same filters and ordering as the "
+        "company list; rows are streamed, so memory use stays flat."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', default='csv', choices=list(EXPORT_FORMATS), help="Output format (default csv).")
+        parser.add_argument('--gzip', action='store_true', help="Gzip the output.")
+        parser.add_argument('--output', '-o', default='-', help="Output file (default: stdout).")
+        parser.add_argument('--ordering', help="Sort key, as ?ordering= on the company list.")
+        for name in FILING_FILTERS:
+            parser.add_argument(f"--{name.replace('_', '-')}", dest=name, help=f"Filter on {name}, as ?{name}=.")
+
+    def handle(self, *args, **options):
+        params = {name: options[name] for name in [*FILING_FILTERS, 'ordering'] if options[name]}
+        try:
+            check_format(options['format'])
+            rows = export_rows(params)
+        except ExportError as e:
+            raise CommandError(str(e))
+        except ValidationError as e:
+            raise CommandError(str(e.detail))
+
+        chunks = export_chunks(rows, options['format'], options['gzip'])
+        if options['output'] == '-':
+            out = sys.stdout.buffer
+            for chunk in chunks:
+                out.write(chunk)
+            out.flush()
+        else:
+            with open(options['output'], 'wb') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}"))
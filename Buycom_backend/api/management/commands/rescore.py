@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.rescore import company_chunks, load_filings, score_chunk, write_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute delays, Pass/Fail results and scorecards for every company, "
+        "e.g. after the due-date rules, GST_DUE_DATE_BASIS or thresholds change. Companies are read "
+        "in GSTIN order, a chunk at a time, scored on a pool of worker processes "
+        "and written back in batches; only filings whose values change are "
+        "updated. With --checkpoint, progress is saved after every chunk and "
+        "--resume continues from the last one written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=date.fromisoformat, help="Only companies fetched on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--gstin-file', help="File with one GSTIN per line (extra CSV columns are ignored).")
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPU count).")
+        parser.add_argument('--chunk-size', type=int, default=500, help="Companies per chunk (default 500).")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per UPDATE statement (default 1000).")
+        parser.add_argument('--dry-run', action='store_true', help="Score and report, but write nothing.")
+        parser.add_argument('--checkpoint', help="JSON file recording the last GSTIN written.")
+        parser.add_argument('--resume', action='store_true', help="Start after the GSTIN recorded in --checkpoint.")
+
+    def handle(self, *args, **options):
+        gstins = None
+        if options['gstin_file']:
+            with open(options['gstin_file']) as f:
+                gstins = [line.split(',')[0].strip().upper() for line in f if line.strip()]
+            gstins = [gstin for gstin in gstins if gstin and gstin != 'GSTIN']
+
+        after = None
+        totals = {'companies': 0, 'filings': 0, 'changed': 0}
+        if options['resume']:
+            if not options['checkpoint']:
+                raise CommandError("--resume needs --checkpoint.")
+            if os.path.exists(options['checkpoint']):
+                with open(options['checkpoint']) as f:
+                    checkpoint = json.load(f)
+                after = checkpoint['last_gstin']
+                totals.update(checkpoint['totals'])
+                self.stdout.write(f"Resuming after GSTIN {after}.")
+
+        today = date.today()
+        workers = max(1, options['workers'])
+        started = time.monotonic()
+        run_totals = dict.fromkeys(totals, 0)
+
+        # Start the workers before the first query so no forked worker
+        # inherits the parent's database connection
+        connection.close()
+        with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+            pool.submit(os.getpid).result()
+
+            # Keep a bounded number of chunks in flight; results are written
+            # in order, so the checkpoint is always a clean prefix
+            in_flight = deque()
+            chunks = company_chunks(options['chunk_size'], after=after, since=options['since'], gstins=gstins)
+            for chunk in chunks:
+                companies = load_filings(chunk)
+                in_flight.append((chunk[-1][0], len(chunk), pool.submit(score_chunk, companies, today)))
+                if len(in_flight) >= workers * 2:
+                    self._finish(in_flight.popleft(), options, today, totals, run_totals, started)
+            while in_flight:
+                self._finish(in_flight.popleft(), options, today, totals, run_totals, started)
+
+        elapsed = time.monotonic() - started
+        rate = run_totals['filings'] / elapsed if elapsed else 0
+        verb = "would change" if options['dry_run'] else "changed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Rescored {run_totals['companies']} companies and {run_totals['filings']} filings "
+            f"({run_totals['changed']} {verb}) in {elapsed:.1f}s: {rate:,.0f} filings/s "
+            f"with {workers} workers."
+        ))
+
+    def _finish(self, entry, options, today, totals, run_totals, started):
+        last_gstin, companies, future = entry
+        changes, scorecards, filings = future.result()
+        if not options['dry_run']:
+            write_results(changes, scorecards, today, batch_size=options['batch_size'])
+
+        for counts in (totals, run_totals):
+            counts['companies'] += companies
+            counts['filings'] += filings
+            counts['changed'] += len(changes)
+
+        if options['checkpoint'] and not options['dry_run']:
+            with open(options['checkpoint'], 'w') as f:
+                json.dump({'last_gstin': last_gstin, 'totals': totals}, f)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"  ...{last_gstin}: {run_totals['companies']} companies, {run_totals['filings']} filings, "
+            f"{run_totals['changed']} changed, {run_totals['filings'] / elapsed if elapsed else 0:,.0f} filings/s"
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from api.ingest_jobs import job_progress, run_job
+from api.models import IngestJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Resume batch ingestion jobs left unfinished by a restart. Jobs run on "
+        "a thread of the web worker, which dies with it, so run this after "
+        "every restart or deploy. GSTINs that already finished are not "
+        "fetched again; GSTINs that were in flight are retried once older "
+        "than GST_INGEST_STALE_SECONDS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', type=int, help="Jobs to resume (default: every unfinished job).")
+
+    def handle(self, *args, **options):
+        jobs = IngestJob.objects.exclude(status=IngestJob.COMPLETED).order_by('id')
+        if options['job_ids']:
+            jobs = jobs.filter(pk__in=options['job_ids'])
+
+        for job_id in jobs.values_list('id', flat=True):
+            self.stdout.write(f"Resuming ingest job {job_id}...")
+            job = run_job(job_id)
+            counts = job_progress(job)['counts']
+            if job.status != IngestJob.COMPLETED:
+                self.stdout.write(self.style.WARNING(
+                    f"Job {job_id} still has {counts['running']} GSTINs running under another runner; "
+                    f"run this again later if it stops."
+                ))
+                continue
+            self.stdout.write(self.style.SUCCESS(
+                f"Job {job_id} completed: {counts['done']} done, {counts['failed']} failed."
+            ))
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from api.gst_simulator import RETURNS_PATH, SEARCH_PATH, GSTSimulator
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a local stand-in for the GST API (TP search and RETTRACK) with "
+        "generated payloads, configurable latency, errors and 429 bursts, for "
+        "load tests. Point the app at it with:\n"
+        "  GST_API_SEARCH_URL = 'http://localhost:9000/commonapi/v1.1/search'\n"
+        "  GST_API_RETURNS_URL = 'http://localhost:9000/commonapi/v1.0/returns'\n"
+        "GSTINs seeded by seed_portfolio with the same --seed and --today come "
+        "back with the data they were seeded with."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default 127.0.0.1).")
+        parser.add_argument('--port', type=int, default=9000, help="Port to listen on (default 9000).")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed of the generated payloads (default 0).")
+        parser.add_argument('--today', type=date.fromisoformat, help="Date the filings are generated as of (default: today).")
+        parser.add_argument('--latency-ms', type=float, default=150, help="Median response time in ms (default 150).")
+        parser.add_argument('--latency-sigma', type=float, default=0.5,
+                            help="Spread of the lognormal latency; 0 for constant latency (default 0.5).")
+        parser.add_argument('--max-latency-ms', type=float, default=5000, help="Latency cap in ms (default 5000).")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Share of requests answered 500 (default 0).")
+        parser.add_argument('--burst-every', type=float, default=0,
+                            help="Seconds between 429 bursts; 0 for none (default 0).")
+        parser.add_argument('--burst-length', type=float, default=0, help="Seconds each 429 burst lasts (default 0).")
+        parser.add_argument('--retry-after', type=int, default=1, help="Retry-After sent with 429s, in seconds (default 1).")
+
+    def handle(self, *args, **options):
+        simulator = GSTSimulator(
+            seed=options['seed'],
+            latency_ms=options['latency_ms'],
+            latency_sigma=options['latency_sigma'],
+            max_latency_ms=options['max_latency_ms'],
+            error_rate=options['error_rate'],
+            burst_every=options['burst_every'],
+            burst_length=options['burst_length'],
+            retry_after=options['retry_after'],
+            today=options['today'],
+        )
+        server = simulator.make_server(options['host'], options['port'])
+        base = f"http://{options['host']}:{options['port']}"
+        self.stdout.write(f"GST API simulator on {base}{SEARCH_PATH} and {base}{RETURNS_PATH}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Requests served by status: {dict(sorted(simulator.statuses.items()))}")
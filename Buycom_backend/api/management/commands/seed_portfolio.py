@@ -0,0 +1,46 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from api.seed import clear_portfolio, seed_portfolio
+
+SIZES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic portfolio of companies and filings for benchmarks: "
+        "a realistic mix of states, company types, monthly GSTR3B/GSTR1 and "
+        "quarterly CMP08 filers, and on-time and late filings, scored as "
+        "ingest would score them. Seeded GSTINs contain 'BNCH' and are "
+        "removed with --clear. The same --seed and --today always give the "
+        "same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('size', help="Number of filings, or one of: 1k, 100k, 1m.")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed (default 0).")
+        parser.add_argument('--today', type=date.fromisoformat, help="Date the portfolio is generated as of (default: today).")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Filings per transaction (default 5000).")
+        parser.add_argument('--clear', action='store_true', help="Delete previously seeded companies first.")
+
+    def handle(self, *args, **options):
+        size = options['size'].lower()
+        filings = SIZES[size] if size in SIZES else int(size.replace('_', ''))
+
+        if options['clear']:
+            self.stdout.write(f"Deleted {clear_portfolio()} seeded companies.")
+
+        started = time.monotonic()
+
+        def progress(companies, rows):
+            self.stdout.write(f"  ...{companies} companies, {rows} filings, {rows / (time.monotonic() - started):,.0f} filings/s")
+
+        companies, rows = seed_portfolio(
+            filings, seed=options['seed'], today=options['today'], batch_size=options['batch_size'],
+            progress=progress if filings >= 50_000 else None,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {companies} companies and {rows} filings in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,188 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+# Latency buckets in seconds, from a cached read to a slow upstream call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """
+    Prometheus-style histogram with fixed buckets, one series per label set.
+
+    An observation is a bisect and a few additions under a lock, cheap
+    enough to record on every request.
+    """
+
+    def __init__(self, name, documentation, labels, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # One counter per bucket plus +Inf, then the sum
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def expose(self):
+        """Lines of the Prometheus text format for this histogram."""
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, values in sorted(series.items()):
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values))
+            prefix = f"{labels}," if labels else ''
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-1]}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+REQUEST_LATENCY = Histogram(
+    'buycom_http_request_duration_seconds', "Time to answer a request, by URL name.",
+    ['view', 'method', 'status'],
+)
+REQUEST_QUERIES = Histogram(
+    'buycom_http_request_db_queries', "Database queries run by a request.",
+    ['view'], buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    'buycom_http_request_db_seconds', "Time a request spent in database queries.",
+    ['view'],
+)
+UPSTREAM_LATENCY = Histogram(
+    'buycom_upstream_request_duration_seconds', "GST API call latency, by action and HTTP status.",
+    ['action', 'status'],
+)
+
+REGISTRY = [REQUEST_LATENCY, REQUEST_QUERIES, REQUEST_DB_TIME, UPSTREAM_LATENCY]
+
+
+def metrics_enabled():
+    return getattr(settings, 'METRICS_ENABLED', True)
+
+
+def observe_upstream(action, response, seconds):
+    """Record one GST API call; ``response`` is None when the request itself failed."""
+    if metrics_enabled():
+        UPSTREAM_LATENCY.observe(seconds, action or 'unknown', 'error' if response is None else response.status_code)
+
+
+def render_metrics():
+    """Every metric in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.expose())
+    return '\n'.join(lines) + '\n'
+
+
+class QueryTimer:
+    """``execute_wrapper`` counting the queries of one request and their time."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _wrap_connections(stack, timer):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(timer))
+
+
+@contextmanager
+def count_queries():
+    """Count the queries run on this thread, on every database, inside the block."""
+    timer = QueryTimer()
+    with ExitStack() as stack:
+        _wrap_connections(stack, timer)
+        yield timer
+
+
+class MetricsMiddleware:
+    """
+    Records the latency, database query count and database time of every
+    request, labelled by URL name.
+
+    Metrics live in the memory of each process; with several workers each
+    one answers /api/metrics/ for itself. Queries run on other threads
+    (thread pools, sync_to_async(thread_sensitive=False)) are not counted.
+
+    Under ASGI the middleware stays async. Queries then run on the request's
+    thread-sensitive sync thread, so the query counter is installed there.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = metrics_enabled()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        with count_queries() as timer:
+            response = self.get_response(request)
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        started = time.perf_counter()
+        timer = QueryTimer()
+        stack = ExitStack()
+        await sync_to_async(_wrap_connections)(stack, timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.record(request, response, time.perf_counter() - started, timer)
+        return response
+
+    def record(self, request, response, elapsed, timer):
+        match = request.resolver_match
+        view = (match.url_name or match.view_name) if match else 'unmatched'
+        REQUEST_LATENCY.observe(elapsed, view, request.method, response.status_code)
+        REQUEST_QUERIES.observe(timer.queries, view)
+        REQUEST_DB_TIME.observe(timer.seconds, view)
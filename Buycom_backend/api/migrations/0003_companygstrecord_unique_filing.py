@@ -0,0 +1,32 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:19
+
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def dedupe_filings(apps, schema_editor):
+    # Re-fetching a GSTIN used to append a full copy of its filings; keep the
+    # most recently inserted row for each (gstin, return_type, return_period)
+    CompanyGSTRecord = apps.get_model('api', 'CompanyGSTRecord')
+    latest = (
+        CompanyGSTRecord.objects
+        .values('gstin', 'return_type', 'return_period')
+        .annotate(keep_id=Max('id'))
+        .values('keep_id')
+    )
+    CompanyGSTRecord.objects.exclude(id__in=latest).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_companygstrecord_delay_days'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_filings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='companygstrecord',
+            constraint=models.UniqueConstraint(fields=('gstin', 'return_type', 'return_period'), name='unique_gst_filing'),
+        ),
+    ]
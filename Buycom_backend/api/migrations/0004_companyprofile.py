@@ -0,0 +1,117 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+PROFILE_FIELDS = [
+    'legal_name', 'trade_name', 'company_type', 'principal_address',
+    'registration_date', 'last_update', 'state', 'city', 'additional_data',
+    'fetch_date', 'annual_turnover',
+]
+
+
+def create_profiles(apps, schema_editor):
+    # Collapse the per-filing copies of the TP payload into one profile per
+    # GSTIN, taken from the most recently inserted filing
+    CompanyGSTRecord = apps.get_model('api', 'CompanyGSTRecord')
+    CompanyProfile = apps.get_model('api', 'CompanyProfile')
+
+    latest_ids = list(
+        CompanyGSTRecord.objects.values('gstin').annotate(latest_id=Max('id')).values_list('latest_id', flat=True)
+    )
+    for start in range(0, len(latest_ids), 1000):
+        rows = CompanyGSTRecord.objects.filter(id__in=latest_ids[start:start + 1000]).values('gstin', *PROFILE_FIELDS)
+        CompanyProfile.objects.bulk_create(CompanyProfile(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_companygstrecord_unique_filing'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompanyProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gstin', models.CharField(max_length=15, unique=True)),
+                ('legal_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('trade_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('company_type', models.CharField(blank=True, max_length=255, null=True)),
+                ('principal_address', models.JSONField()),
+                ('registration_date', models.CharField(blank=True, max_length=10, null=True)),
+                ('last_update', models.CharField(blank=True, max_length=10, null=True)),
+                ('state', models.CharField(blank=True, max_length=500, null=True)),
+                ('city', models.CharField(blank=True, max_length=20, null=True)),
+                ('additional_data', models.JSONField(blank=True, null=True)),
+                ('fetch_date', models.CharField(blank=True, max_length=20, null=True)),
+                ('annual_turnover', models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.RunPython(create_profiles),
+        migrations.RemoveConstraint(
+            model_name='companygstrecord',
+            name='unique_gst_filing',
+        ),
+        # Keep the existing gstin column, now as a foreign key to the profile
+        migrations.AlterField(
+            model_name='companygstrecord',
+            name='gstin',
+            field=models.ForeignKey(db_column='gstin', on_delete=django.db.models.deletion.CASCADE, related_name='filings', to='api.companyprofile', to_field='gstin'),
+        ),
+        migrations.RenameField(
+            model_name='companygstrecord',
+            old_name='gstin',
+            new_name='company',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='additional_data',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='annual_turnover',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='city',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='company_type',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='fetch_date',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='last_update',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='legal_name',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='principal_address',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='registration_date',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='state',
+        ),
+        migrations.RemoveField(
+            model_name='companygstrecord',
+            name='trade_name',
+        ),
+        migrations.AddConstraint(
+            model_name='companygstrecord',
+            constraint=models.UniqueConstraint(fields=('company', 'return_type', 'return_period'), name='unique_gst_filing'),
+        ),
+    ]
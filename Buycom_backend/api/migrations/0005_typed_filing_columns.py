@@ -0,0 +1,157 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:02
+
+from datetime import datetime
+
+from django.db import migrations, models
+
+DATE_FORMATS = ('%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d')
+BATCH_SIZE = 2000
+
+
+def parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(value)
+
+
+def parse_period(value):
+    # ret_prd is MMYYYY
+    if len(value) != 6:
+        raise ValueError(value)
+    month, year = int(value[:2]), int(value[2:])
+    if not 1 <= month <= 12:
+        raise ValueError(value)
+    return year, month
+
+
+class Converter:
+    """Parse the string columns into their typed copies, noting what fails."""
+
+    def __init__(self):
+        self.unparseable = []
+
+    def convert(self, row, field, parser):
+        raw = getattr(row, field)
+        if raw is None or str(raw).strip() == '':
+            return None
+        try:
+            return parser(str(raw))
+        except (ValueError, TypeError):
+            self.unparseable.append((row._meta.model_name, row.pk, field, raw))
+            return None
+
+    def report(self):
+        if not self.unparseable:
+            return
+        print(f"\n  {len(self.unparseable)} value(s) could not be parsed and were set to NULL:")
+        for model_name, pk, field, raw in self.unparseable[:50]:
+            print(f"    {model_name} id={pk} {field}={raw!r}")
+        if len(self.unparseable) > 50:
+            print(f"    ... and {len(self.unparseable) - 50} more")
+
+
+def convert_columns(apps, schema_editor):
+    CompanyGSTRecord = apps.get_model('api', 'CompanyGSTRecord')
+    CompanyProfile = apps.get_model('api', 'CompanyProfile')
+    converter = Converter()
+
+    batch = []
+    for profile in CompanyProfile.objects.only('registration_date', 'last_update', 'fetch_date').iterator(chunk_size=BATCH_SIZE):
+        profile.registration_date_typed = converter.convert(profile, 'registration_date', parse_date)
+        profile.last_update_typed = converter.convert(profile, 'last_update', parse_date)
+        profile.fetch_date_typed = converter.convert(profile, 'fetch_date', parse_date)
+        batch.append(profile)
+        if len(batch) >= BATCH_SIZE:
+            CompanyProfile.objects.bulk_update(batch, ['registration_date_typed', 'last_update_typed', 'fetch_date_typed'])
+            batch = []
+    CompanyProfile.objects.bulk_update(batch, ['registration_date_typed', 'last_update_typed', 'fetch_date_typed'])
+
+    fields = ['date_of_filing_typed', 'delay_days_typed', 'year_typed', 'month_typed', 'period_key']
+    batch = []
+    for filing in CompanyGSTRecord.objects.only('date_of_filing', 'Delay_days', 'return_period').iterator(chunk_size=BATCH_SIZE):
+        filing.date_of_filing_typed = converter.convert(filing, 'date_of_filing', parse_date)
+        filing.delay_days_typed = converter.convert(filing, 'Delay_days', int)
+        period = converter.convert(filing, 'return_period', parse_period)
+        if period:
+            filing.year_typed, filing.month_typed = period
+            filing.period_key = period[0] * 100 + period[1]
+        batch.append(filing)
+        if len(batch) >= BATCH_SIZE:
+            CompanyGSTRecord.objects.bulk_update(batch, fields)
+            batch = []
+    CompanyGSTRecord.objects.bulk_update(batch, fields)
+
+    converter.report()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_companyprofile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='companygstrecord',
+            name='date_of_filing_typed',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companygstrecord',
+            name='delay_days_typed',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companygstrecord',
+            name='year_typed',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companygstrecord',
+            name='month_typed',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companygstrecord',
+            name='period_key',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='registration_date_typed',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='last_update_typed',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='companyprofile',
+            name='fetch_date_typed',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.RunPython(convert_columns),
+        migrations.RemoveField(model_name='companygstrecord', name='date_of_filing'),
+        migrations.RemoveField(model_name='companygstrecord', name='Delay_days'),
+        migrations.RemoveField(model_name='companygstrecord', name='year'),
+        migrations.RemoveField(model_name='companygstrecord', name='month'),
+        migrations.RemoveField(model_name='companyprofile', name='registration_date'),
+        migrations.RemoveField(model_name='companyprofile', name='last_update'),
+        migrations.RemoveField(model_name='companyprofile', name='fetch_date'),
+        migrations.RenameField(model_name='companygstrecord', old_name='date_of_filing_typed', new_name='date_of_filing'),
+        migrations.RenameField(model_name='companygstrecord', old_name='delay_days_typed', new_name='Delay_days'),
+        migrations.RenameField(model_name='companygstrecord', old_name='year_typed', new_name='year'),
+        migrations.RenameField(model_name='companygstrecord', old_name='month_typed', new_name='month'),
+        migrations.RenameField(model_name='companyprofile', old_name='registration_date_typed', new_name='registration_date'),
+        migrations.RenameField(model_name='companyprofile', old_name='last_update_typed', new_name='last_update'),
+        migrations.RenameField(model_name='companyprofile', old_name='fetch_date_typed', new_name='fetch_date'),
+        migrations.AlterField(
+            model_name='companygstrecord',
+            name='Delay_days',
+            field=models.IntegerField(blank=True, default=0, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-17 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_ingestjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UpstreamCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(max_length=20)),
+                ('gstin', models.CharField(max_length=15)),
+                ('fy', models.CharField(blank=True, default='', max_length=10)),
+                ('payload', models.JSONField()),
+                ('fetched_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('last_accessed', models.DateTimeField(db_index=True)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('action', 'gstin', 'fy'), name='unique_upstream_cache_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.1 on 2026-10-17 14:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def drop_legacy_scores(apps, schema_editor):
+    # Nothing ever wrote scores against CompanyDetails; any stray rows cannot
+    # be mapped to a profile and are rebuilt by the next scoring run
+    apps.get_model('api', 'Score').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_upstreamratelimit'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_legacy_scores, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='score',
+            name='company',
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='company',
+            field=models.OneToOneField(db_column='gstin', on_delete=django.db.models.deletion.CASCADE, related_name='score', to='api.companyprofile', to_field='gstin'),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='long_delay_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='filed_last_month',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='result',
+            field=models.CharField(default='N/A', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='score',
+            name='computed_on',
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
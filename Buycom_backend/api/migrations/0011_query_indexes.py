@@ -0,0 +1,47 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_data_versions'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='companygstrecord',
+            name='company',
+            field=models.ForeignKey(db_column='gstin', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='filings', to='api.companyprofile', to_field='gstin'),
+        ),
+        migrations.AddIndex(
+            model_name='companygstrecord',
+            index=models.Index(fields=['company', 'return_type', 'date_of_filing'], name='filing_gstin_type_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companygstrecord',
+            index=models.Index(fields=['result', 'id'], name='filing_result_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companygstrecord',
+            index=models.Index(fields=['date_of_filing', 'id'], name='filing_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companygstrecord',
+            index=models.Index(fields=['period_key', 'id'], name='filing_period_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companygstrecord',
+            index=models.Index(fields=['Delay_days', 'id'], name='filing_delay_days_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companyprofile',
+            index=models.Index(fields=['state'], name='profile_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='companyprofile',
+            index=models.Index(fields=['fetch_date'], name='profile_fetch_date_idx'),
+        ),
+    ]
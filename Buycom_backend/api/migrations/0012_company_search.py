@@ -0,0 +1,29 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:02
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_query_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='companyprofile',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('legal_name'), name='gin_trgm_ops'), name='profile_legal_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='companyprofile',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('trade_name'), name='gin_trgm_ops'), name='profile_trade_name_trgm'),
+        ),
+        migrations.AddIndex(
+            model_name='companyprofile',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Upper('gstin'), name='gin_trgm_ops'), name='profile_gstin_trgm'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_company_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestjobitem',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
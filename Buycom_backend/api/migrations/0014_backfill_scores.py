@@ -0,0 +1,112 @@
+# Generated by Django 5.1.1 on 2026-10-17 13:33
+
+from datetime import date, timedelta
+from itertools import groupby
+
+from django.db import migrations
+
+CHUNK_SIZE = 500
+
+# Scoring as it stood when this migration was written, frozen here so the
+# backfill gives the same scores whatever api.scoring and api.due_dates
+# become: due days of the 2017 rules, counted in the month filed (the
+# filing_month basis), and the Pass/Fail thresholds over a year of filings.
+# Run ``manage.py rescore`` to score under the current rules.
+FIVE_CRORE = 5_00_00_000
+GSTR3B_DAY_22_STATES = frozenset([
+    "Chhattisgarh", "Madhya Pradesh", "Gujarat", "Daman and Diu",
+    "Dadra and Nagar Haveli", "Maharashtra", "Karnataka", "Goa",
+    "Lakshadweep", "Kerala", "Tamil Nadu", "Puducherry",
+    "Andaman and Nicobar Islands", "Telangana", "Andhra Pradesh"
+])
+MAX_AVERAGE_DELAY = 7
+LONG_DELAY_DAYS = 15
+MAX_LONG_DELAYS = 3
+
+
+def due_day(return_type, state, annual_turnover):
+    if return_type == 'GSTR3B':
+        if annual_turnover is None or annual_turnover > FIVE_CRORE:
+            return 20
+        return 22 if state in GSTR3B_DAY_22_STATES else 24
+    return 11 if return_type == 'GSTR1' else 13
+
+
+def score(filings, state, annual_turnover, today):
+    """``(average_delay, long_delays, filed_last_month, result)`` of ``(return_type, date_of_filing)`` pairs."""
+    window_start = today - timedelta(days=365)
+    immediate_past_month = (today.replace(day=1) - timedelta(days=1)).month
+    total_delay = scored = long_delays = 0
+    filed_last_month = False
+    for return_type, filed in filings:
+        if filed is None or filed < window_start:
+            continue
+        delay = max(0, (filed - filed.replace(day=due_day(return_type, state, annual_turnover))).days)
+        scored += 1
+        total_delay += delay
+        long_delays += delay > LONG_DELAY_DAYS
+        filed_last_month |= filed.month == immediate_past_month
+    average_delay = total_delay / scored if scored else 0
+    passed = average_delay <= MAX_AVERAGE_DELAY and long_delays <= MAX_LONG_DELAYS and not filed_last_month
+    return average_delay, long_delays, filed_last_month, "Pass" if passed else "Fail"
+
+
+def backfill_scores(apps, schema_editor):
+    # 0009 dropped every Score row. Rebuild one per company that has
+    # filings, scored the way score_company does; where the filings already
+    # carry a result (set by scoring or by the checker) that result is kept,
+    # so the scorecard shows what the filings do.
+    CompanyProfile = apps.get_model('api', 'CompanyProfile')
+    CompanyGSTRecord = apps.get_model('api', 'CompanyGSTRecord')
+    Score = apps.get_model('api', 'Score')
+    today = date.today()
+
+    companies = CompanyProfile.objects.order_by('gstin').values_list('gstin', 'state', 'annual_turnover')
+    after = None
+    while True:
+        chunk = list((companies.filter(gstin__gt=after) if after else companies)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        after = chunk[-1][0]
+
+        rows = (
+            CompanyGSTRecord.objects.filter(company_id__in=[gstin for gstin, _, _ in chunk])
+            .order_by('company_id', 'id')
+            .values_list('company_id', 'return_type', 'date_of_filing', 'result')
+        )
+        filings = {gstin: list(group) for gstin, group in groupby(rows.iterator(chunk_size=5000), key=lambda row: row[0])}
+
+        scores = []
+        for gstin, state, turnover in chunk:
+            if gstin not in filings:
+                continue
+            average_delay, long_delays, filed_last_month, computed = score(
+                [(return_type, filed) for _, return_type, filed, _ in filings[gstin]], state, turnover, today,
+            )
+            stored = {result for *_, result in filings[gstin]} - {None, '', 'N/A'}
+            scores.append(Score(
+                company_id=gstin,
+                delayed_filing=average_delay > 0,
+                average_delay_days=average_delay,
+                long_delay_count=long_delays,
+                filed_last_month=filed_last_month,
+                result=stored.pop() if len(stored) == 1 else computed,
+                computed_on=today,
+            ))
+        Score.objects.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=['company'],
+            update_fields=['delayed_filing', 'average_delay_days', 'long_delay_count', 'filed_last_month', 'result', 'computed_on'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_ingestjobitem_started_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_scores, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth.hashers import check_password
 
@@ -54,31 +56,80 @@ class Return(models.Model):
     def __str__(self):
         return f"{self.return_type} - {self.arn}"
 
-class CompanyGSTRecord(models.Model):
-    gstin = models.CharField(max_length=15)
+# One row per GSTIN: the taxpayer profile from the TP search
+class CompanyProfile(models.Model):
+    gstin = models.CharField(max_length=15, unique=True)
     legal_name = models.CharField(max_length=255, null=True, blank=True)
     trade_name = models.CharField(max_length=255, null=True, blank=True)
     company_type = models.CharField(max_length=255, null=True, blank=True)
     principal_address = models.JSONField()  # pradr (JSON field for storing address details)
-    registration_date = models.CharField(max_length=10, null=True, blank=True)  # rgdt
-    last_update = models.CharField(max_length=10, null=True, blank=True)  # lstupdt
+    registration_date = models.DateField(null=True, blank=True)  # rgdt
+    last_update = models.DateField(null=True, blank=True)  # lstupdt
     state = models.CharField(max_length=500, null=True, blank=True)
-    date_of_filing = models.CharField(max_length=10, null=True, blank=True)
-    return_type = models.CharField(max_length=20, null=True, blank=True)
-    return_period = models.CharField(max_length=20, null=True, blank=True) # Preference
-    return_status = models.CharField(max_length=20, null=True, blank=True)
-    additional_data = models.JSONField(null=True, blank=True)  # Store any extra data as JSON
-    year = models.CharField(max_length=20, null=True, blank=True) # Get this from 2nd APi out from feild dof 
-    month = models.CharField(max_length=20, null=True, blank=True) # Get this from 2nd APi out from feild dof 
     city = models.CharField(max_length=20, null=True, blank=True)
-    fetch_date = models.CharField(max_length=20, null=True, blank=True)
+    additional_data = models.JSONField(null=True, blank=True)  # Full TP search payload
+    fetch_date = models.DateField(null=True, blank=True)
     annual_turnover = models.IntegerField(null=True, blank=True)
+    # Bumped whenever the profile or any of its filings change (see versions.py)
+    version = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Admin state filter, and rescore --since
+            models.Index(fields=['state'], name='profile_state_idx'),
+            models.Index(fields=['fetch_date'], name='profile_fetch_date_idx'),
+            # Trigram indexes for company search and icontains filters, which
+            # Django runs as UPPER(column) LIKE UPPER(%s)
+            GinIndex(OpClass(Upper('legal_name'), name='gin_trgm_ops'), name='profile_legal_name_trgm'),
+            GinIndex(OpClass(Upper('trade_name'), name='gin_trgm_ops'), name='profile_trade_name_trgm'),
+            GinIndex(OpClass(Upper('gstin'), name='gin_trgm_ops'), name='profile_gstin_trgm'),
+        ]
+
+    def __str__(self):
+        return f"{self.legal_name} - {self.gstin}"
+
+
+# One row per filing (RETTRACK EFiledlist entry) of a company
+class CompanyGSTRecord(models.Model):
+    # No index of its own: unique_gst_filing and filing_gstin_type_date_idx
+    # both lead with gstin
+    company = models.ForeignKey(
+        CompanyProfile, related_name="filings", on_delete=models.CASCADE,
+        to_field='gstin', db_column='gstin', db_index=False,
+    )
+    date_of_filing = models.DateField(null=True, blank=True)  # dof
+    return_type = models.CharField(max_length=20, null=True, blank=True)
+    return_period = models.CharField(max_length=20, null=True, blank=True) # ret_prd, MMYYYY
+    return_status = models.CharField(max_length=20, null=True, blank=True)
+    year = models.PositiveSmallIntegerField(null=True, blank=True)  # From ret_prd
+    month = models.PositiveSmallIntegerField(null=True, blank=True)  # From ret_prd
+    period_key = models.IntegerField(null=True, blank=True)  # YYYYMM from ret_prd, sortable
     delayed_filling = models.CharField(max_length=20, null=True, blank=True)
-    Delay_days = models.CharField(max_length=20, null=True, blank=True, default=0)
+    Delay_days = models.IntegerField(null=True, blank=True, default=0)
     result = models.CharField(max_length=10, null=True, blank=True)
-    
+
+    class Meta:
+        constraints = [
+            # One row per filing; re-fetching a GSTIN upserts on this key
+            models.UniqueConstraint(
+                fields=['company', 'return_type', 'return_period'],
+                name='unique_gst_filing',
+            ),
+        ]
+        indexes = [
+            # A company's filings of some return types, in filing date order (scoring)
+            models.Index(fields=['company', 'return_type', 'date_of_filing'], name='filing_gstin_type_date_idx'),
+            # ?result= on the list, in id order
+            models.Index(fields=['result', 'id'], name='filing_result_idx'),
+            # Keyset pages sorted by ?ordering=; (key, id) serves both directions
+            models.Index(fields=['date_of_filing', 'id'], name='filing_date_idx'),
+            models.Index(fields=['period_key', 'id'], name='filing_period_idx'),
+            models.Index(fields=['Delay_days', 'id'], name='filing_delay_days_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.legal_name} - {self.gstin}"
+        return f"{self.return_type} {self.return_period} - {self.company_id}"
     
     
     
@@ -100,11 +151,106 @@ class FilingDetails(models.Model):
     arn = models.CharField(max_length=50)
     filing_date = models.CharField(max_length=10, null=True, blank=True)
 
-# Score Table
+# Score Table: the precomputed scorecard of each company, refreshed whenever
+# its filings are ingested or its turnover changes
 class Score(models.Model):
-    company = models.OneToOneField(CompanyDetails, on_delete=models.CASCADE)
+    company = models.OneToOneField(
+        CompanyProfile, to_field='gstin', db_column='gstin', related_name='score', on_delete=models.CASCADE,
+    )
     delayed_filing = models.BooleanField(default=False)
     average_delay_days = models.FloatField(default=0.0)
+    long_delay_count = models.PositiveIntegerField(default=0)
+    filed_last_month = models.BooleanField(default=False)
+    result = models.CharField(max_length=10, default='N/A')
+    computed_on = models.DateField(null=True, blank=True)
 
     def __str__(self):
         return f"Score for {self.company.legal_name}"
+
+
+# Batch GSTIN ingestion job, processed by a bounded pool of workers
+class IngestJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (COMPLETED, 'Completed')]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    concurrency = models.PositiveSmallIntegerField(default=4)
+    total = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Ingest job {self.pk} ({self.status})"
+
+
+class IngestJobItem(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (RUNNING, 'Running'), (DONE, 'Done'), (FAILED, 'Failed')]
+
+    job = models.ForeignKey(IngestJob, related_name="items", on_delete=models.CASCADE)
+    gstin = models.CharField(max_length=15)
+    annual_turnover = models.IntegerField(null=True, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    error = models.CharField(max_length=255, blank=True, default='')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When a runner claimed the item; a running item older than
+    # GST_INGEST_STALE_SECONDS was left behind by a runner that died
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job', 'gstin'], name='unique_ingest_job_gstin'),
+        ]
+        indexes = [
+            models.Index(fields=['job', 'status'], name='ingest_item_job_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.gstin} ({self.status})"
+
+
+# Cached charteredinfo responses, keyed by (action, gstin, fy)
+class UpstreamCacheEntry(models.Model):
+    action = models.CharField(max_length=20)
+    gstin = models.CharField(max_length=15)
+    fy = models.CharField(max_length=10, blank=True, default='')
+    payload = models.JSONField()
+    fetched_at = models.DateTimeField()
+    expires_at = models.DateTimeField(db_index=True)
+    last_accessed = models.DateTimeField(db_index=True)
+    hit_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['action', 'gstin', 'fy'], name='unique_upstream_cache_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.action} {self.gstin} {self.fy}".strip()
+
+
+# Token bucket shared by every process calling an upstream API
+class UpstreamRateLimit(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} ({self.tokens:.1f} tokens)"
+
+
+# Change counters, e.g. one bumped on every write to filings or profiles
+class DataVersion(models.Model):
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,175 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Planner row estimate for ``queryset`` on PostgreSQL, exact count elsewhere.
+
+    The estimate costs one EXPLAIN instead of a full scan, which is what the
+    count on a multi-million row filings table would otherwise need.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over ``(sort key, id)``.
+
+    Each page is fetched with a ``WHERE (key, id) > (last key, last id)``
+    condition instead of an OFFSET, so deep pages cost the same as the first.
+    NULL sort keys are ordered after every value, ascending or descending.
+
+    Pagination is opt-in: without ``page_size`` or ``cursor`` the view returns
+    the plain, unpaginated list it always has. ``count=exact`` or
+    ``count=estimated`` adds a total to the response.
+
+    A cursor records the ordering it was made for; using it with another
+    ``ordering`` is a 400, as its position means nothing in that order.
+
+    The view provides ``get_ordering()`` returning ``(path, descending)``.
+    """
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    default_page_size = 50
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.page_size_query_param not in params and self.cursor_query_param not in params:
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.path, self.descending = view.get_ordering()
+        cursor = self.decode_cursor(params.get(self.cursor_query_param))
+        if cursor and cursor['o'] != self.ordering_key():
+            raise ValidationError({self.cursor_query_param: "Cursor was made for another ordering; start again from the first page."})
+
+        self.count = None
+        count_mode = params.get(self.count_query_param)
+        if count_mode == 'exact':
+            self.count = queryset.count()
+        elif count_mode == 'estimated':
+            self.count = estimate_count(queryset)
+
+        reverse = bool(cursor and cursor['r'])
+        # Walking backwards is the same query with the direction flipped
+        descending = self.descending != reverse
+        queryset = queryset.order_by(*self.order_by(self.path, descending))
+        if cursor:
+            try:
+                queryset = queryset.filter(self.get_after(cursor['v'], cursor['id'], descending))
+            except (ValueError, TypeError, DjangoValidationError):
+                # A position that is not a value of the sort key
+                raise ValidationError({self.cursor_query_param: "Invalid cursor position."})
+
+        rows = list(queryset[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def ordering_key(self):
+        return f"-{self.path}" if self.descending else self.path
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.default_page_size))
+        except ValueError:
+            raise ValidationError({self.page_size_query_param: "Must be an integer."})
+        return max(1, min(size, self.max_page_size))
+
+    @staticmethod
+    def order_by(path, descending):
+        """ORDER BY terms for sorting on ``path`` with ``id`` as the tie-breaker."""
+        if descending:
+            return [F(path).desc(nulls_first=True), F('id').desc()]
+        return [F(path).asc(nulls_last=True), F('id').asc()]
+
+    def get_after(self, value, pk, descending):
+        # Rows strictly after (value, pk) in the order from order_by()
+        path = self.path
+        if descending:
+            if value is None:
+                return Q(**{f'{path}__isnull': True, 'id__lt': pk}) | Q(**{f'{path}__isnull': False})
+            return Q(**{f'{path}__lt': value}) | Q(**{path: value, 'id__lt': pk})
+        if value is None:
+            return Q(**{f'{path}__isnull': True, 'id__gt': pk})
+        return Q(**{f'{path}__gt': value}) | Q(**{path: value, 'id__gt': pk}) | Q(**{f'{path}__isnull': True})
+
+    def get_position(self, row):
+        # Rows of a .values() queryset are dicts keyed by ORM path
+        if isinstance(row, dict):
+            return row[self.path]
+        value = row
+        for part in self.path.split('__'):
+            value = getattr(value, part)
+            if value is None:
+                break
+        return value
+
+    def encode_cursor(self, row, reverse):
+        pk = row['id'] if isinstance(row, dict) else row.pk
+        payload = json.dumps(
+            {'v': self.get_position(row), 'id': pk, 'r': reverse, 'o': self.ordering_key()}, cls=DjangoJSONEncoder,
+        )
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, token):
+        if not token:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(token.encode()))
+            return {'v': cursor['v'], 'id': int(cursor['id']), 'r': bool(cursor['r']), 'o': str(cursor['o'])}
+        except (ValueError, KeyError, TypeError):
+            raise ValidationError({self.cursor_query_param: "Invalid cursor."})
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
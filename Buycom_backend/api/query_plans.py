@@ -0,0 +1,165 @@
+import json
+from datetime import date, timedelta
+
+from django.db import connection
+from django.db.models import Count
+from django.http import QueryDict
+
+from .filters import filter_filings, get_filing_ordering
+from .models import CompanyGSTRecord, CompanyProfile
+from .pagination import KeysetPagination
+from .search import search_queryset
+
+# name -> (description, function(context) returning a queryset). Each is the
+# query a view, command or admin page runs, built the way they build it.
+HOT_QUERIES = {}
+
+# Tables where a sequential scan means a missing or unused index
+LARGE_TABLES = (CompanyGSTRecord._meta.db_table, CompanyProfile._meta.db_table)
+
+
+def hot_query(name, description):
+    def register(build):
+        HOT_QUERIES[name] = (description, build)
+        return build
+    return register
+
+
+class PlanContext:
+    """Sample values the queries are planned with, taken from the data."""
+
+    def __init__(self):
+        self.gstin = CompanyProfile.objects.order_by('-id').values_list('gstin', flat=True).first()
+        self.gstins = list(CompanyProfile.objects.order_by('-id').values_list('gstin', flat=True)[:50])
+        # The rarest state, as a filter on a common one is rightly a scan
+        self.state = (
+            CompanyProfile.objects.exclude(state=None).values('state')
+            .annotate(companies=Count('id')).order_by('companies').values_list('state', flat=True).first()
+        )
+        self.today = date.today()
+
+
+def _list_page(params):
+    # The company list as CompanyViewSet runs it: filters, keyset order, one page
+    params = QueryDict(params)
+    path, descending = get_filing_ordering(params)
+    queryset = filter_filings(CompanyGSTRecord.objects.all(), params)
+    return queryset.order_by(*KeysetPagination.order_by(path, descending))[:KeysetPagination.default_page_size + 1]
+
+
+@hot_query('company_filings', "Every filing of one company (company detail, update_status_for_gstin).")
+def _company_filings(context):
+    return CompanyGSTRecord.objects.filter(company_id=context.gstin)
+
+
+@hot_query('company_filings_by_type', "One company's filings of some return types in a filing date range (scoring).")
+def _company_filings_by_type(context):
+    return CompanyGSTRecord.objects.filter(
+        company_id=context.gstin, return_type__in=['GSTR3B', 'GSTR1'],
+        date_of_filing__range=(context.today - timedelta(days=730), context.today),
+    )
+
+
+@hot_query('report_filings', "Filings of 50 companies, newest first per company (bulk reports).")
+def _report_filings(context):
+    return CompanyGSTRecord.objects.filter(company_id__in=context.gstins).order_by('company_id', '-year', '-month', '-id')
+
+
+@hot_query('list_first_page', "First page of the company list.")
+def _list_first_page(context):
+    return _list_page('')
+
+
+@hot_query('list_result', "Company list filtered by ?result=Fail.")
+def _list_result(context):
+    return _list_page('result=Fail')
+
+
+@hot_query('list_by_delay', "Company list sorted by ?ordering=-Delay_days.")
+def _list_by_delay(context):
+    return _list_page('ordering=-Delay_days')
+
+
+@hot_query('list_by_date_of_filing', "Company list sorted by ?ordering=date_of_filing.")
+def _list_by_date_of_filing(context):
+    return _list_page('ordering=date_of_filing')
+
+
+@hot_query('list_by_return_period', "Company list sorted by ?ordering=-return_period.")
+def _list_by_return_period(context):
+    return _list_page('ordering=-return_period')
+
+
+@hot_query('profiles_by_state', "Companies of one state (admin state filter).")
+def _profiles_by_state(context):
+    return CompanyProfile.objects.filter(state=context.state)
+
+
+@hot_query('profiles_fetched_since', "A page of companies fetched in the last week, in GSTIN order (rescore --since).")
+def _profiles_fetched_since(context):
+    return (
+        CompanyProfile.objects.order_by('gstin').filter(fetch_date__gte=context.today - timedelta(days=7))
+        .values_list('gstin', 'state', 'annual_turnover')[:1000]
+    )
+
+
+@hot_query('company_search_name', "Company search on a misspelt name (trigram indexes).")
+def _company_search_name(context):
+    return search_queryset('TRADRS')
+
+
+@hot_query('company_search_gstin', "Company search on a GSTIN prefix.")
+def _company_search_gstin(context):
+    return search_queryset(context.gstin[:7])
+
+
+def table_rows():
+    """Planner row estimates of LARGE_TABLES, as of their last ANALYZE."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relname, reltuples::bigint FROM pg_class WHERE relname = ANY(%s)", [list(LARGE_TABLES)],
+        )
+        return dict(cursor.fetchall())
+
+
+def _nodes(plan):
+    yield plan
+    for child in plan.get('Plans', []):
+        yield from _nodes(child)
+
+
+def explain(queryset):
+    """The JSON plan of ``queryset``, as PostgreSQL would run it."""
+    plan = json.loads(queryset.explain(format='json'))
+    return plan[0]['Plan']
+
+
+def sequential_scans(plan, tables):
+    """Names of ``tables`` that ``plan`` reads with a sequential scan."""
+    return sorted({
+        node['Relation Name'] for node in _nodes(plan)
+        if node['Node Type'] == 'Seq Scan' and node.get('Relation Name') in tables
+    })
+
+
+def check_plans(names=None, min_rows=10000):
+    """
+    EXPLAIN each hot query and return ``{name: result}`` where result holds
+    the plan, its estimated cost and the large tables it scans sequentially.
+    Tables with fewer than ``min_rows`` rows are not held to an index, since
+    scanning them is often the cheaper plan.
+    """
+    context = PlanContext()
+    rows = table_rows()
+    checked = [table for table in LARGE_TABLES if rows.get(table, 0) >= min_rows]
+    results = {}
+    for name in names or HOT_QUERIES:
+        _, build = HOT_QUERIES[name]
+        plan = explain(build(context))
+        results[name] = {
+            "cost": plan['Total Cost'],
+            "sequential_scans": sequential_scans(plan, checked),
+            "skipped_tables": sorted(set(sequential_scans(plan, LARGE_TABLES)) - set(checked)),
+            "plan": plan,
+        }
+    return results
@@ -0,0 +1,246 @@
+import hashlib
+import io
+import json
+import logging
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+
+from .models import CompanyGSTRecord, CompanyProfile, Score
+
+try:
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+except ImportError:  # In requirements.txt; without it only PDF is refused
+    SimpleDocTemplate = None
+
+# Initialize the logger
+logger = logging.getLogger(__name__)
+
+# Bump when the report layout changes so cached renders are not reused
+REPORT_VERSION = 1
+
+# Latest filings shown on a report, as on the checker page
+REPORT_FILINGS = 24
+
+REPORT_FORMATS = {
+    'json': ('application/json', 'json'),
+    'html': ('text/html; charset=utf-8', 'html'),
+    'pdf': ('application/pdf', 'pdf'),
+}
+
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+]
+
+ADDRESS_PARTS = ('bno', 'flno', 'bnm', 'st', 'loc', 'city', 'dst', 'stcd', 'pncd')
+
+FILING_COLUMNS = ('company_id', 'year', 'month', 'return_type', 'return_period', 'return_status',
+                  'date_of_filing', 'delayed_filling', 'Delay_days')
+
+
+class ReportError(ValueError):
+    """Raised for a report that cannot be produced (bad format, missing reportlab)."""
+
+
+def check_format(report_format):
+    if report_format not in REPORT_FORMATS:
+        raise ReportError(f"Unknown format '{report_format}'. Choose from: {', '.join(REPORT_FORMATS)}.")
+    if report_format == 'pdf' and SimpleDocTemplate is None:
+        raise ReportError("PDF reports need reportlab, which is not installed.")
+
+
+def _format_date(value):
+    return value.strftime('%d-%m-%Y') if value else None
+
+
+def _address(principal_address):
+    address = (principal_address or {}).get('addr', {})
+    return ', '.join(str(address[part]) for part in ADDRESS_PARTS if address.get(part)) or None
+
+
+def _filing_row(filing):
+    _, year, month, return_type, return_period, _, date_of_filing, delayed_filling, delay_days = filing
+    return {
+        'year': year,
+        'month': month,
+        'month_name': MONTH_NAMES[month - 1] if month else None,
+        'return_type': return_type,
+        'return_period': return_period,
+        'date_of_filing': _format_date(date_of_filing),
+        'delayed_filling': delayed_filling,
+        'Delay_days': delay_days,
+    }
+
+
+def build_report(profile, filings, score=None):
+    """
+    The report model of one company: profile summary, scorecard and its
+    latest filings (newest first), split into GSTR3B and other returns.
+    ``filings`` are FILING_COLUMNS tuples, newest first.
+    """
+    filings = filings[:REPORT_FILINGS]
+    delayed = sum(filing[7] == 'Yes' for filing in filings)
+    return {
+        'gstin': profile.gstin,
+        'legal_name': profile.legal_name,
+        'trade_name': profile.trade_name,
+        'company_type': profile.company_type,
+        'status': filings[0][5] if filings else None,
+        'registration_date': _format_date(profile.registration_date),
+        'last_update': _format_date(profile.last_update),
+        'state': profile.state,
+        'address': _address(profile.principal_address),
+        'delayed_filing_percent': round(delayed * 100 / len(filings), 1) if filings else None,
+        'average_delay_days': round(score.average_delay_days, 1) if score else None,
+        'long_delay_count': score.long_delay_count if score else None,
+        'result': score.result if score else None,
+        'gstr3b': [_filing_row(filing) for filing in filings if filing[3] == 'GSTR3B'],
+        'other': [_filing_row(filing) for filing in filings if filing[3] != 'GSTR3B'],
+    }
+
+
+def load_reports(gstins):
+    """``{gstin: report}`` for the given GSTINs, in three queries whatever their number."""
+    profiles = CompanyProfile.objects.filter(gstin__in=gstins).only(
+        'gstin', 'legal_name', 'trade_name', 'company_type', 'registration_date', 'last_update', 'state',
+        'principal_address',
+    )
+    scores = {score.company_id: score for score in Score.objects.filter(company_id__in=gstins)}
+    rows = (
+        CompanyGSTRecord.objects.filter(company_id__in=gstins)
+        .order_by('company_id', '-year', '-month', '-id')
+        .values_list(*FILING_COLUMNS)
+    )
+    filings = {gstin: list(group) for gstin, group in groupby(rows, key=lambda row: row[0])}
+    return {
+        profile.gstin: build_report(profile, filings.get(profile.gstin, []), scores.get(profile.gstin))
+        for profile in profiles
+    }
+
+
+def report_fingerprint(report):
+    """Content hash of a report model; equal records give equal hashes."""
+    payload = json.dumps(report, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _render_html(report):
+    return render_to_string('api/report.html', {'report': report}).encode()
+
+
+def _filings_table(rows):
+    data = [["Year", "Month", "Return Type", "Date of Filing", "Delayed Filing", "Delay Days"]]
+    data += [
+        [row['year'] or "N/A", row['month_name'] or "N/A", row['return_type'] or "N/A",
+         row['date_of_filing'] or "N/A", row['delayed_filling'] or "N/A",
+         "N/A" if row['Delay_days'] is None else row['Delay_days']]
+        for row in rows
+    ]
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e6e6e6')),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+    ]))
+    return table
+
+
+def _render_pdf(report):
+    styles = getSampleStyleSheet()
+    summary = [
+        ["GSTIN", report['gstin'], "STATUS", report['status']],
+        ["LEGAL NAME", report['legal_name'], "REG. DATE", report['registration_date']],
+        ["TRADE NAME", report['trade_name'], "LAST UPDATE DATE", report['last_update']],
+        ["COMPANY TYPE", report['company_type'], "STATE", report['state']],
+        ["% DELAYED FILLING", report['delayed_filing_percent'], "AVG. DELAY DAYS", report['average_delay_days']],
+        ["ADDRESS", Paragraph(report['address'] or "N/A", styles['BodyText']), "RESULT", report['result']],
+    ]
+    summary = [["N/A" if value is None else value for value in row] for row in summary]
+    summary_table = Table(summary, colWidths=[95, 170, 105, 150])
+    summary_table.setStyle(TableStyle([
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTSIZE', (0, 0), (-1, -1), 9),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+
+    story = [Paragraph("Customer Due Diligence Report", styles['Title']), summary_table, Spacer(1, 16)]
+    if report['gstr3b']:
+        story += [Paragraph("GSTR3B Returns", styles['Heading2']), _filings_table(report['gstr3b']), Spacer(1, 16)]
+    if report['other']:
+        story += [Paragraph("Other Records", styles['Heading2']), _filings_table(report['other'])]
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4, title=f"{report['gstin']} summary").build(story)
+    return buffer.getvalue()
+
+
+def _render(report, report_format):
+    if report_format == 'json':
+        return json.dumps(report).encode()
+    if report_format == 'html':
+        return _render_html(report)
+    return _render_pdf(report)
+
+
+def _cache():
+    return caches[getattr(settings, 'REPORT_CACHE', 'default')]
+
+
+def _cache_key(report_format, fingerprint):
+    return f"gst-report:{REPORT_VERSION}:{report_format}:{fingerprint}"
+
+
+def render_reports(reports, report_format):
+    """
+    Render ``{gstin: report}`` as ``{gstin: bytes}``.
+
+    Output is cached under the report's content hash, so a company whose
+    records have not changed is served without rendering. Misses are
+    rendered in parallel on a thread pool.
+    """
+    check_format(report_format)
+    cache = _cache()
+    keys = {gstin: _cache_key(report_format, report_fingerprint(report)) for gstin, report in reports.items()}
+    cached = cache.get_many(list(keys.values()))
+    rendered = {gstin: cached[key] for gstin, key in keys.items() if key in cached}
+
+    misses = [gstin for gstin in reports if gstin not in rendered]
+    if misses:
+        workers = min(len(misses), getattr(settings, 'REPORT_RENDER_WORKERS', 4))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="gst-report") as pool:
+            outputs = pool.map(lambda gstin: _render(reports[gstin], report_format), misses)
+            fresh = dict(zip(misses, outputs))
+        cache.set_many({keys[gstin]: output for gstin, output in fresh.items()},
+                       timeout=getattr(settings, 'REPORT_CACHE_TIMEOUT', 7 * 24 * 60 * 60))
+        rendered.update(fresh)
+
+    logger.info("Rendered %s %s reports (%s from cache)", len(reports), report_format, len(reports) - len(misses))
+    return rendered
+
+
+def render_report(gstin, report_format):
+    """``(bytes, fingerprint)`` of one company's report, or None if the GSTIN is unknown."""
+    report = load_reports([gstin]).get(gstin)
+    if report is None:
+        return None
+    return render_reports({gstin: report}, report_format)[gstin], report_fingerprint(report)
+
+
+def zip_reports(rendered, report_format):
+    """Bundle ``{gstin: bytes}`` into a zip archive, one file per GSTIN."""
+    extension = REPORT_FORMATS[report_format][1]
+    # PDFs are already compressed
+    compression = zipfile.ZIP_STORED if report_format == 'pdf' else zipfile.ZIP_DEFLATED
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression) as archive:
+        for gstin, output in sorted(rendered.items()):
+            archive.writestr(f"{gstin}_summary.{extension}", output)
+    return buffer.getvalue()
@@ -0,0 +1,105 @@
+from collections import defaultdict
+from datetime import date
+from itertools import groupby
+
+from django.db import transaction
+
+from .models import CompanyGSTRecord, CompanyProfile
+from .scoring import save_scorecards, score_filings
+from .versions import touch
+
+FILING_COLUMNS = ('id', 'company_id', 'return_type', 'date_of_filing', 'period_key', 'delayed_filling', 'Delay_days', 'result')
+
+
+def company_chunks(chunk_size, after=None, since=None, gstins=None):
+    """
+    Yield lists of ``(gstin, state, annual_turnover)`` in GSTIN order,
+    ``chunk_size`` companies at a time, starting after ``after``.
+
+    Each chunk is one keyset query, so memory stays bounded however many
+    companies there are. ``since`` keeps companies fetched on or after that
+    date; ``gstins`` restricts the run to those GSTINs.
+    """
+    companies = CompanyProfile.objects.order_by('gstin')
+    if since:
+        companies = companies.filter(fetch_date__gte=since)
+
+    if gstins is not None:
+        # Walk the requested GSTINs in slices rather than one huge IN list
+        gstins = sorted(gstin for gstin in set(gstins) if not after or gstin > after)
+        for start in range(0, len(gstins), chunk_size):
+            chunk = list(companies.filter(gstin__in=gstins[start:start + chunk_size]).values_list('gstin', 'state', 'annual_turnover'))
+            if chunk:
+                yield chunk
+        return
+
+    while True:
+        page = companies.filter(gstin__gt=after) if after else companies
+        chunk = list(page.values_list('gstin', 'state', 'annual_turnover')[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        after = chunk[-1][0]
+
+
+def load_filings(chunk):
+    """
+    One query for the filings of every company in ``chunk``, grouped into
+    ``[(gstin, state, annual_turnover, filings)]`` of plain tuples so the
+    result can be sent to a worker process.
+    """
+    filings = CompanyGSTRecord.objects.filter(company_id__in=[gstin for gstin, _, _ in chunk])
+    rows = filings.order_by('company_id', 'id').values_list(*FILING_COLUMNS)
+    by_gstin = {gstin: list(group) for gstin, group in groupby(rows.iterator(chunk_size=5000), key=lambda row: row[1])}
+    return [(gstin, state, turnover, by_gstin[gstin]) for gstin, state, turnover in chunk if gstin in by_gstin]
+
+
+def score_chunk(companies, today=None):
+    """
+    Score a chunk of companies from ``load_filings``. Runs in a worker process
+    and touches no database.
+
+    Returns ``(changes, scorecards, filings_scored)`` where ``changes`` holds
+    ``(id, gstin, delayed_filling, Delay_days, result)`` for the filings whose stored
+    values differ and ``scorecards`` maps GSTIN to its Scorecard.
+    """
+    today = today or date.today()
+    changes, scorecards, filings_scored = [], {}, 0
+    for gstin, state, turnover, filings in companies:
+        delays, scorecard = score_filings(
+            [(return_type, filed, period_key) for _, _, return_type, filed, period_key, _, _, _ in filings],
+            state, turnover, today,
+        )
+        scorecards[gstin] = scorecard
+        filings_scored += len(filings)
+        for (filing_id, _, _, _, _, delayed, delay_days, result), delay in zip(filings, delays):
+            new_delayed, new_delay_days = delay if delay is not None else (delayed, delay_days)
+            if (new_delayed, new_delay_days, scorecard.result) != (delayed, delay_days, result):
+                changes.append((filing_id, gstin, new_delayed, new_delay_days, scorecard.result))
+    return changes, scorecards, filings_scored
+
+
+def write_results(changes, scorecards, today=None, batch_size=1000):
+    """
+    Write the changed filings, upsert the scorecards, then bump the
+    versions of every company scored: a scorecard can move with the
+    one-year window even when no filing changed, and reports show it.
+
+    Filings sharing the same new values are updated together with
+    ``id IN (...)`` statements of up to ``batch_size`` ids. Delays take few
+    distinct values, so this needs far fewer statements than a row-by-row
+    CASE update.
+    """
+    by_values = defaultdict(list)
+    for filing_id, _, delayed, delay_days, result in changes:
+        by_values[(delayed, delay_days, result)].append(filing_id)
+
+    with transaction.atomic():
+        for (delayed, delay_days, result), ids in by_values.items():
+            for start in range(0, len(ids), batch_size):
+                CompanyGSTRecord.objects.filter(id__in=ids[start:start + batch_size]).update(
+                    delayed_filling=delayed, Delay_days=delay_days, result=result,
+                )
+        if scorecards:
+            save_scorecards(scorecards, today)
+            touch(scorecards)
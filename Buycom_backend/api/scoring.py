@@ -0,0 +1,194 @@
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import repeat
+
+from django.db import transaction
+from django.db.models import Count
+
+from .due_dates import due_date_rules
+from .models import CompanyGSTRecord, Score
+from .versions import touch
+
+# Pass/Fail thresholds over the past year of filings
+MAX_AVERAGE_DELAY = 7
+LONG_DELAY_DAYS = 15
+MAX_LONG_DELAYS = 3
+
+
+@dataclass
+class Scorecard:
+    average_delay: float
+    long_delays: int
+    filed_last_month: bool
+    result: str
+
+
+def filing_delay(delay_days):
+    """Return ``(delayed_filling, Delay_days)`` for a filing ``delay_days`` past its due date."""
+    if delay_days > 0:
+        return "Yes", delay_days
+    return "No", 0
+
+
+def score_filings(filings, state, annual_turnover, today=None):
+    """
+    Score one company's filings in a single pass.
+
+    Every filing counts, whatever its return type: this is the one scope
+    used by score_company, refresh_scorecard and rescore, so they always
+    agree on a company's result.
+    ``filings`` is a sequence of ``(return_type, date_of_filing, period_key)``
+    tuples; delays come from ``due_date_rules.delays`` in one call.
+    Returns ``(delays, scorecard)`` where ``delays`` holds the
+    ``(delayed_filling, Delay_days)`` of each filing, in order, or ``None``
+    for a filing without a date. Only plain values go in and out, so this can
+    run in a worker process.
+    """
+    today = today or date.today()
+    window_start = today - timedelta(days=365)
+    immediate_past_month = (today.replace(day=1) - timedelta(days=1)).month
+
+    return_types, dates_of_filing, period_keys = zip(*filings) if filings else ((), (), ())
+    days_late = due_date_rules.delays(return_types, repeat(state), repeat(annual_turnover), dates_of_filing, period_keys)
+
+    delays = []
+    total_delay = scored = long_delays = 0
+    filed_last_month = False
+    for date_of_filing, days in zip(dates_of_filing, days_late):
+        if days is None:
+            delays.append(None)
+            continue
+
+        delay = filing_delay(days)
+        delays.append(delay)
+
+        if date_of_filing >= window_start:
+            scored += 1
+            total_delay += delay[1]
+            long_delays += delay[1] > LONG_DELAY_DAYS
+            filed_last_month |= date_of_filing.month == immediate_past_month
+
+    average_delay = total_delay / scored if scored else 0
+    passed = average_delay <= MAX_AVERAGE_DELAY and long_delays <= MAX_LONG_DELAYS and not filed_last_month
+    return delays, Scorecard(average_delay, long_delays, filed_last_month, "Pass" if passed else "Fail")
+
+
+def score_company(company, today=None):
+    """
+    Recompute delays and the Pass/Fail result for every filing of ``company``.
+
+    Loads the filings once and writes them back with one bulk update, so the
+    query count does not grow with the number of filings. Returns the
+    Scorecard, or None if the company has no matching filings.
+    """
+    filings = CompanyGSTRecord.objects.filter(company_id=company.gstin)
+    filings = list(filings.only('id', 'return_type', 'date_of_filing', 'period_key', 'delayed_filling', 'Delay_days'))
+    if not filings:
+        return None
+
+    delays, scorecard = score_filings(
+        [(filing.return_type, filing.date_of_filing, filing.period_key) for filing in filings],
+        company.state, company.annual_turnover, today,
+    )
+    for filing, delay in zip(filings, delays):
+        if delay is not None:
+            filing.delayed_filling, filing.Delay_days = delay
+        filing.result = scorecard.result
+
+    with transaction.atomic():
+        CompanyGSTRecord.objects.bulk_update(filings, ['delayed_filling', 'Delay_days', 'result'], batch_size=1000)
+        save_scorecards({company.gstin: scorecard}, today)
+        touch([company.gstin])
+    return scorecard
+
+
+def refresh_delays(company, filings):
+    """
+    Recompute ``delayed_filling`` and ``Delay_days`` of some of ``company``'s
+    ``filings`` from their dates, in one bulk update; results and the Score
+    row are left alone. A filing without a date gets the columns of a new,
+    unscored one.
+    """
+    days_late = due_date_rules.delays(
+        [filing.return_type for filing in filings], repeat(company.state), repeat(company.annual_turnover),
+        [filing.date_of_filing for filing in filings], [filing.period_key for filing in filings],
+    )
+    for filing, days in zip(filings, days_late):
+        filing.delayed_filling, filing.Delay_days = ('', None) if days is None else filing_delay(days)
+    CompanyGSTRecord.objects.bulk_update(filings, ['delayed_filling', 'Delay_days'], batch_size=1000)
+
+
+def save_scorecards(scorecards, today=None):
+    """Upsert the Score row of each ``{gstin: Scorecard}`` in one statement."""
+    computed_on = today or date.today()
+    Score.objects.bulk_create(
+        [
+            Score(
+                company_id=gstin,
+                delayed_filing=scorecard.average_delay > 0,
+                average_delay_days=scorecard.average_delay,
+                long_delay_count=scorecard.long_delays,
+                filed_last_month=scorecard.filed_last_month,
+                result=scorecard.result,
+                computed_on=computed_on,
+            )
+            for gstin, scorecard in scorecards.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['company'],
+        update_fields=['delayed_filing', 'average_delay_days', 'long_delay_count', 'filed_last_month', 'result', 'computed_on'],
+    )
+
+
+def refresh_scorecard(company, today=None):
+    """
+    Recompute the Score row of ``company`` without touching its filings.
+
+    Only this company's filing dates are read (one query) and its row is
+    upserted (one statement), so an ingest costs the same whatever the size
+    of the table. Returns the Scorecard, or None if it has no filings.
+    """
+    filings = list(CompanyGSTRecord.objects.filter(company_id=company.gstin).values_list('return_type', 'date_of_filing', 'period_key'))
+    if not filings:
+        return None
+    _, scorecard = score_filings(filings, company.state, company.annual_turnover, today)
+    save_scorecards({company.gstin: scorecard}, today)
+    return scorecard
+
+
+def set_results(statuses):
+    """
+    Apply the checker's result to every filing of each GSTIN, and to its
+    Score row so the scorecard shows the same result.
+
+    ``statuses`` maps GSTIN to result. Runs in one transaction: one query
+    counts the filings, one UPDATE per distinct result writes them and one
+    upsert writes the Score rows; the other scorecard fields are left as
+    last computed. Returns ``{gstin: rows updated}``, 0 for GSTINs without
+    filings. Raises ValueError for a None result, which Score cannot hold.
+    """
+    if None in statuses.values():
+        raise ValueError("A result is required for every GSTIN.")
+
+    by_status = defaultdict(list)
+    for gstin, status in statuses.items():
+        by_status[status].append(gstin)
+
+    with transaction.atomic():
+        counts = dict(
+            CompanyGSTRecord.objects.filter(company_id__in=list(statuses))
+            .values_list('company_id')
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        for status, gstins in by_status.items():
+            CompanyGSTRecord.objects.filter(company_id__in=gstins).update(result=status)
+        Score.objects.bulk_create(
+            [Score(company_id=gstin, result=statuses[gstin]) for gstin, count in counts.items() if count],
+            update_conflicts=True,
+            unique_fields=['company'],
+            update_fields=['result'],
+        )
+        touch(gstin for gstin, count in counts.items() if count)
+    return {gstin: counts.get(gstin, 0) for gstin in statuses}
@@ -0,0 +1,83 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db.models import Case, F, FloatField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+from .models import CompanyProfile
+
+DEFAULT_RESULTS = 10
+
+# Shortest name query; trigram matching needs three characters
+MIN_QUERY_LENGTH = 3
+
+# A query that could be the start of a GSTIN: two state digits, then letters
+# and digits
+GSTIN_PREFIX = re.compile(r'^\d{2}[0-9A-Z]{0,13}$')
+
+SEARCH_COLUMNS = ('gstin', 'legal_name', 'trade_name', 'state', 'city')
+
+
+class SearchError(ValueError):
+    """Raised for a query that cannot be searched (too short)."""
+
+
+def normalize_query(query):
+    # Names and GSTINs are stored upper case; collapse runs of whitespace
+    return ' '.join((query or '').split()).upper()
+
+
+def search_queryset(query, limit=DEFAULT_RESULTS):
+    """
+    The ``limit`` best matches of ``query`` among company profiles, as a
+    queryset of dicts of SEARCH_COLUMNS plus a ``rank``.
+
+    A query shaped like the start of a GSTIN is matched on the GSTIN prefix.
+    Otherwise legal and trade names are matched by trigram word similarity,
+    which tolerates typos, or as substrings; GSTIN substrings also match.
+    Every condition is served by the trigram indexes on CompanyProfile.
+    Ranking: exact GSTIN, then name prefixes, then substrings, then
+    similarity.
+    """
+    query = normalize_query(query)
+    limit = max(1, min(limit, getattr(settings, 'SEARCH_MAX_RESULTS', 50)))
+
+    if GSTIN_PREFIX.match(query):
+        # An exact match sorts first in GSTIN order, so the index order is the rank
+        return (
+            CompanyProfile.objects.filter(gstin__startswith=query)
+            .annotate(rank=Case(When(gstin=query, then=Value(2.0)), default=Value(1.0), output_field=FloatField()))
+            .order_by('gstin')
+            .values(*SEARCH_COLUMNS, 'rank')[:limit]
+        )
+
+    if len(query) < MIN_QUERY_LENGTH:
+        raise SearchError(f"Search for at least {MIN_QUERY_LENGTH} characters, or a GSTIN prefix.")
+
+    # The expressions the trigram indexes are built on
+    queryset = CompanyProfile.objects.alias(
+        legal=Upper('legal_name'), trade=Upper('trade_name'), gstin_upper=Upper('gstin'),
+    )
+    matches = (
+        Q(legal__trigram_word_similar=query) | Q(trade__trigram_word_similar=query)
+        | Q(legal__contains=query) | Q(trade__contains=query) | Q(gstin_upper__contains=query)
+    )
+    similarity = Greatest(TrigramWordSimilarity(query, 'legal'), TrigramWordSimilarity(query, 'trade'))
+    bonus = Case(
+        When(Q(legal__startswith=query) | Q(trade__startswith=query), then=Value(1.0)),
+        When(Q(legal__contains=query) | Q(trade__contains=query) | Q(gstin_upper__contains=query), then=Value(0.5)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    return (
+        queryset.filter(matches)
+        .annotate(rank=bonus + similarity)
+        .order_by(F('rank').desc(nulls_last=True), 'gstin')
+        .values(*SEARCH_COLUMNS, 'rank')[:limit]
+    )
+
+
+def search_companies(query, limit=DEFAULT_RESULTS):
+    """List of the matches from search_queryset; raises SearchError for a short query."""
+    return list(search_queryset(query, limit))
@@ -0,0 +1,249 @@
+import random
+from datetime import date, timedelta
+
+from django.db import connection, transaction
+
+from .due_dates import due_date_rules
+from .ingest import parse_return_period
+from .models import CompanyGSTRecord, CompanyProfile, Score
+from .scoring import filing_delay, save_scorecards, score_filings
+from .versions import touch
+
+# Synthetic GSTINs carry this in place of the first PAN letters, so seeded
+# companies are easy to tell apart and to clear
+SEED_MARKER = 'BNCH'
+
+# (GST state code, state, share of companies), roughly the registration mix
+STATES = [
+    (27, "Maharashtra", 16), (33, "Tamil Nadu", 9), (9, "Uttar Pradesh", 9), (24, "Gujarat", 8),
+    (29, "Karnataka", 8), (7, "Delhi", 6), (19, "West Bengal", 6), (8, "Rajasthan", 5),
+    (36, "Telangana", 4), (6, "Haryana", 4), (32, "Kerala", 3), (3, "Punjab", 3),
+    (23, "Madhya Pradesh", 3), (37, "Andhra Pradesh", 3), (21, "Odisha", 2), (10, "Bihar", 2),
+    (20, "Jharkhand", 2), (22, "Chhattisgarh", 1), (30, "Goa", 1), (18, "Assam", 1),
+    (5, "Uttarakhand", 1), (2, "Himachal Pradesh", 1), (34, "Puducherry", 1),
+]
+_STATE_WEIGHTS = [weight for _, _, weight in STATES]
+
+COMPANY_TYPES = [
+    ("Private Limited Company", 45), ("Proprietorship", 30), ("Partnership", 12),
+    ("Limited Liability Partnership", 8), ("Public Limited Company", 5),
+]
+BUSINESS_NATURE = [
+    "Supplier of Services", "Retail Business", "Wholesale Business", "Factory / Manufacturing",
+    "Office / Sale Office", "Warehouse / Depot", "Bonded Warehouse", "Works Contract",
+]
+CITIES = ["Central", "North", "South", "East", "West", "Industrial Area", "MIDC", "Old City"]
+STREETS = ["MG Road", "Station Road", "Ring Road", "Nehru Nagar", "Gandhi Marg", "Link Road", "Market Yard"]
+
+# Filing discipline: (share of companies, share of filings on time, mean days late)
+DISCIPLINE = [(60, 0.95, 3), (30, 0.75, 8), (10, 0.30, 25)]
+
+# Months of history per company, and the share filing quarterly CMP08
+# under the composition scheme instead of monthly GSTR3B/GSTR1
+HISTORY_MONTHS = 24
+COMPOSITION_SHARE = 0.05
+
+
+def _weighted(rng, choices):
+    return rng.choices([choice for choice, _ in choices], [weight for _, weight in choices])[0]
+
+
+def synthetic_gstin(index, state_code):
+    """Well-formed, unique GSTIN for company ``index`` (up to 260,000 per state)."""
+    pan = f"{SEED_MARKER}{chr(65 + index // 10000 % 26)}{index % 10000:04d}B"
+    return f"{state_code:02d}{pan}1Z{index % 10}"
+
+
+def company_rng(gstin, seed=0):
+    """Random generator for one GSTIN; the same seed always gives the same company."""
+    return random.Random(f"{seed}:{gstin}")
+
+
+def synthetic_taxpayer(gstin, state, rng):
+    """TP search payload for ``gstin``, shaped like the provider's."""
+    name = f"{rng.choice(['Shree', 'Sai', 'National', 'Global', 'Prime', 'Royal', 'Apex', 'Metro'])} " \
+           f"{rng.choice(['Traders', 'Industries', 'Enterprises', 'Logistics', 'Textiles', 'Foods', 'Agencies'])}"
+    company_type = _weighted(rng, COMPANY_TYPES)
+    registered = date(2017, 7, 1) + timedelta(days=rng.randint(0, 2400))
+    updated = registered + timedelta(days=rng.randint(0, 900))
+    suffix = {"Private Limited Company": " Private Limited", "Public Limited Company": " Limited",
+              "Limited Liability Partnership": " LLP"}.get(company_type, "")
+    return {
+        "gstin": gstin,
+        "lgnm": f"{name} {gstin[7:11]}{suffix}".upper(),
+        "tradeNam": f"{name} {gstin[7:11]}".upper(),
+        "ctb": company_type,
+        "dty": "Regular",
+        "sts": "Active",
+        "rgdt": registered.strftime('%d/%m/%Y'),
+        "lstupdt": updated.strftime('%d/%m/%Y'),
+        "cxdt": "",
+        "stjCd": f"{gstin[:2]}{rng.randint(100, 999)}",
+        "stj": f"Ward {rng.randint(1, 120)}",
+        "ctjCd": f"Z{rng.randint(1000, 9999)}",
+        "ctj": f"Range-{rng.randint(1, 40)}",
+        "nba": rng.sample(BUSINESS_NATURE, rng.randint(1, 3)),
+        "einvoiceStatus": rng.choice(["Yes", "No"]),
+        "adadr": [],
+        "pradr": {
+            "ntr": "Supplier of Services",
+            "addr": {
+                "bno": str(rng.randint(1, 999)),
+                "flno": f"Floor {rng.randint(0, 9)}",
+                "bnm": f"{rng.choice(['Shanti', 'Laxmi', 'Om', 'Ganesh'])} Complex",
+                "st": rng.choice(STREETS),
+                # Ingest reads the company's state from loc
+                "loc": state,
+                "city": rng.choice(CITIES),
+                "dst": f"District {rng.randint(1, 40)}",
+                "stcd": state,
+                "pncd": str(rng.randint(110001, 855999)),
+                "lt": "",
+                "lg": "",
+            },
+        },
+    }
+
+
+def synthetic_turnover(rng):
+    # Log-uniform from 20 lakh to 200 crore, within the IntegerField range
+    return int(10 ** rng.uniform(6.3, 9.3))
+
+
+def synthetic_returns(gstin, state, annual_turnover, rng, today, months=HISTORY_MONTHS):
+    """
+    RETTRACK ``EFiledlist`` entries for the last ``months`` return periods,
+    newest first. Filing dates follow the company's discipline: mostly a few
+    days before the due date, late by an exponential number of days
+    otherwise. Periods not yet filed by ``today`` are left out.
+    """
+    _, on_time, mean_delay = rng.choices(DISCIPLINE, [share for share, _, _ in DISCIPLINE])[0]
+    if rng.random() < COMPOSITION_SHARE:
+        return_types, step = ("CMP08",), 3
+    else:
+        return_types, step = ("GSTR3B", "GSTR1"), 1
+
+    filings = []
+    period = today.replace(day=1) - timedelta(days=1)
+    for _ in range(0, months, step):
+        period_key = period.year * 100 + period.month
+        for return_type in return_types:
+            due = due_date_rules.period_due_date(return_type, state, annual_turnover, period_key)
+            if rng.random() < on_time:
+                filed = due - timedelta(days=rng.randint(0, 6))
+            else:
+                filed = due + timedelta(days=max(1, min(300, int(rng.expovariate(1 / mean_delay)))))
+            if filed > today:
+                continue
+            filings.append({
+                "valid": "Y",
+                "mof": "ONLINE",
+                "dof": filed.strftime('%d-%m-%Y'),
+                "rtntype": return_type,
+                "ret_prd": f"{period.month:02d}{period.year}",
+                "arn": f"AA{gstin[:2]}{period.month:02d}{period.year % 100:02d}{rng.randint(0, 10**7 - 1):07d}{rng.choice('ABCDEFGHJK')}",
+                "status": "Filed",
+            })
+        for _ in range(step):
+            period = period.replace(day=1) - timedelta(days=1)
+    return filings
+
+
+def synthetic_company(index, seed=0, today=None):
+    """``(gstin, state, annual_turnover, taxpayer, returns)`` of seeded company ``index``."""
+    today = today or date.today()
+    picker = random.Random(f"{seed}:{index}")
+    state_code, state, _ = picker.choices(STATES, _STATE_WEIGHTS)[0]
+    gstin = synthetic_gstin(index, state_code)
+    rng = company_rng(gstin, seed)
+    annual_turnover = synthetic_turnover(rng)
+    taxpayer = synthetic_taxpayer(gstin, state, rng)
+    returns = synthetic_returns(gstin, state, annual_turnover, rng, today)
+    return gstin, state, annual_turnover, taxpayer, returns
+
+
+def _rows(gstin, state, annual_turnover, taxpayer, returns, today):
+    # The profile, scored filings and scorecard ingest would have stored
+    address = taxpayer["pradr"]["addr"]
+    profile = CompanyProfile(
+        gstin=gstin, legal_name=taxpayer["lgnm"], trade_name=taxpayer["tradeNam"],
+        company_type=taxpayer["ctb"], principal_address=taxpayer["pradr"],
+        registration_date=date(*reversed([int(part) for part in taxpayer["rgdt"].split('/')])),
+        last_update=date(*reversed([int(part) for part in taxpayer["lstupdt"].split('/')])),
+        state=address["loc"], city=address["city"], additional_data=taxpayer,
+        fetch_date=today, annual_turnover=annual_turnover,
+    )
+    filings = []
+    for entry in returns:
+        year, month, period_key = parse_return_period(entry["ret_prd"])
+        day, filed_month, filed_year = (int(part) for part in entry["dof"].split('-'))
+        filings.append(CompanyGSTRecord(
+            company_id=gstin, date_of_filing=date(filed_year, filed_month, day), return_type=entry["rtntype"],
+            return_period=entry["ret_prd"], return_status="Active", year=year, month=month, period_key=period_key,
+        ))
+    delays, scorecard = score_filings(
+        [(filing.return_type, filing.date_of_filing, filing.period_key) for filing in filings],
+        state, annual_turnover, today,
+    )
+    for filing, delay in zip(filings, delays):
+        filing.delayed_filling, filing.Delay_days = delay or filing_delay(0)
+        filing.result = scorecard.result
+    return profile, filings, scorecard
+
+
+def seed_portfolio(filings, seed=0, today=None, batch_size=5000, progress=None):
+    """
+    Insert synthetic companies until at least ``filings`` filings exist, scored
+    as ingest would score them. Companies are written ``batch_size`` filings
+    at a time, each batch in one transaction. The same ``seed`` and ``today``
+    always give the same portfolio. ``progress(companies, filings)`` is
+    called after each batch. Returns ``(companies, filings)`` written.
+    """
+    today = today or date.today()
+    totals = [0, 0]
+    batch = ([], [], {})
+
+    def flush():
+        profiles, rows, scorecards = batch
+        if not profiles:
+            return
+        with transaction.atomic():
+            CompanyProfile.objects.bulk_create(profiles, batch_size=1000)
+            CompanyGSTRecord.objects.bulk_create(rows, batch_size=batch_size)
+            save_scorecards(scorecards, today)
+        totals[0] += len(profiles)
+        totals[1] += len(rows)
+        for part in batch:
+            part.clear()
+        if progress:
+            progress(*totals)
+
+    index = 0
+    while totals[1] + len(batch[1]) < filings:
+        gstin, state, turnover, taxpayer, returns = synthetic_company(index, seed, today)
+        index += 1
+        profile, rows, scorecard = _rows(gstin, state, turnover, taxpayer, returns, today)
+        batch[0].append(profile)
+        batch[1].extend(rows)
+        batch[2][gstin] = scorecard
+        if len(batch[1]) >= batch_size:
+            flush()
+    flush()
+    touch([])
+    return tuple(totals)
+
+
+def clear_portfolio():
+    """
+    Delete every seeded company with its filings and scorecard. Plain DELETE
+    statements, as the ORM would load each row to send its delete signal.
+    Returns the number of companies deleted.
+    """
+    pattern = f"__{SEED_MARKER}%"
+    with transaction.atomic(), connection.cursor() as cursor:
+        for model in (Score, CompanyGSTRecord, CompanyProfile):
+            table = connection.ops.quote_name(model._meta.db_table)
+            cursor.execute(f"DELETE FROM {table} WHERE gstin LIKE %s", [pattern])
+        deleted = cursor.rowcount
+        touch([])
+    return deleted
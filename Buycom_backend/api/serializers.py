@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Login, CompanyDetails, Return, Score, CompanyGSTRecord
+from .models import Login, CompanyDetails, Return, Score, CompanyProfile, CompanyGSTRecord, IngestJobItem
 from django.contrib.auth.hashers import check_password
 from django.contrib.auth import authenticate
 
@@ -34,8 +34,120 @@ class ScoreSerializer(serializers.ModelSerializer):
         model = Score
         fields = '__all__'
         
-class CompanyGSTRecordSerializer(serializers.ModelSerializer):
+# Fields whose output is the column value as read from the database, and
+# fields whose column value only needs formatting
+PASSTHROUGH_FIELDS = (serializers.CharField, serializers.IntegerField, serializers.BooleanField,
+                      serializers.JSONField, serializers.SlugRelatedField)
+CONVERTED_FIELDS = (serializers.DateField, serializers.DateTimeField, serializers.DecimalField,
+                    serializers.FloatField)
+VALUES_FIELDS = PASSTHROUGH_FIELDS + CONVERTED_FIELDS
+
+
+class SparseFieldsMixin:
+    """
+    Serializer that renders a subset of its fields: pass ``fields`` (keep
+    only these) and/or ``exclude`` (drop these) as lists of field names.
+    """
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
+
+    def get_columns(self):
+        """ORM paths the rendered fields read, for ``QuerySet.only()``."""
+        columns = {'id'}
+        for field in self.fields.values():
+            path = field.source.replace('.', '__')
+            if isinstance(field, serializers.SlugRelatedField):
+                path = f"{path}__{field.slug_field}"
+            columns.add(path)
+        return columns
+
+    def get_values_columns(self):
+        """
+        ``{field name: ORM path}`` when every rendered field reads a plain
+        column, so rows can come from ``QuerySet.values()`` and be rendered
+        by ``from_values``; None if a field needs the serializer.
+        """
+        columns = {}
+        for name, field in self.fields.items():
+            if not isinstance(field, VALUES_FIELDS) or field.source == '*':
+                return None
+            path = field.source.replace('.', '__')
+            if isinstance(field, serializers.SlugRelatedField):
+                path = f"{path}__{field.slug_field}"
+            columns[name] = path
+        return columns
+
+    def from_values(self, rows):
+        """
+        Render rows of ``QuerySet.values()`` (keyed by ORM path) as this
+        serializer would render the model instances. Only dates and numbers
+        that need formatting go through their field.
+        """
+        columns = list(self.get_values_columns().items())
+        converted = [
+            (name, self.fields[name].to_representation)
+            for name, _ in columns if isinstance(self.fields[name], CONVERTED_FIELDS)
+        ]
+        data = []
+        for row in rows:
+            item = {name: row[path] for name, path in columns}
+            for name, to_representation in converted:
+                if item[name] is not None:
+                    item[name] = to_representation(item[name])
+            data.append(item)
+        return data
+
+
+class CompanyGSTRecordSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # Filing rows are rendered flat, with the company profile inlined, so the
+    # response keeps the shape it had before profiles got their own table
+    gstin = serializers.SlugRelatedField(source='company', slug_field='gstin', queryset=CompanyProfile.objects.all())
+    legal_name = serializers.CharField(source='company.legal_name', read_only=True)
+    trade_name = serializers.CharField(source='company.trade_name', read_only=True)
+    company_type = serializers.CharField(source='company.company_type', read_only=True)
+    principal_address = serializers.JSONField(source='company.principal_address', read_only=True)
+    registration_date = serializers.DateField(source='company.registration_date', read_only=True)
+    last_update = serializers.DateField(source='company.last_update', read_only=True)
+    state = serializers.CharField(source='company.state', read_only=True)
+    additional_data = serializers.JSONField(source='company.additional_data', read_only=True)
+    city = serializers.CharField(source='company.city', read_only=True)
+    fetch_date = serializers.DateField(source='company.fetch_date', read_only=True)
+    annual_turnover = serializers.IntegerField(source='company.annual_turnover', read_only=True)
+
     class Meta:
         model = CompanyGSTRecord
-        fields = '__all__'
-        
\ No newline at end of file
+        fields = [
+            'id', 'gstin', 'legal_name', 'trade_name', 'company_type', 'principal_address',
+            'registration_date', 'last_update', 'state', 'date_of_filing', 'return_type',
+            'return_period', 'return_status', 'additional_data', 'year', 'month', 'city',
+            'fetch_date', 'annual_turnover', 'delayed_filling', 'Delay_days', 'result',
+        ]
+
+
+class CompanyGSTRecordSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    # The scalar columns of the checker table, without the address and raw
+    # TP payload; company lists render it for ?view=summary, the full row
+    # otherwise
+    gstin = serializers.CharField(source='company_id', read_only=True)
+    legal_name = serializers.CharField(source='company.legal_name', read_only=True)
+    state = serializers.CharField(source='company.state', read_only=True)
+    fetch_date = serializers.DateField(source='company.fetch_date', read_only=True)
+
+    class Meta:
+        model = CompanyGSTRecord
+        fields = [
+            'id', 'gstin', 'legal_name', 'state', 'fetch_date', 'return_type', 'return_period',
+            'date_of_filing', 'delayed_filling', 'Delay_days', 'result',
+        ]
+
+
+class IngestJobItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = IngestJobItem
+        fields = ['gstin', 'annual_turnover', 'status', 'error', 'attempts', 'started_at', 'finished_at']
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CompanyGSTRecord, CompanyProfile
+from .versions import touch
+
+
+# Saves through the ORM (admin, the filings API, company.save()) bump the
+# versions here; bulk writes call touch() themselves
+@receiver([post_save, post_delete], sender=CompanyGSTRecord)
+def filing_changed(sender, instance, **kwargs):
+    touch([instance.company_id])
+
+
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def company_changed(sender, instance, **kwargs):
+    touch([instance.gstin])
@@ -1,3 +1,433 @@
-from django.test import TestCase
+import base64
+import json
+import time
+from datetime import date
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.db import DatabaseError
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+
+from .db_router import PIN_HEADER, ReplicaRouter
+from .due_dates import DUE_DATE_RULES, FILING_MONTH, RETURN_PERIOD, DueDateRules
+from .gst_throttle import TokenBucket
+from .ingest import upsert_filings
+from .models import CompanyGSTRecord, CompanyProfile, Score
+from .scoring import score_filings, set_results
+
+TEN_CRORE = 10_00_00_000
+
+
+class DueDateBasisTests(SimpleTestCase):
+    """The filing-month rule scoring has always used, and the opt-in return-period rule."""
+
+    def setUp(self):
+        self.filing_month = DueDateRules(DUE_DATE_RULES, basis=FILING_MONTH)
+        self.return_period = DueDateRules(DUE_DATE_RULES, basis=RETURN_PERIOD)
+
+    def test_filing_month_uses_the_month_filed(self):
+        # January's GSTR3B filed on 25 March: five days past 20 March
+        self.assertEqual(self.filing_month.due_date("GSTR3B", "Delhi", TEN_CRORE, 202401, date(2024, 3, 25)), date(2024, 3, 20))
+        self.assertEqual(self.filing_month.delay("GSTR3B", "Delhi", TEN_CRORE, date(2024, 3, 25), 202401), 5)
+
+    def test_return_period_uses_the_month_after_the_period(self):
+        # The same return was due on 20 February
+        self.assertEqual(self.return_period.due_date("GSTR3B", "Delhi", TEN_CRORE, 202401, date(2024, 3, 25)), date(2024, 2, 20))
+        self.assertEqual(self.return_period.delay("GSTR3B", "Delhi", TEN_CRORE, date(2024, 3, 25), 202401), 34)
+
+    def test_bases_agree_on_returns_filed_the_month_after_their_period(self):
+        for rules in (self.filing_month, self.return_period):
+            self.assertEqual(rules.delay("GSTR1", "Delhi", TEN_CRORE, date(2024, 2, 15), 202401), 4)
+            self.assertEqual(rules.delay("GSTR1", "Delhi", TEN_CRORE, date(2024, 2, 10), 202401), 0)
+
+    def test_no_period_falls_back_to_the_filing_month(self):
+        for rules in (self.filing_month, self.return_period):
+            self.assertEqual(rules.due_date("GSTR3B", "Delhi", TEN_CRORE, None, date(2024, 3, 25)), date(2024, 3, 20))
+            self.assertEqual(rules.delay("GSTR3B", "Delhi", TEN_CRORE, date(2024, 3, 25)), 5)
+
+    def test_delays_matches_delay(self):
+        filings = [
+            ("GSTR3B", "Gujarat", 1_00_00_000, date(2024, 3, 25), 202401),
+            ("GSTR3B", "Delhi", 1_00_00_000, date(2024, 3, 25), 202402),
+            ("GSTR1", "Delhi", None, date(2024, 3, 15), None),
+            ("CMP08", "Delhi", TEN_CRORE, None, 202401),
+        ]
+        for rules in (self.filing_month, self.return_period):
+            expected = [
+                None if filed is None else rules.delay(return_type, state, turnover, filed, period)
+                for return_type, state, turnover, filed, period in filings
+            ]
+            self.assertEqual(rules.delays(*zip(*filings)), expected)
+
+    def test_period_due_date_ignores_the_basis(self):
+        for rules in (self.filing_month, self.return_period):
+            self.assertEqual(rules.period_due_date("GSTR3B", "Delhi", TEN_CRORE, 202412), date(2025, 1, 20))
+
+    def test_unknown_basis_is_rejected(self):
+        with self.assertRaises(ValueError):
+            DueDateRules(DUE_DATE_RULES, basis='due_month')
+
+
+
+class ScoreFilingsTests(SimpleTestCase):
+    """Delays and the Pass/Fail scorecard of one company's filings."""
+
+    TODAY = date(2024, 6, 15)
+
+    def delay(self, return_type, state, annual_turnover, filed, period_key=None):
+        delays, _ = score_filings([(return_type, filed, period_key)], state, annual_turnover, self.TODAY)
+        return delays[0]
+
+    def test_gstr3b_due_day_by_turnover_band_and_state_group(self):
+        filed = date(2024, 3, 25)
+        # Above 5 crore, or unknown: the 20th everywhere
+        self.assertEqual(self.delay("GSTR3B", "Gujarat", TEN_CRORE, filed, 202402), ("Yes", 5))
+        self.assertEqual(self.delay("GSTR3B", "Delhi", None, filed, 202402), ("Yes", 5))
+        # Up to 5 crore: the 22nd in the day-22 states, the 24th elsewhere
+        self.assertEqual(self.delay("GSTR3B", "Gujarat", 1_00_00_000, filed, 202402), ("Yes", 3))
+        self.assertEqual(self.delay("GSTR3B", "Delhi", 1_00_00_000, filed, 202402), ("Yes", 1))
+        # Exactly 5 crore is in the lower band
+        self.assertEqual(self.delay("GSTR3B", "Delhi", 5_00_00_000, filed, 202402), ("Yes", 1))
+
+    def test_other_return_types(self):
+        self.assertEqual(self.delay("GSTR1", "Gujarat", 1_00_00_000, date(2024, 3, 11), 202402), ("No", 0))
+        self.assertEqual(self.delay("GSTR1", "Gujarat", 1_00_00_000, date(2024, 3, 12), 202402), ("Yes", 1))
+        self.assertEqual(self.delay("CMP08", "Gujarat", 1_00_00_000, date(2024, 3, 18), 202402), ("Yes", 5))
+
+    def test_no_return_period_falls_back_to_the_filing_month(self):
+        self.assertEqual(self.delay("GSTR1", "Delhi", None, date(2024, 3, 20)), ("Yes", 9))
+        self.assertEqual(self.delay("GSTR1", "Delhi", None, date(2024, 3, 5)), ("No", 0))
+
+    def test_filing_without_a_date(self):
+        delays, scorecard = score_filings([("GSTR1", None, 202402)], "Delhi", None, self.TODAY)
+        self.assertEqual(delays, [None])
+        self.assertEqual(scorecard.result, "Pass")
+
+    def test_scorecard(self):
+        # On-time GSTR1s in the window: pass
+        on_time = [("GSTR1", date(2023, month, 10), 202300 + month - 1) for month in range(7, 13)]
+        on_time += [("GSTR1", date(2024, month, 10), 202400 + month - 1) for month in range(2, 5)]
+        _, scorecard = score_filings(on_time, "Delhi", None, self.TODAY)
+        self.assertEqual((scorecard.average_delay, scorecard.long_delays, scorecard.result), (0, 0, "Pass"))
+
+        # Four returns more than 15 days late: fail
+        late = on_time + [("GSTR1", date(2024, 1, 30), 202312)] * 4
+        _, scorecard = score_filings(late, "Delhi", None, self.TODAY)
+        self.assertEqual((scorecard.long_delays, scorecard.result), (4, "Fail"))
+
+        # Anything filed last month fails, even on time
+        _, scorecard = score_filings(on_time + [("GSTR1", date(2024, 5, 10), 202404)], "Delhi", None, self.TODAY)
+        self.assertEqual((scorecard.filed_last_month, scorecard.result), (True, "Fail"))
+
+        # Filings older than a year are not scored
+        _, scorecard = score_filings([("GSTR1", date(2023, 1, 30), 202212)] * 4, "Delhi", None, self.TODAY)
+        self.assertEqual(scorecard.result, "Pass")
+
+class TokenBucketTests(SimpleTestCase):
+    """The rate limiter lets calls through when its database fails."""
+
+    def test_database_error_drops_a_broken_connection(self):
+        bucket = TokenBucket('test', rate=1)
+        for acquire in (bucket.acquire, lambda: async_to_sync(bucket.aacquire)()):
+            with mock.patch.object(TokenBucket, '_reserve', side_effect=DatabaseError("connection lost")), \
+                    mock.patch('api.gst_throttle.connection') as connection:
+                self.assertIs(acquire(), True)
+            connection.close_if_unusable_or_obsolete.assert_called_once_with()
+
+
+def make_company(gstin="27AAAAA0000A1Z5", state="Maharashtra", annual_turnover=None):
+    return CompanyProfile.objects.create(
+        gstin=gstin, legal_name=f"Company {gstin}", state=state,
+        principal_address={}, annual_turnover=annual_turnover,
+    )
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages of the company list."""
+
+    @classmethod
+    def setUpTestData(cls):
+        company = make_company()
+        # Two filings share each date, and two have no date at all
+        dates = [date(2024, 1, 11), date(2024, 1, 11), None, date(2024, 2, 11), date(2024, 2, 11), None, date(2023, 12, 11)]
+        for month, filed in enumerate(dates, start=1):
+            CompanyGSTRecord.objects.create(
+                company=company, return_type="GSTR1", return_period=f"{month:02d}2023",
+                date_of_filing=filed, Delay_days=month,
+            )
+
+    def walk(self, url):
+        """Ids of every row, following next links from ``url``, and the responses."""
+        ids, responses = [], []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            responses.append(response.json())
+            ids.extend(row['id'] for row in responses[-1]['results'])
+            url = responses[-1]['next']
+        return ids, responses
+
+    def expected(self, descending):
+        filings = CompanyGSTRecord.objects.values_list('id', 'date_of_filing')
+        dated = sorted(((filed, pk) for pk, filed in filings if filed), reverse=descending)
+        undated = sorted((pk for pk, filed in filings if filed is None), reverse=descending)
+        # NULL sort keys come last ascending, first descending
+        ids = [pk for _, pk in dated]
+        return undated + ids if descending else ids + undated
+
+    def test_null_sort_keys_ascending(self):
+        ids, _ = self.walk('/api/companies/?ordering=date_of_filing&page_size=2')
+        self.assertEqual(ids, self.expected(descending=False))
+
+    def test_null_sort_keys_descending(self):
+        ids, _ = self.walk('/api/companies/?ordering=-date_of_filing&page_size=2')
+        self.assertEqual(ids, self.expected(descending=True))
+
+    def test_previous_link_returns_the_page_before(self):
+        _, pages = self.walk('/api/companies/?ordering=date_of_filing&page_size=2')
+        for before, page in zip(pages, pages[1:]):
+            previous = self.client.get(page['previous']).json()
+            self.assertEqual([row['id'] for row in previous['results']], [row['id'] for row in before['results']])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_cursor_from_another_ordering_is_rejected(self):
+        next_url = self.client.get('/api/companies/?ordering=date_of_filing&page_size=2').json()['next']
+        response = self.client.get(next_url.replace('ordering=date_of_filing', 'ordering=-Delay_days'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('cursor', response.json())
+
+    def test_garbage_cursor_is_rejected(self):
+        for token in ("not-base64!", base64.urlsafe_b64encode(b'["v"]').decode()):
+            response = self.client.get(f'/api/companies/?ordering=date_of_filing&cursor={token}')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('cursor', response.json())
+
+    def test_cursor_position_of_the_wrong_type_is_rejected(self):
+        payload = {'v': 'not-a-date', 'id': 1, 'r': False, 'o': 'date_of_filing'}
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        response = self.client.get(f'/api/companies/?ordering=date_of_filing&cursor={token}')
+        self.assertEqual(response.status_code, 400)
+
+
+GSTIN = "27AAAAA0000A1Z5"
+
+TAXPAYER = {
+    "gstin": GSTIN, "lgnm": "ACME TRADERS PRIVATE LIMITED", "tradeNam": "ACME TRADERS",
+    "ctb": "Private Limited Company", "rgdt": "01/07/2017", "lstupdt": "15/03/2024",
+    "pradr": {"addr": {"loc": "Maharashtra", "city": "Pune"}},
+}
+
+
+def filing(return_type, period, filed):
+    return {"rtntype": return_type, "ret_prd": period, "dof": filed}
+
+
+class UpsertFilingsTests(TestCase):
+    """Writing a fetched GSTIN, and fetching it again."""
+
+    def setUp(self):
+        self.returns = [filing("GSTR1", "012024", "11-02-2024"), filing("GSTR3B", "012024", "20-02-2024")]
+        upsert_filings(GSTIN, TAXPAYER, self.returns)
+
+    def rows(self):
+        return list(CompanyGSTRecord.objects.order_by('id').values_list(
+            'id', 'return_type', 'return_period', 'date_of_filing', 'period_key', 'result',
+        ))
+
+    def test_refetch_is_idempotent(self):
+        before = self.rows()
+        self.assertEqual(upsert_filings(GSTIN, TAXPAYER, self.returns), 2)
+        self.assertEqual(self.rows(), before)
+        self.assertEqual(CompanyProfile.objects.count(), 1)
+
+    def test_conflicting_filing_is_updated_in_place(self):
+        # The checker's result survives; the upstream columns are refreshed
+        CompanyGSTRecord.objects.update(result="Pass")
+        ids = [row[0] for row in self.rows()]
+        upsert_filings(GSTIN, TAXPAYER, [filing("GSTR1", "012024", "13-02-2024"), filing("GSTR1", "022024", "11-03-2024")])
+
+        rows = self.rows()
+        self.assertEqual([row[0] for row in rows[:2]], ids)
+        self.assertEqual(rows[0][1:], ("GSTR1", "012024", date(2024, 2, 13), 202401, "Pass"))
+        self.assertEqual(rows[2][1:], ("GSTR1", "022024", date(2024, 3, 11), 202402, "N/A"))
+
+    def test_redated_filing_gets_fresh_delays(self):
+        CompanyGSTRecord.objects.update(result="Pass")
+        upsert_filings(GSTIN, TAXPAYER, [filing("GSTR1", "012024", "20-02-2024"), self.returns[1]])
+        self.assertEqual(
+            list(CompanyGSTRecord.objects.order_by('id').values_list('return_type', 'delayed_filling', 'Delay_days', 'result')),
+            [("GSTR1", "Yes", 9, "Pass"), ("GSTR3B", "", None, "Pass")],
+        )
+
+    def test_repeated_period_keeps_the_last(self):
+        upsert_filings(GSTIN, TAXPAYER, [filing("GSTR1", "032024", "11-04-2024"), filing("GSTR1", "032024", "12-04-2024")])
+        self.assertEqual(
+            list(CompanyGSTRecord.objects.filter(return_period="032024").values_list('date_of_filing', flat=True)),
+            [date(2024, 4, 12)],
+        )
+
+    def test_profile_is_refreshed(self):
+        upsert_filings(GSTIN, {**TAXPAYER, "lgnm": "ACME TRADERS LIMITED"}, self.returns)
+        self.assertEqual(CompanyProfile.objects.get(gstin=GSTIN).legal_name, "ACME TRADERS LIMITED")
+
+    def test_turnover_is_updated_only_when_supplied(self):
+        self.assertEqual(CompanyProfile.objects.get(gstin=GSTIN).annual_turnover, 0)
+        upsert_filings(GSTIN, TAXPAYER, self.returns, annual_turnover=7_00_00_000)
+        self.assertEqual(CompanyProfile.objects.get(gstin=GSTIN).annual_turnover, 7_00_00_000)
+        upsert_filings(GSTIN, TAXPAYER, self.returns)
+        self.assertEqual(CompanyProfile.objects.get(gstin=GSTIN).annual_turnover, 7_00_00_000)
+
+    def test_malformed_date_writes_nothing(self):
+        with self.assertRaises(ValueError):
+            upsert_filings(GSTIN, TAXPAYER, [filing("GSTR1", "042024", "2024-05-11")])
+        self.assertFalse(CompanyGSTRecord.objects.filter(return_period="042024").exists())
+
+
+class FetchValidationTests(TestCase):
+    """Bad fetch parameters are rejected before the GST API is called."""
+
+    def test_non_integer_delay_days(self):
+        for url in ('/api/fetch_and_save_gst_record/', '/api/async/fetch_and_save_gst_record/'):
+            with mock.patch('api.views.gst_client') as client, mock.patch('api.views.async_gst_client') as async_client:
+                response = self.client.post(url, {'gstin': GSTIN, 'Delay_days': "ten"}, content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {"error": "Invalid Delay_days value."})
+            client.fetch_gstin.assert_not_called()
+            async_client.fetch_gstin.assert_not_called()
+
+    def test_body_must_be_an_object(self):
+        for url in ('/api/fetch_and_save_gst_record/', '/api/async/fetch_and_save_gst_record/'):
+            for body in ('[]', '"x"'):
+                response = self.client.post(url, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+
+
+class ConditionalGetTests(TestCase):
+    """ETags on the company list and detail: 304 while unchanged, 200 after a write."""
+
+    def setUp(self):
+        upsert_filings(GSTIN, TAXPAYER, [filing("GSTR1", "012024", "11-02-2024")])
+        upsert_filings("29BBBBB0000B1Z5", {**TAXPAYER, "gstin": "29BBBBB0000B1Z5"}, [filing("GSTR1", "012024", "11-02-2024")])
+
+    def assertRevalidates(self, url, write):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        for _ in range(2):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+
+        write()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def set_status(self, gstin, status):
+        response = self.client.put(
+            '/api/update_status_for_gstin/', {'gstin': gstin, 'status': status}, content_type='application/json',
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_list(self):
+        response = self.assertRevalidates('/api/companies/', lambda: self.set_status(GSTIN, "Fail"))
+        self.assertIn("Fail", [row['result'] for row in response.json()])
+
+    def test_list_etag_varies_with_the_query(self):
+        etag = self.client.get('/api/companies/')['ETag']
+        self.assertEqual(self.client.get('/api/companies/?result=Fail', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail(self):
+        response = self.assertRevalidates(f'/api/companies/{GSTIN}/', lambda: self.set_status(GSTIN, "Fail"))
+        self.assertEqual({row['result'] for row in response.json()}, {"Fail"})
+
+    def test_detail_ignores_writes_to_other_companies(self):
+        url = f'/api/companies/{GSTIN}/'
+        etag = self.client.get(url)['ETag']
+        self.set_status("29BBBBB0000B1Z5", "Fail")
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_report_is_not_rendered_for_a_current_etag(self):
+        url = f'/api/companies/{GSTIN}/report/?format=json'
+        etag = self.client.get(url)['ETag']
+        with mock.patch('api.views.render_report') as render:
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        render.assert_not_called()
+        self.assertNotEqual(self.client.get(f'/api/companies/{GSTIN}/report/?format=html')['ETag'], etag)
+
+        response = self.assertRevalidates(url, lambda: self.set_status(GSTIN, "Fail"))
+        self.assertEqual(response.json()['result'], "Fail")
+
+
+class UpdateGSTRecordTests(TestCase):
+    """The checker's PUT of turnover and status."""
+
+    def setUp(self):
+        upsert_filings(GSTIN, TAXPAYER, [filing("GSTR1", "012024", "11-02-2024")])
+        set_results({GSTIN: "Pass"})
+
+    def put(self, **data):
+        return self.client.put('/api/update_gst_record/', {'gstin': GSTIN, **data}, content_type='application/json')
+
+    def results(self):
+        return set(CompanyGSTRecord.objects.values_list('result', flat=True)), Score.objects.get(company_id=GSTIN).result
+
+    def test_unchanged_turnover_without_status_keeps_the_result(self):
+        self.assertEqual(self.put(annual_turnover=0).status_code, 200)
+        self.assertEqual(self.results(), ({"Pass"}, "Pass"))
+
+    def test_unchanged_turnover_applies_the_status(self):
+        self.assertEqual(self.put(annual_turnover=0, status="Fail").status_code, 200)
+        self.assertEqual(self.results(), ({"Fail"}, "Fail"))
+
+    def test_set_results_refuses_a_missing_result(self):
+        with self.assertRaises(ValueError):
+            set_results({GSTIN: None})
+        self.assertEqual(self.results(), ({"Pass"}, "Pass"))
+
+
+class ReplicaPinTests(TransactionTestCase):
+    """Read-your-writes for the frontend, which calls cross-origin without cookies."""
+
+    ORIGIN = "https://app.buycommodity.in"
+
+    def setUp(self):
+        upsert_filings(GSTIN, TAXPAYER, [filing("GSTR1", "012024", "11-02-2024")])
+        self.reads = []
+        route = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            # Note where each read would go, but run it on the test database
+            self.reads.append(route(router, model, **hints))
+            return 'default'
+
+        for patcher in (
+            mock.patch('api.db_router.replicas', return_value=['replica']),
+            mock.patch.object(ReplicaRouter, 'db_for_read', record),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def get_list(self, **headers):
+        self.client.cookies.clear()
+        self.reads.clear()
+        response = self.client.get('/api/companies/', HTTP_ORIGIN=self.ORIGIN, **headers)
+        self.assertEqual(response.status_code, 200)
+        return set(self.reads)
+
+    def test_echoed_pin_reads_from_the_primary(self):
+        response = self.client.put(
+            '/api/update_status_for_gstin/', {'gstin': GSTIN, 'status': "Fail"},
+            content_type='application/json', HTTP_ORIGIN=self.ORIGIN,
+        )
+        self.assertIn(PIN_HEADER, response['Access-Control-Expose-Headers'])
+        pin = response[PIN_HEADER]
+
+        self.assertEqual(self.get_list(**{'HTTP_X_DB_PRIMARY_UNTIL': pin}), {'default'})
+        self.assertEqual(self.get_list(), {'replica'})
+
+    def test_expired_or_malformed_pin_reads_from_a_replica(self):
+        self.assertEqual(self.get_list(HTTP_X_DB_PRIMARY_UNTIL=str(int(time.time()) - 1)), {'replica'})
+        self.assertEqual(self.get_list(HTTP_X_DB_PRIMARY_UNTIL="soon"), {'replica'})
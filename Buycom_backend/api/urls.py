@@ -15,12 +15,22 @@ router.register(r'scores', views.ScoreViewSet)
 urlpatterns = [
     path('login/', LoginView.as_view(), name='login'),
     path('logout/', views.logout_view, name='logout'),
+    path('companies/export/', views.export_filings, name='export_filings'),
+    path('companies/search/', views.company_search, name='company_search'),
     path('companies/<str:gstin>/', CompanyDetailView.as_view(), name='company-detail'),
+    path('companies/<str:gstin>/report/', views.company_report, name='company_report'),
+    path('reports/bulk/', views.bulk_reports, name='bulk_reports'),
     path('api-token-auth/', obtain_auth_token, name='api_token_auth'),
     path('update_gst_record/', views.update_gst_record, name='update_gst_record'),
     path('update_annual_turnover/', views.update_annual_turnover_and_status, name='update_annual_turnover_and_status'),
     path('update_status_for_gstin/', views.update_status_for_gstin, name='update_status_for_gstin'),
+    path('update_status_bulk/', views.update_status_bulk, name='update_status_bulk'),
     path('fetch_and_save_gst_record/', views.fetch_and_save_gst_record, name='fetch_and_save_gst_record'),
+    path('async/fetch_and_save_gst_record/', views.fetch_and_save_gst_record_async, name='fetch_and_save_gst_record_async'),
+    path('ingest_jobs/', views.create_ingest_job, name='create_ingest_job'),
+    path('ingest_jobs/<int:job_id>/', views.ingest_job_status, name='ingest_job_status'),
+    path('upstream_cache/', views.upstream_cache, name='upstream_cache'),
+    path('metrics/', views.metrics, name='metrics'),
     path('', include(router.urls)), 
 ]
 
@@ -0,0 +1,46 @@
+import hashlib
+
+from django.db.models import F
+from django.utils import timezone
+
+from .models import CompanyProfile, DataVersion
+
+# DataVersion row bumped on every change to filings or company profiles
+FILINGS = 'filings'
+
+
+def touch(gstins):
+    """
+    Record that the filings or profiles of ``gstins`` changed: bumps each
+    company's version and the global filings counter.
+
+    Call it inside the transaction making the change, after the writes, so
+    the counter row is locked only until the commit.
+    """
+    now = timezone.now()
+    gstins = list(gstins)
+    if gstins:
+        CompanyProfile.objects.filter(gstin__in=gstins).update(version=F('version') + 1, updated_at=now)
+    if not DataVersion.objects.filter(name=FILINGS).update(version=F('version') + 1, updated_at=now):
+        DataVersion.objects.get_or_create(name=FILINGS, defaults={'version': 1, 'updated_at': now})
+
+
+def filings_version():
+    """``(version, updated_at)`` of the filings table as a whole."""
+    return DataVersion.objects.filter(name=FILINGS).values_list('version', 'updated_at').first() or (0, None)
+
+
+def company_version(gstin):
+    """``(version, updated_at)`` of one company, or None if it is unknown."""
+    return CompanyProfile.objects.filter(gstin=gstin).values_list('version', 'updated_at').first()
+
+
+def make_etag(version, request):
+    """
+    Strong ETag for a response built from data at ``version``.
+
+    The full path and Accept header are mixed in, since the same data gives
+    a different body for other filters, pages or renderers.
+    """
+    key = f"{version}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
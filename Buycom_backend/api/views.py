@@ -1,38 +1,46 @@
 from rest_framework import viewsets
-from .models import Login, CompanyDetails, Return, Score, CompanyGSTRecord
-from .serializers import LoginSerializer, CompanyDetailsSerializer, ReturnSerializer, ScoreSerializer, CompanyGSTRecordSerializer
-import requests
+from .models import Login, CompanyDetails, Return, Score, CompanyProfile, CompanyGSTRecord, IngestJob
+from .serializers import LoginSerializer, CompanyDetailsSerializer, ReturnSerializer, ScoreSerializer, CompanyGSTRecordSerializer, CompanyGSTRecordSummarySerializer, IngestJobItemSerializer
 from rest_framework.response import Response
 from rest_framework import status
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views import View
-from django.db.models import Q
 from rest_framework.views import APIView
 import logging
 from django.contrib.auth.models import User
 from rest_framework.authtoken.models import Token
-from django.db import IntegrityError  
-from datetime import datetime, timedelta
+from django.db import IntegrityError
 from rest_framework.generics import GenericAPIView
 from rest_framework.authentication import BasicAuthentication, SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from django.contrib.auth import authenticate
 from rest_framework_simplejwt.tokens import RefreshToken
-from django.db.models.functions import Cast
 from django.contrib.auth import logout
-from django.db.models import Avg, F, Value, Case, When, IntegerField
+from django.conf import settings
+from .gst_client import gst_client, GSTAPIError, GSTAPIUnavailable
+from .gst_async import async_gst_client
+from .export import EXPORT_FORMATS, ExportError, check_format, export_chunks, export_filename, export_rows
+from django.http import HttpResponse, StreamingHttpResponse
+from .reports import REPORT_FORMATS, REPORT_VERSION, ReportError, check_format as check_report_format, load_reports, render_report, render_reports, zip_reports
+from .search import DEFAULT_RESULTS, SearchError, search_companies
+from rest_framework.exceptions import ValidationError
+from asgiref.sync import sync_to_async
+import json
+from .ingest import upsert_filings
+from .filters import FilingFilter, get_filing_ordering, get_sparse_fields
+from .pagination import KeysetPagination
+from .scoring import score_company, set_results
+from .ingest_jobs import IngestJobError, create_job, job_progress, read_gstin_csv, start_job
+from .versions import company_version, filings_version, make_etag
+from .metrics import metrics_enabled, render_metrics
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
 
 # Initialize the logger
 logger = logging.getLogger(__name__)
 
-# API credentials
-ASP_ID = "1755060724"
-PASSWORD = "Cash@2020"
-BASE_URL = "https://gstapi.charteredinfo.com/commonapi/v1.1/search"
-RETURNS_URL = "https://gstapi.charteredinfo.com/commonapi/v1.0/returns"
-
 
 class LoginView(APIView):
     def post(self, request, *args, **kwargs):
@@ -67,142 +75,185 @@ def logout_view(request):
 
 
 
+def _optional_int(value):
+    # Absent or blank is None: a turnover sent with a fetch replaces the
+    # stored one, none keeps it. Raises TypeError or ValueError for anything
+    # but an integer
+    if value is None or value == '':
+        return None
+    return int(value)
+
+
 @api_view(['GET', 'POST'])
 def fetch_and_save_gst_record(request):
+    if not isinstance(request.data, dict):
+        return Response({"error": "JSON body must be an object."}, status=400)
     gstin = request.data.get('gstin')
     
     if not gstin:
         logger.error("GSTIN is required but not provided.")
         return Response({"error": "GSTIN is required."}, status=400)
 
-    fetch_date = datetime.today().strftime('%d-%m-%Y')
-    annual_turnover = request.data.get('annual_turnover', '0')
+    try:
+        annual_turnover = _optional_int(request.data.get('annual_turnover'))
+    except (TypeError, ValueError):
+        return Response({"error": "Invalid annual_turnover value."}, status=400)
+    try:
+        Delay_days = _optional_int(request.data.get('Delay_days') or None)
+    except (TypeError, ValueError):
+        return Response({"error": "Invalid Delay_days value."}, status=400)
     delayed_filling = request.data.get('delayed_filling', '')
-    Delay_days = request.data.get('Delay_days', '')
     result = request.data.get('result', 'N/A')
-    
-    # Fetch primary GST data (API 1)
-    url1 = f"{BASE_URL}?aspid={ASP_ID}&password={PASSWORD}&Action=TP&Gstin={gstin}"
-    response1 = requests.get(url1)
-    logger.info("Response from first API (status code: %s): %s", response1.status_code, response1.text)
-
-    if response1.status_code != 200:
-        logger.error("Failed to fetch data from first API.")
-        return Response({"error": "Failed to fetch data from first API."}, status=500)
-    
-    gst_data = response1.json()
-    if not gst_data:
-        logger.error("No data found in first API response.")
-        return Response({"error": "No data found in first API response."}, status=500)
-
-    # Determine financial years for URL 2 and URL 3
-    current_date = datetime.today()
-
-    # Get the current month and year
-    current_month = current_date.month
-    current_year_old = current_date.year
-    current_year = current_year_old + 1
-    # Calculate the start month and year for the last 12 months
-    start_month = current_month - 11  # 12 months back, including the current month
-    if start_month <= 0:  # If the start month is before January, adjust the year
-        start_month += 12
-        start_year = current_year - 1
-    else:
-        start_year = current_year - 1
-        
-    # Get the last two digits of the year
-    start_year_short = str(start_year)[2:]
-    current_year_short = str(current_year)[2:]
-
-    # Set the financial year (fy) to reflect the range from the start month to the current month of the current year
-    fy = f"{start_year}-{current_year_short}"
-
-    # Debug output to check the values
-    print("Financial Year : ", fy)
-    fy3 = f"{start_year - 1}-{str(start_year)[2:]}"
-    print("Financial Year : ", fy3)
-
-    # Fetch return data for URL 2
-    url2 = f"{RETURNS_URL}?aspid={ASP_ID}&password={PASSWORD}&Action=RETTRACK&Gstin={gstin}&fy={fy}"
-    response2 = requests.get(url2)
-    logger.info("Response from second API (status code: %s): %s", response2.status_code, response2.text)
-
-    if response2.status_code != 200:
-        logger.error("Failed to fetch data from second API.")
-        return Response({"error": "Failed to fetch data from second API."}, status=500)
-    
-    data2 = response2.json()
-    if "EFiledlist" not in data2:
-        logger.error("No 'EFiledlist' field in second API response.")
-        return Response({"error": "Invalid response structure from second API."}, status=500)
-
-    # Fetch return data for URL 3
-    url3 = f"{RETURNS_URL}?aspid={ASP_ID}&password={PASSWORD}&Action=RETTRACK&Gstin={gstin}&fy={fy3}"
-    response3 = requests.get(url3)
-    logger.info("Response from third API (status code: %s): %s", response3.status_code, response3.text)
-
-    if response3.status_code != 200:
-        logger.error("Failed to fetch data from third API.")
-        return Response({"error": "Failed to fetch data from third API."}, status=500)
-    
-    data3 = response3.json()
-    if "EFiledlist" not in data3:
-        logger.error("No 'EFiledlist' field in third API response.")
-        return Response({"error": "Invalid response structure from third API."}, status=500)
-
-    # Process and save data from data2 and data3
-    all_return_data = data2.get("EFiledlist", []) + data3.get("EFiledlist", [])
-    principal_address = gst_data.get("pradr", {})
-    registration_date = gst_data.get("rgdt")
-    last_update = gst_data.get("lstupdt")
-
-    for record in all_return_data:
-        return_type = record.get("rtntype")
-        date_of_filing = record.get("dof")
-        period = record.get("ret_prd", "")
-        return_status = request.data.get("status", "Active")
-        year = period[2:] if period else ""
-        month = period[:2] if period else ""
-
-        try:
-            registration_date_str = datetime.strptime(registration_date, '%d/%m/%Y').strftime('%d-%m-%Y') if registration_date else None
-            last_update_str = datetime.strptime(last_update, '%d/%m/%Y').strftime('%d-%m-%Y') if last_update else None
-            date_of_filing_str = datetime.strptime(date_of_filing, '%d-%m-%Y').strftime('%d-%m-%Y') if date_of_filing else None
-        except ValueError as e:
-            logger.error(f"Date format error: {e}")
-            return Response({"error": "Date format error."}, status=500)
-
-        state = gst_data.get("pradr", {}).get("addr", {}).get("loc", "N/A")
-        city = gst_data.get("pradr", {}).get("addr", {}).get("city", "N/A")
-
-        company_gst_record = CompanyGSTRecord.objects.create(
-            gstin=gstin,
-            legal_name=gst_data.get("lgnm"),
-            trade_name=gst_data.get("tradeNam"),
-            company_type=gst_data.get("ctb"),
-            principal_address=principal_address,
-            registration_date=registration_date_str,
-            last_update=last_update_str,
-            state=state,
-            city=city,
-            date_of_filing=date_of_filing_str,
-            return_type=return_type,
-            return_period=period,
-            return_status=return_status,
-            year=year,
-            month=month,
-            fetch_date=fetch_date,
+    return_status = request.data.get("status", "Active")
+    # Bypass the upstream cache and fetch fresh data
+    refresh = str(request.data.get('refresh', '')).lower() in ('1', 'true', 'yes')
+
+    # Fetch the TP search and both RETTRACK years concurrently
+    try:
+        gst_data, all_return_data = gst_client.fetch_gstin(gstin, use_cache=not refresh)
+    except GSTAPIUnavailable as e:
+        return Response({"error": str(e)}, status=503, headers={"Retry-After": str(e.retry_after)})
+    except GSTAPIError as e:
+        return Response({"error": str(e)}, status=500)
+
+    # Upsert every filing in a single batched statement
+    try:
+        upsert_filings(
+            gstin, gst_data, all_return_data,
             annual_turnover=annual_turnover,
             delayed_filling=delayed_filling,
             Delay_days=Delay_days,
             result=result,
-            additional_data=gst_data
+            return_status=return_status,
         )
-        logger.info(f"Record saved: {company_gst_record}")
+    except ValueError as e:
+        logger.error(f"Date format error: {e}")
+        return Response({"error": "Date format error."}, status=500)
 
     return Response({"message": "Data fetched and saved successfully."})
 
 
+@csrf_exempt
+async def fetch_and_save_gst_record_async(request):
+    """
+    Async version of fetch_and_save_gst_record for the ASGI app.
+
+    Same request body and responses. The upstream calls are awaited on the
+    event loop instead of holding a worker thread, and only the upsert runs
+    in a thread.
+    """
+    if request.method != 'POST':
+        return JsonResponse({"error": "Method not allowed."}, status=405)
+    try:
+        data = json.loads(request.body or b'{}') if request.content_type == 'application/json' else request.POST
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON body."}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"error": "JSON body must be an object."}, status=400)
+
+    gstin = data.get('gstin')
+    if not gstin:
+        logger.error("GSTIN is required but not provided.")
+        return JsonResponse({"error": "GSTIN is required."}, status=400)
+    refresh = str(data.get('refresh', '')).lower() in ('1', 'true', 'yes')
+    try:
+        annual_turnover = _optional_int(data.get('annual_turnover'))
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "Invalid annual_turnover value."}, status=400)
+    try:
+        Delay_days = _optional_int(data.get('Delay_days') or None)
+    except (TypeError, ValueError):
+        return JsonResponse({"error": "Invalid Delay_days value."}, status=400)
+
+    try:
+        gst_data, all_return_data = await async_gst_client.fetch_gstin(gstin, use_cache=not refresh)
+    except GSTAPIUnavailable as e:
+        response = JsonResponse({"error": str(e)}, status=503)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+    except GSTAPIError as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+    try:
+        await sync_to_async(upsert_filings)(
+            gstin, gst_data, all_return_data,
+            annual_turnover=annual_turnover,
+            delayed_filling=data.get('delayed_filling', ''),
+            Delay_days=Delay_days,
+            result=data.get('result', 'N/A'),
+            return_status=data.get("status", "Active"),
+        )
+    except ValueError as e:
+        logger.error(f"Date format error: {e}")
+        return JsonResponse({"error": "Date format error."}, status=500)
+
+    return JsonResponse({"message": "Data fetched and saved successfully."})
+
+
+
+@api_view(['POST'])
+def create_ingest_job(request):
+    """
+    Queue a batch of GSTINs for ingestion.
+
+    Accepts JSON ``{"gstins": [...], "concurrency": 8}`` where each entry is a
+    GSTIN or ``{"gstin": ..., "annual_turnover": ...}``, or a CSV of
+    ``gstin[,annual_turnover]`` rows uploaded as ``file``. The job runs in the
+    background; poll ``ingest_job_status`` for progress.
+    """
+    upload = request.FILES.get('file')
+    if upload is not None:
+        try:
+            rows = read_gstin_csv(upload.read().decode('utf-8-sig'))
+        except UnicodeDecodeError:
+            return Response({"error": "CSV must be UTF-8 encoded."}, status=400)
+    else:
+        rows = request.data.get('gstins')
+        if not isinstance(rows, list):
+            return Response({"error": "Provide 'gstins' as a list or upload a CSV as 'file'."}, status=400)
+
+    try:
+        job = create_job(rows, concurrency=request.data.get('concurrency'))
+    except IngestJobError as e:
+        return Response({"error": e.args[0]}, status=400)
+    except ValueError:
+        return Response({"error": "Invalid concurrency value."}, status=400)
+
+    start_job(job)
+    return Response(job_progress(job), status=202)
+
+
+@api_view(['GET'])
+def ingest_job_status(request, job_id):
+    job = IngestJob.objects.filter(pk=job_id).first()
+    if job is None:
+        return Response({"error": "Job not found."}, status=404)
+
+    progress = job_progress(job)
+    items = job.items.order_by('id')
+    if request.query_params.get('item_status'):
+        items = items.filter(status=request.query_params['item_status'])
+    progress["items"] = IngestJobItemSerializer(items, many=True).data
+    return Response(progress)
+
+
+def metrics(request):
+    """Request, database and upstream metrics of this process, in the Prometheus text format."""
+    if not metrics_enabled():
+        return JsonResponse({"error": "Metrics are disabled."}, status=404)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@api_view(['GET', 'DELETE'])
+def upstream_cache(request):
+    """GET: cache hit/miss counters and size. DELETE: drop every cached response."""
+    if gst_client.cache is None:
+        return Response({"error": "The GST API cache is disabled."}, status=404)
+    if request.method == 'DELETE':
+        gst_client.cache.clear()
+        return Response({"message": "GST API cache cleared."})
+    return Response(gst_client.cache.stats())
+
 
 @api_view(['PUT'])
 def update_gst_record(request):
@@ -214,20 +265,12 @@ def update_gst_record(request):
         logger.error("GSTIN is required but not provided.")
         return Response({"error": "GSTIN is required."}, status=400)
 
-    # Fetch the records with the specified GSTIN and required return types
-    records = CompanyGSTRecord.objects.filter(
-        gstin=gstin,
-        return_type__in=["GSTR3B", "GSTR1"]
-    )
-    
+    company = CompanyProfile.objects.filter(gstin=gstin).first()
 
-    
-    if not records.exists():
-        logger.info(f"No records found for GSTIN {gstin} with required return types.")
+    if company is None or not company.filings.exists():
+        logger.info(f"No records found for GSTIN {gstin}.")
         return Response({"message": "No applicable records found."}, status=404)
 
-    # if annual_turnover == annual_turnover:
-        
     # Validate and handle annual_turnover
     if annual_turnover == "" or annual_turnover is None:
         annual_turnover = None  # Set to None for the database
@@ -238,109 +281,15 @@ def update_gst_record(request):
             logger.error(f"Invalid annual_turnover value: {annual_turnover}")
             return Response({"error": "Invalid annual_turnover value."}, status=400)
 
-    # Function to determine due date
-    def determine_due_date(state, annual_turnover):
-        if annual_turnover is None:
-            return 20  # Default due date
-        if annual_turnover > 5_00_00_000:  # 5 Crore
-            return 20
-        elif state in [
-            "Chhattisgarh", "Madhya Pradesh", "Gujarat", "Daman and Diu",
-            "Dadra and Nagar Haveli", "Maharashtra", "Karnataka", "Goa",
-            "Lakshadweep", "Kerala", "Tamil Nadu", "Puducherry",
-            "Andaman and Nicobar Islands", "Telangana", "Andhra Pradesh"
-        ]:
-            return 22
-        else:
-            return 24
-
-    for record in records:
-        print(record.annual_turnover == annual_turnover)
-        print(type(record.annual_turnover))
-        print(type(annual_turnover))    
-        
-        if int(record.annual_turnover) == annual_turnover: 
-            print(type(record.annual_turnover))
-            
-            print("if condition is running")
-            
-            record.result = status 
-            record.save() 
-            annual_turnover = int(annual_turnover)
-        elif record.annual_turnover != annual_turnover:  # Corrected inequality check
-            # Debug print statement to check values and types
-            print("elif condition is running")
-            
-            # Update annual_turnover and recalculate result if annual_turnover is provided
-            if annual_turnover is not None:
-                print("Updating record.annual_turnover")
-                record.annual_turnover = annual_turnover
-
-                # Debugging: print the updated value of annual_turnover
-                print(f"Updated record.annual_turnover: {record.annual_turnover}")
-
-                # Recalculate status (result) based on annual_turnover
-                state = record.state
-                filing_date = datetime.strptime(record.date_of_filing, "%d-%m-%Y")
-
-                # Determine due date based on state and annual_turnover
-                due_day = determine_due_date(state, annual_turnover)
-                due_date = filing_date.replace(day=due_day)
-
-                # Calculate delayed filling and delay days
-                delayed_filling = "Yes" if filing_date > due_date else "No"
-                delay_days = (filing_date - due_date).days if delayed_filling == "Yes" else 0
-
-                # Update delayed_filling and delay_days
-                record.delayed_filling = delayed_filling
-                record.Delay_days = str(delay_days)
-
-                # Recalculate result based on delay conditions
-                past_year_records = CompanyGSTRecord.objects.filter(
-                    gstin=gstin,
-                    return_type__in=["GSTR3B", "GSTR1"],
-                    date_of_filing__gte=datetime.now() - timedelta(days=365)
-                )
-
-                avg_delay = past_year_records.aggregate(
-                    avg_delay=Avg(
-                        Case(
-                            When(Delay_days__regex=r"^\d+$", then=Cast("Delay_days", IntegerField())),
-                            default=Value(0),
-                            output_field=IntegerField(),
-                        )
-                    )
-                )["avg_delay"] or 0
-
-                # long_delays = past_year_records.filter(Delay_days__gt="15").count()
-                long_delays = past_year_records.annotate(
-                    delay_days_int=Cast('Delay_days', IntegerField())
-                ).filter(delay_days_int__gt=15).count()
-                print("long_delays : ", long_delays)
-                immediate_past_month = (datetime.now().replace(day=1) - timedelta(days=1)).month
-
-                result = "Pass" if (
-                    avg_delay <= 7 and long_delays <= 3 and
-                    all(
-                        datetime.strptime(past_record.date_of_filing, "%d-%m-%Y").month != immediate_past_month
-                        for past_record in past_year_records
-                    )
-                ) else "Fail"
-
-                record.result = result  # Update the result after recalculation
-
-                # Save the record after updates
-            record.save()
-
-            print("Record saved after update.")
-            
-        # Ensure record is saved in case it's updated in any block
-        record.save()
-
-    # After loop finishes
-    print("Processing completed.")
-
-
+    if company.annual_turnover == annual_turnover:
+        # Turnover unchanged: the checker's status, if sent, is applied as the result
+        if status is not None:
+            set_results({gstin: status})
+    elif annual_turnover is not None:
+        # Turnover changed: recompute delays and the result from the filings
+        company.annual_turnover = annual_turnover
+        company.save(update_fields=['annual_turnover'])
+        score_company(company)
 
     return Response({"message": "GST records updated successfully."})
 
@@ -353,13 +302,11 @@ def update_annual_turnover_and_status(request):
     if not gstin:
         return Response({"error": "GSTIN is required."}, status=400)
 
-    records = CompanyGSTRecord.objects.filter(gstin=gstin)
+    company = CompanyProfile.objects.filter(gstin=gstin).first()
 
-    if not records.exists():
+    if company is None or not company.filings.exists():
         return Response({"message": "No applicable records found."}, status=404)
 
-    print("annual_turnover :", annual_turnover)
-    print(type(annual_turnover))
     if annual_turnover == "" or annual_turnover is None:
         annual_turnover = None
     else:
@@ -367,88 +314,12 @@ def update_annual_turnover_and_status(request):
             annual_turnover = int(annual_turnover)
         except ValueError:
             return Response({"error": "Invalid annual_turnover value."}, status=400)
-    
-    print("annual_turnover2 :", annual_turnover)
-    print(type(annual_turnover))
-    
-    def determine_due_date(return_type, state, annual_turnover):
-        if return_type == "GSTR3B":
-            if annual_turnover is None or annual_turnover > 5_00_00_000:
-                return 20
-            elif state in [
-                "Chhattisgarh", "Madhya Pradesh", "Gujarat", "Daman and Diu",
-                "Dadra and Nagar Haveli", "Maharashtra", "Karnataka", "Goa",
-                "Lakshadweep", "Kerala", "Tamil Nadu", "Puducherry",
-                "Andaman and Nicobar Islands", "Telangana", "Andhra Pradesh"
-            ]:
-                return 22
-            else:
-                return 24
-        elif return_type == "GSTR1":
-            return 11
-        else:
-            return 13
-        
-    print("annual_turnover3 :", annual_turnover)
-    print(type(annual_turnover))
-    
-    for record in records:
-        if annual_turnover is not None and record.annual_turnover != annual_turnover:
-            record.annual_turnover = annual_turnover
-
-            due_day = determine_due_date(record.return_type, record.state, annual_turnover)
-            filing_date = datetime.strptime(record.date_of_filing, "%d-%m-%Y")
-            due_date = filing_date.replace(day=due_day)
-
-            delayed_filling = "Yes" if filing_date > due_date else "No"
-            delay_days = (filing_date - due_date).days if delayed_filling == "Yes" else 0
-
-            record.delayed_filling = delayed_filling
-            record.Delay_days = delay_days
-            print("annual_turnover4 :", annual_turnover)
-            print(type(annual_turnover))
-            past_year_records = CompanyGSTRecord.objects.filter(
-                gstin=gstin,
-                date_of_filing__gte=datetime.now() - timedelta(days=365)
-            )
-
-                        
-            valid_records = past_year_records.filter(
-                ~Q(Delay_days="") & ~Q(Delay_days=None)
-            ).annotate(
-                delay_days_int=Cast("Delay_days", IntegerField())
-            )
-
-            avg_delay = valid_records.aggregate(avg_delay=Avg("delay_days_int"))["avg_delay"] or 0
 
-
-            print("annual_turnover5 :", annual_turnover)
-            print(type(annual_turnover))
-            
-            valid_records = past_year_records.filter(
-                ~Q(Delay_days="") & ~Q(Delay_days=None)
-            )
-
-            # Annotate and filter records with delays greater than 15
-            long_delays = valid_records.annotate(
-                delay_days_int=Cast('Delay_days', IntegerField())
-            ).filter(delay_days_int__gt=15).count()
-
-            print("annual_turnover6 :", annual_turnover)
-            print(type(annual_turnover))
-            immediate_past_month = (datetime.now().replace(day=1) - timedelta(days=1)).month
-            result = "Pass" if (
-                avg_delay <= 7 and long_delays <= 3 and
-                all(
-                    datetime.strptime(past_record.date_of_filing, "%d-%m-%Y").month != immediate_past_month
-                    for past_record in past_year_records
-                )
-            ) else "Fail"
-            
-            print("annual_turnover7 :", annual_turnover)
-            print(type(annual_turnover))
-            record.result = result
-            record.save()
+    # Turnover lives on the company profile, shared by all of its filings
+    if annual_turnover is not None and company.annual_turnover != annual_turnover:
+        company.annual_turnover = annual_turnover
+        company.save(update_fields=['annual_turnover'])
+        score_company(company)
 
     return Response({"message": "Annual turnover and status updated successfully."})
 
@@ -461,16 +332,89 @@ def update_status_for_gstin(request):
     if not gstin or not status:
         return Response({"error": "GSTIN and status are required."}, status=400)
 
-    records = CompanyGSTRecord.objects.filter(gstin=gstin)
+    # One UPDATE for every filing of the GSTIN, and its Score row
+    updated = set_results({gstin: status})[gstin]
 
-    if not records.exists():
+    if not updated:
         return Response({"message": "No records found for the given GSTIN."}, status=404)
 
-    for record in records:
-        record.result = status
-        record.save()
+    return Response({"message": "Status updated successfully.", "updated": updated})
 
-    return Response({"message": "Status updated successfully."})
+
+@api_view(['PUT'])
+def update_status_bulk(request):
+    """
+    Set the status of many GSTINs in one transaction.
+
+    Accepts ``{"updates": [{"gstin": ..., "status": ...}, ...]}``. If a GSTIN
+    appears more than once its last status wins. Returns the number of
+    filings updated per GSTIN, 0 where the GSTIN has no filings.
+    """
+    updates = request.data.get('updates')
+    if not isinstance(updates, list) or not updates:
+        return Response({"error": "updates must be a non-empty list of {gstin, status}."}, status=400)
+
+    max_items = getattr(settings, 'STATUS_UPDATE_MAX_ITEMS', 10_000)
+    if len(updates) > max_items:
+        return Response({"error": f"At most {max_items} updates per request."}, status=400)
+
+    statuses, errors = {}, []
+    for line, update in enumerate(updates, start=1):
+        gstin = update.get('gstin') if isinstance(update, dict) else None
+        status = update.get('status') if isinstance(update, dict) else None
+        if not gstin or not status:
+            errors.append(f"Update {line}: GSTIN and status are required.")
+            continue
+        statuses[gstin] = status
+    if errors:
+        return Response({"error": errors}, status=400)
+
+    updated = set_results(statuses)
+    return Response({
+        "message": "Status updated successfully.",
+        "updated": updated,
+        "not_found": [gstin for gstin, count in updated.items() if not count],
+    })
+
+
+def _sparse_serializer(serializer_class, params):
+    """
+    ``(serializer kwargs, columns)`` for the ?fields= / ?exclude= in
+    ``params``: the fields to render and the ORM columns they need.
+    """
+    fields, exclude = get_sparse_fields(params, serializer_class.Meta.fields)
+    serializer = serializer_class(fields=fields, exclude=exclude)
+    return {'fields': fields, 'exclude': exclude}, serializer.get_columns()
+
+
+def _only(queryset, columns):
+    # Join the profile only when one of its columns is rendered
+    if any(column.startswith('company__') for column in columns):
+        queryset = queryset.select_related('company')
+    return queryset.only(*columns)
+
+
+def _conditional(request, version):
+    """
+    Conditional GET of data at ``version`` (``(number, updated_at)``).
+
+    Returns ``(not_modified, headers)``: a 304 response when the client's
+    If-None-Match / If-Modified-Since is still current (else None), and the
+    validator headers to send with the full response.
+    """
+    number, updated_at = version
+    etag = quote_etag(make_etag(number, request))
+    # Clients may keep the body but must revalidate it before reuse
+    headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+    last_modified = None
+    if updated_at:
+        last_modified = int(updated_at.timestamp())
+        headers['Last-Modified'] = http_date(last_modified)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        for header, value in headers.items():
+            not_modified[header] = value
+    return not_modified, headers
 
 
 class LoginViewSet(viewsets.ModelViewSet):
@@ -478,16 +422,213 @@ class LoginViewSet(viewsets.ModelViewSet):
     serializer_class = LoginSerializer
 
 class CompanyViewSet(viewsets.ModelViewSet):
-    queryset = CompanyGSTRecord.objects.all()
+    """
+    Filing rows with their company profile inlined.
+
+    List filters: ?legal_name=, ?gstin=, ?state= (substring), ?result=,
+    ?return_type= (exact). Sort with ?ordering=<key> or ?ordering=-<key>.
+    Pass ?page_size= to get cursor-paginated pages, and ?count=exact or
+    ?count=estimated for a total.
+
+    Lists render the full row, as they always have; ?view=summary renders
+    only the columns of the checker table. Pick any columns of the full row
+    with ?fields=a,b or drop some with ?exclude=a,b (also on a single row);
+    only those columns are read.
+
+    Lists carry an ETag and Last-Modified from the filings change counter;
+    a matching conditional GET is answered 304 without reading any rows.
+    """
+    queryset = CompanyGSTRecord.objects.select_related('company')
     serializer_class = CompanyGSTRecordSerializer
+    filter_backends = [FilingFilter]
+    pagination_class = KeysetPagination
+
+    def get_ordering(self):
+        return get_filing_ordering(self.request.query_params)
+
+    def get_serializer_class(self):
+        params = self.request.query_params
+        if self.action == 'list' and params.get('view') == 'summary' and 'fields' not in params:
+            return CompanyGSTRecordSummarySerializer
+        return CompanyGSTRecordSerializer
+
+    def get_sparse_fields(self):
+        # Parsed once per request: (serializer kwargs, columns)
+        if not hasattr(self, '_sparse_fields'):
+            self._sparse_fields = _sparse_serializer(self.get_serializer_class(), self.request.query_params)
+        return self._sparse_fields
+
+    def get_serializer(self, *args, **kwargs):
+        # Sparse fieldsets apply to reads; writes take the full row
+        if self.request.method == 'GET':
+            kwargs.update(self.get_sparse_fields()[0])
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method != 'GET':
+            return queryset
+        columns = set(self.get_sparse_fields()[1])
+        if self.action == 'list':
+            # The sort key is read back for the page cursors
+            columns.add(self.get_ordering()[0])
+        return _only(queryset.select_related(None), columns)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        path, descending = self.get_ordering()
+        return queryset.order_by(*KeysetPagination.order_by(path, descending))
+
+    def list(self, request, *args, **kwargs):
+        not_modified, headers = _conditional(request, filings_version())
+        if not_modified is not None:
+            return not_modified
+        response = self.list_values() or super().list(request, *args, **kwargs)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+
+    def list_values(self):
+        """
+        Fast path for lists whose fields are all plain columns: rows are read
+        with .values() and rendered without a serializer per row. Returns
+        None when the fields need the serializer.
+        """
+        serializer = self.get_serializer()
+        columns = serializer.get_values_columns()
+        if columns is None:
+            return None
+        # The id and sort key are read back for the page cursors
+        paths = {'id', self.get_ordering()[0], *columns.values()}
+        queryset = self.filter_queryset(self.get_queryset()).values(*paths)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.from_values(page))
+        return Response(serializer.from_values(queryset))
+
+def export_filings(request):
+    """
+    Stream filing rows as a file download.
+
+    ?format=csv (default), ndjson or parquet, and ?gzip=1 to compress. Takes
+    the same filters and ?ordering= as the company list. Rows are read with a
+    server-side cursor and sent as they are encoded, so memory use does not
+    grow with the size of the extract.
+    """
+    export_format = request.GET.get('format', 'csv')
+    compress = request.GET.get('gzip', '').lower() in ('1', 'true', 'yes')
+    try:
+        check_format(export_format)
+        rows = export_rows(request.GET)
+    except ExportError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    except ValidationError as e:
+        return JsonResponse(e.detail, status=400)
+
+    content_type = 'application/gzip' if compress else EXPORT_FORMATS[export_format][0]
+    response = StreamingHttpResponse(export_chunks(rows, export_format, compress), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(export_format, compress)}"'
+    return response
+
+def company_report(request, gstin):
+    """
+    Compliance report of one company, rendered from its stored filings.
+
+    ?format=pdf (default), html or json. The ETag comes from the company's
+    version, the format and the report layout, so a conditional GET is
+    answered 304 before any record is loaded or rendered. Output is cached
+    by a hash of the records it is built from.
+    """
+    report_format = request.GET.get('format', 'pdf')
+    try:
+        check_report_format(report_format)
+    except ReportError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    version = company_version(gstin)
+    if version is None:
+        return JsonResponse({"error": "Company not found."}, status=404)
+    # The path carries ?format=; REPORT_VERSION retires ETags of an old layout
+    number, updated_at = version
+    not_modified, headers = _conditional(request, (f"{number}:report-{REPORT_VERSION}", updated_at))
+    if not_modified is not None:
+        return not_modified
+
+    rendered = render_report(gstin, report_format)
+    if rendered is None:
+        return JsonResponse({"error": "Company not found."}, status=404)
+    output, _ = rendered
+    response = HttpResponse(output, content_type=REPORT_FORMATS[report_format][0], headers=headers)
+    if report_format == 'pdf':
+        response['Content-Disposition'] = f'inline; filename="{gstin}_summary.pdf"'
+    return response
+
+
+@api_view(['POST'])
+def bulk_reports(request):
+    """
+    Reports of many companies as one zip file.
+
+    Accepts ``{"gstins": [...], "format": "pdf"}``. Reports are rendered in
+    parallel, and unchanged ones come from the cache. GSTINs without a
+    profile are listed in the X-Missing-GSTINs header.
+    """
+    gstins = request.data.get('gstins')
+    report_format = request.data.get('format', 'pdf')
+    if not isinstance(gstins, list) or not gstins:
+        return Response({"error": "gstins must be a non-empty list."}, status=400)
+    max_items = getattr(settings, 'REPORT_BULK_MAX_ITEMS', 500)
+    if len(gstins) > max_items:
+        return Response({"error": f"At most {max_items} GSTINs per request."}, status=400)
+    try:
+        check_report_format(report_format)
+    except ReportError as e:
+        return Response({"error": str(e)}, status=400)
+
+    reports = load_reports(gstins)
+    archive = zip_reports(render_reports(reports, report_format), report_format)
+    response = HttpResponse(archive, content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="reports-{report_format}.zip"'
+    missing = sorted(set(gstins) - set(reports))
+    if missing:
+        response['X-Missing-GSTINs'] = ','.join(missing)
+    return response
+
+@api_view(['GET'])
+def company_search(request):
+    """
+    Top matches for ?q= over legal name, trade name and GSTIN, best first.
+
+    Tolerates typos and matches prefixes and substrings; a GSTIN prefix is
+    matched on the GSTIN alone. ?limit= caps the matches (default 10).
+    """
+    try:
+        limit = int(request.query_params.get('limit', DEFAULT_RESULTS))
+    except ValueError:
+        return Response({"error": "limit must be an integer."}, status=400)
+    try:
+        results = search_companies(request.query_params.get('q', ''), limit)
+    except SearchError as e:
+        return Response({"error": str(e)}, status=400)
+    for result in results:
+        result['rank'] = round(result['rank'], 3)
+    return Response({"results": results})
 
 class CompanyDetailView(APIView):
     def get(self, request, gstin):
+        # Answer a conditional GET from the company's version alone
+        version = company_version(gstin)
+        headers = {}
+        if version is not None:
+            not_modified, headers = _conditional(request, version)
+            if not_modified is not None:
+                return not_modified
+        sparse_kwargs, columns = _sparse_serializer(CompanyGSTRecordSerializer, request.query_params)
         try:
-            companies = CompanyGSTRecord.objects.filter(gstin=gstin)  # Use filter() to get multiple records
+            companies = _only(CompanyGSTRecord.objects.filter(company_id=gstin), columns)  # Use filter() to get multiple records
             if companies.exists():
-                serializer = CompanyGSTRecordSerializer(companies, many=True)  # Serialize multiple objects
-                return Response(serializer.data, status=status.HTTP_200_OK)
+                serializer = CompanyGSTRecordSerializer(companies, many=True, **sparse_kwargs)  # Serialize multiple objects
+                return Response(serializer.data, status=status.HTTP_200_OK, headers=headers)
             else:
                 return Response(
                     {"error": "No companies found with the provided GSTIN."},
@@ -505,19 +646,17 @@ class CompanyDetailView(APIView):
     
 @api_view(['GET', 'POST'])
 def fetch_company_details(request):
-    print("POST request received")
+    gstin = request.data.get("gstin", "07aagcd1764k1zh")
+
+    # Fetch data from the external API through the shared, rate-limited client
+    try:
+        full_data = gst_client.search_taxpayer(gstin)
+    except GSTAPIError:
+        full_data = None
+
+    if full_data is not None:
+        logger.info("Fetched company details for GSTIN %s", gstin)
 
-    # URL of the external API
-    url = "https://gstapi.charteredinfo.com/commonapi/v1.1/search?aspid=1755060724&password=Cash@2020&Action=TP&Gstin=07aagcd1764k1zh"
-    
-    # Fetch data from the external API
-    response = requests.get(url)
-    
-    if response.status_code == 200:
-        print("Data fetched successfully from API")
-        full_data = response.json()
-        print("Full API Response:", full_data)
-        
         # Extract data directly from the full_data response
         registration_date = full_data.get('rgdt', '').replace('/', '')  # Convert to DDMMYYYY format
         last_updated = full_data.get('lstupdt', '').replace('/', '')    # Convert to DDMMYYYY format
@@ -540,13 +679,13 @@ def fetch_company_details(request):
                 last_updated=last_updated,
                 e_invoice_status=full_data.get('einvoiceStatus', ''),
             )
-            print("Company details saved with ID:", company_details.id)
+            logger.info("Company details saved with ID %s", company_details.id)
             return Response({"message": "Data saved successfully", "company_id": company_details.id}, status=201)
         except IntegrityError as e:
-            print(f"Integrity error: {e}")
+            logger.error("Integrity error saving company details for GSTIN %s: %s", gstin, e)
             return Response({"error": "Duplicate entry or constraint violation"}, status=400)
     else:
-        print("Failed to fetch data from the API")
+        logger.error("Failed to fetch company details for GSTIN %s", gstin)
         return Response({"error": "Failed to fetch data from the external API"}, status=400)
 
 class ReturnViewSet(viewsets.ModelViewSet):
@@ -554,5 +693,8 @@ class ReturnViewSet(viewsets.ModelViewSet):
     serializer_class = ReturnSerializer
 
 class ScoreViewSet(viewsets.ModelViewSet):
-    queryset = Score.objects.all()
+    """One precomputed scorecard per company, looked up by GSTIN."""
+    queryset = Score.objects.order_by('company_id')
     serializer_class = ScoreSerializer
+    lookup_field = 'company'
+    lookup_value_regex = '[^/]+'
@@ -652,7 +652,7 @@ import jsPDF from 'jspdf'
 import 'jspdf-autotable'
 import { ArrowUp, ArrowDown, ArrowUpDown } from 'lucide-react'
 import Image from 'next/image' // Import Image from next/image
-import API_URL from '@/config'
+import { apiFetch } from '@/lib/api'
 
 import { UserOptions as AutoTableUserOptions } from 'jspdf-autotable'
 
@@ -729,7 +729,7 @@ export default function UserDashboard() {
 
     const fetchData = async () => {
         try {
-            const response = await fetch(`${API_URL}/companies/`)
+            const response = await apiFetch(`/companies/`)
             if (response.ok) {
                 const data: Company[] = await response.json()
                 const uniqueData: Company[] = Array.from(new Map(data.map(item => [item.gstin, item])).values())
@@ -817,7 +817,7 @@ export default function UserDashboard() {
 
     const filterDataForPDF = async (gstin: string): Promise<Company | null> => {
         try {
-            const response = await fetch(`${API_URL}/companies/${gstin}/`)
+            const response = await apiFetch(`/companies/${gstin}/`)
             if (response.ok) {
                 const data = await response.json()
                 return data || null
@@ -856,7 +856,7 @@ export default function UserDashboard() {
 
             try {
                 setIsLoading(true);
-                const response = await fetch(`${API_URL}/update_status_for_gstin/`, {
+                const response = await apiFetch(`/update_status_for_gstin/`, {
                     method: 'PUT',
                     headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify(bodyData),
@@ -735,7 +735,7 @@ import {
 } from "@/components/ui/select"
 import jsPDF from 'jspdf'
 import 'jspdf-autotable'
-import API_URL from '@/config'
+import { apiFetch } from '@/lib/api'
 
 import { UserOptions as AutoTableUserOptions } from 'jspdf-autotable'
 import { ArrowUp, ArrowDown, ArrowUpDown } from 'lucide-react'
@@ -842,7 +842,7 @@ export default function AdminDashboard() {
 
     const fetchData = async () => {
         try {
-            const response = await fetch(`${API_URL}/companies/`)
+            const response = await apiFetch(`/companies/`)
             if (response.ok) {
                 const data = await response.json()
                 if (Array.isArray(data)) {
@@ -882,7 +882,7 @@ export default function AdminDashboard() {
 
         setIsLoading(true);
         try {
-            const response = await fetch(`${API_URL}/fetch_and_save_gst_record/`, {
+            const response = await apiFetch(`/fetch_and_save_gst_record/`, {
                 method: "POST",
                 headers: {
                     "Content-Type": "application/json",
@@ -928,7 +928,7 @@ export default function AdminDashboard() {
 
             try {
                 setIsLoading(true);
-                const response = await fetch(`${API_URL}/update_annual_turnover/`, {
+                const response = await apiFetch(`/update_annual_turnover/`, {
                     method: 'PUT',
                     headers: {
                         'Content-Type': 'application/json',
@@ -957,7 +957,7 @@ export default function AdminDashboard() {
 
     const filterDataForPDF = async (gstin: string): Promise<CompanyData[] | null> => {
         try {
-            const response = await fetch(`${API_URL}/companies/${gstin}/`)
+            const response = await apiFetch(`/companies/${gstin}/`)
             if (response.ok) {
                 const data = await response.json()
                 return Array.isArray(data) ? data : null
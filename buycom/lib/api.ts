@@ -0,0 +1,18 @@
+import API_URL from "@/config"
+
+// After a write, the API answers with the time until which this client must
+// read from the primary database, as replicas may not have the write yet.
+// Cookies are not sent cross-origin, so the value is echoed as a header.
+const PIN_HEADER = "X-DB-Primary-Until"
+
+let pinnedUntil: string | null = null
+
+export async function apiFetch(path: string, init: RequestInit = {}) {
+  const headers = new Headers(init.headers)
+  if (pinnedUntil !== null && Number(pinnedUntil) * 1000 > Date.now()) {
+    headers.set(PIN_HEADER, pinnedUntil)
+  }
+  const response = await fetch(`${API_URL}${path}`, { ...init, headers })
+  pinnedUntil = response.headers.get(PIN_HEADER) ?? pinnedUntil
+  return response
+}